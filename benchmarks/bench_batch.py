@@ -0,0 +1,44 @@
+"""
+Lip setup batch over synthetic scenes saved by the headless maya.cmds stand-in, serial vs a worker pool:
+    python -m zanimTools.benchmarks.bench_batch [scene_count] [control_count]
+"""
+import os
+import sys
+import tempfile
+
+from zanimTools.rig_setup.core.batch import build_jobs, run_batch
+from zanimTools.rig_setup.headless import fake_cmds
+
+
+def write_scenes(folder, scene_count, control_count):
+    """Save scene_count lip rigs of control_count controls as stand-in scene files, returns their paths."""
+    fake = fake_cmds.install()
+    import maya.cmds as cmds
+    from zanimTools.rig_setup.headless.scenes import create_lip_rig
+
+    paths = []
+    for index in range(scene_count):
+        fake.new_scene()
+        create_lip_rig(control_count)
+        path = os.path.join(folder, f"character{index:03d}.json")
+        cmds.file(rename=path)
+        cmds.file(save=True)
+        paths.append(path)
+    fake_cmds.uninstall()
+    return paths
+
+
+def run(scene_count=8, control_count=500):
+    with tempfile.TemporaryDirectory() as folder:
+        scenes = write_scenes(folder, scene_count, control_count)
+        output_dir = os.path.join(folder, "out")
+        os.makedirs(output_dir)
+        jobs = build_jobs(scenes, output_dir)
+        print(f"{scene_count} scenes of {control_count} lip controls")
+        for workers in (1, os.cpu_count() or 1):
+            report = run_batch(jobs, workers=workers, backend="fake")
+            print(report.describe() if workers == 1 else report.describe().splitlines()[0])
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:3]])
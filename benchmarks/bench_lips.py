@@ -0,0 +1,61 @@
+"""
+Maya-call counts and wall time of the lip tools on synthetic rigs, using the headless maya.cmds stand-in:
+    python -m zanimTools.benchmarks.bench_lips [control_count ...]
+
+Call count is the best proxy for in-Maya latency, compare the numbers before and after a change.
+"""
+import contextlib
+import io
+import sys
+import time
+
+from zanimTools.rig_setup.headless import fake_cmds
+
+fake = fake_cmds.install()
+
+import maya.cmds as cmds  # The stand-in has to be installed before anything imports maya.cmds
+
+from zanimTools.rig_setup.core.module_lips import create_lip_nodes
+from zanimTools.rig_setup.core.scene_data import NamingConvention
+from zanimTools.rig_setup.core.tools_mirror import add_mirrored_selection
+from zanimTools.rig_setup.headless.scenes import create_lip_rig
+
+
+def measure(label, function, *args, **kwargs):
+    """Run function once and print its Maya-call count and wall time."""
+    fake.reset_counts()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    calls = ", ".join(f"{name}={count}" for name, count in fake.call_counts.most_common())
+    print(f"  {label:<28} {fake.total_calls():7d} calls {elapsed * 1000.0:9.1f} ms  ({calls})")
+    return result
+
+
+def new_rig(control_count):
+    """New scene with a lip rig, every measured build starts from an unbuilt rig. Returns the controls."""
+    fake.new_scene()
+    return create_lip_rig(control_count)
+
+
+def run(control_count):
+    controls = new_rig(control_count)
+    print(f"{control_count} lip controls")
+
+    naming_convention = measure("NamingConvention()", NamingConvention)
+    measure("NamingConvention() cached", NamingConvention)
+
+    cmds.select(controls)
+    measure("create_lip_nodes", create_lip_nodes, naming_convention, False)
+    measure("create_lip_nodes (up to date)", create_lip_nodes, naming_convention, False)
+
+    controls = new_rig(control_count)
+    cmds.select(controls[::2])
+    measure("create_lip_nodes (mirror)", create_lip_nodes, naming_convention, True)
+    measure("add_mirrored_selection", add_mirrored_selection, naming_convention=naming_convention)
+
+
+if __name__ == "__main__":
+    for count in [int(arg) for arg in sys.argv[1:]] or (10, 100, 1000):
+        run(count)
@@ -0,0 +1,86 @@
+"""
+Per-control lip graph vs the compact per-row and per-side-and-row graphs on synthetic rigs, using the headless
+maya.cmds stand-in:
+    python -m zanimTools.benchmarks.bench_lips_compact [control_count ...]
+
+Reports build cost (nodes, connections, Maya calls, wall time) and playback cost: the stand-in pulls every
+driver rotation through the graph once per frame, like a DG evaluation, and counts the nodes it computed.
+Every layout is checked to give the same rotations as the per-control graph.
+"""
+import contextlib
+import io
+import sys
+import time
+
+from zanimTools.rig_setup.headless import fake_cmds
+
+fake = fake_cmds.install()
+
+import maya.cmds as cmds  # The stand-in has to be installed before anything imports maya.cmds
+
+from zanimTools.rig_setup.core.module_lips import create_lip_nodes
+from zanimTools.rig_setup.core.scene_data import NamingConvention
+from zanimTools.rig_setup.headless.scenes import create_lip_rig
+
+FRAMES = 24
+
+
+# label -> create_lip_nodes layout options
+LAYOUTS = (
+    ("per-control", {"compact": False}),
+    ("compact row", {"compact": True, "cluster": "row"}),
+    ("compact side", {"compact": True, "cluster": "side_row"}),
+)
+
+
+def build(control_count, options):
+    """Build a rig in a new scene and return (report, driver rotation plugs, Maya calls)."""
+    fake.new_scene()
+    controls = create_lip_rig(control_count)
+    naming_convention = NamingConvention()
+    cmds.setAttr(naming_convention.jaw_control + ".StickyLips", 0.5)
+    cmds.setAttr(naming_convention.jaw_control + ".StickyTopBot", 0.75)
+    cmds.setAttr(naming_convention.jaw_control + ".PressLips", 2.0)
+    cmds.select(controls)
+
+    fake.reset_counts()
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = create_lip_nodes(naming_convention, False, **options)
+    calls = fake.total_calls()
+    plugs = [f"{control}_driver.rotate{axis}" for control in controls for axis in "XYZ"]
+    return report, plugs, calls
+
+
+def play(plugs):
+    """Evaluate the driver rotations over FRAMES frames, returns (values of every frame, ms per frame, nodes)."""
+    frames = []
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        fake.nodes["C_jawA01_JNT"].attrs["rotateX"] = float(frame)
+        fake.nodes["C_jawA01_JNT"].attrs["rotateZ"] = frame * 0.5
+        frames.append(fake.evaluate(plugs))
+    elapsed = (time.perf_counter() - start) / FRAMES
+    return frames, elapsed * 1000.0, len(fake.last_evaluated)
+
+
+def run(control_count):
+    print(f"{control_count} lip controls")
+    results = {}
+    for label, options in LAYOUTS:
+        report, plugs, calls = build(control_count, options)
+        frames, frame_ms, evaluated = play(plugs)
+        results[label] = frames
+        print(f"  {label:<13} {report.nodes_created:6d} nodes {report.edges_created:6d} connections "
+              f"{calls:6d} Maya calls {report.elapsed * 1000.0:8.1f} ms build | "
+              f"{evaluated:6d} nodes evaluated {frame_ms:7.2f} ms/frame")
+
+    reference = results["per-control"]
+    for label, frames in results.items():
+        if label != "per-control":
+            same = all(abs(a[plug] - b[plug]) < 1e-9 for a, b in zip(reference, frames) for plug in a)
+            print(f"  same rotations ({label}): {same}")
+
+
+if __name__ == "__main__":
+    for count in [int(arg) for arg in sys.argv[1:]] or (10, 100, 1000):
+        run(count)
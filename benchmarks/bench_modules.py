@@ -0,0 +1,51 @@
+"""
+Build cost of every registered rig module on synthetic rigs, using the headless maya.cmds stand-in:
+    python -m zanimTools.benchmarks.bench_modules [control_count ...]
+
+Each module is planned (templates only, no Maya call) and built per control and, when it has one, compact.
+New modules get their numbers here as soon as they are registered, see rig_module.register_module.
+"""
+import contextlib
+import io
+import sys
+import time
+
+from zanimTools.rig_setup.headless import fake_cmds
+
+fake = fake_cmds.install()
+
+from zanimTools.rig_setup.core import module_lips  # noqa: F401, registers the lips module
+from zanimTools.rig_setup.core.rig_module import MODULES, create_module_nodes
+from zanimTools.rig_setup.core.scene_data import NamingConvention
+from zanimTools.rig_setup.headless.scenes import create_module_rig
+
+
+def run(module, control_count, compact):
+    fake.new_scene()
+    naming_convention = NamingConvention()
+    controls = create_module_rig(module, control_count, naming_convention)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        builder = module.plan(naming_convention, controls, False, compact=compact)
+    plan_time = time.perf_counter() - start
+
+    fake.reset_counts()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = create_module_nodes(module, naming_convention, False, compact=compact, control_list=controls,
+                                     rewire_policy="disconnect")
+    build_time = time.perf_counter() - start
+    label = "compact" if compact else "per-control"
+    print(f"  {label:<12} {len(builder.nodes):6d} nodes {len(builder.edges):7d} connections "
+          f"{plan_time * 1000.0:8.1f} ms plan | {fake.total_calls():6d} Maya calls {build_time * 1000.0:8.1f} ms build"
+          f"  ({report})")
+
+
+if __name__ == "__main__":
+    for count in [int(arg) for arg in sys.argv[1:]] or (10, 100, 1000):
+        for module in MODULES.values():
+            print(f"{module.label} module, {count} controls")
+            run(module, count, compact=False)
+            if module.compact_params is not None:
+                run(module, count, compact=True)
@@ -0,0 +1,56 @@
+"""
+Benchmark of the name parsing engine on a synthetic rig, runs without Maya:
+    python -m zanimTools.benchmarks.bench_name_parser [name_count]
+"""
+import sys
+import time
+
+from zanimTools.rig_setup.core.name_parser import NameParser
+
+SIDES = ("L", "R", "C")
+BODIES = ("lip", "eye", "brow", "cheek", "nose", "jaw", "lid", "finger", "arm", "leg")
+POSITIONS = ("Top", "Bot", "Corner", "Mid", "Front", "Back", "")
+TYPES = ("JNT", "CTL", "GRP", "LOC", "FOL")
+
+
+def synthetic_names(count):
+    """Unique names spread over every side, position and type of the default convention."""
+    names = []
+    index = 0
+    while len(names) < count:
+        for side in SIDES:
+            body = BODIES[index % len(BODIES)]
+            pos = POSITIONS[(index // len(BODIES)) % len(POSITIONS)]
+            node_type = TYPES[index % len(TYPES)]
+            names.append(f"{side}_{body}{pos}{index:05d}_{node_type}")
+        index += 1
+    return names[:count]
+
+
+def timed(label, count, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed * 1000.0:9.1f} ms  {count / elapsed / 1000.0:9.0f}k names/s")
+    return result
+
+
+def run(count=100000):
+    names = synthetic_names(count)
+    parser = NameParser()
+    print(f"{count} synthetic names")
+
+    timed("parse (cold cache)", count, parser.parse_many, names)
+    timed("parse (warm cache)", count, parser.parse_many, names)
+    mirrored = timed("mirror (cold cache)", count, parser.mirror_many, names)
+    timed("mirror (warm cache)", count, parser.mirror_many, names)
+
+    parsed = parser.parse_many(names)
+    timed("resolve", count, lambda: [parser.resolve(p.base, p.pos, p.side, p.number, p.type) for p in parsed])
+
+    # Round trip sanity check: mirroring twice gives the original names back
+    assert parser.mirror_many(mirrored) == names
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
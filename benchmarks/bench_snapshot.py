@@ -0,0 +1,98 @@
+"""
+Restoring lip networks from a snapshot file vs rebuilding them, using the headless maya.cmds stand-in:
+    python -m zanimTools.benchmarks.bench_snapshot [control_count ...]
+
+A rig is built and a few of its nodes tweaked, then exported. New scenes get the same rig rebuilt and restored,
+once with the same naming convention and once with another one (sides, positions, types and token order),
+and the driver rotations are compared with the original rig. Restore and rebuild make about as many Maya calls,
+only the restore gives the tweaked rotations back.
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+from zanimTools.rig_setup.headless import fake_cmds
+
+fake = fake_cmds.install()
+
+import maya.cmds as cmds  # The stand-in has to be installed before anything imports maya.cmds
+
+from zanimTools.rig_setup.core.module_lips import LIPS, create_lip_nodes
+from zanimTools.rig_setup.core.scene_data import NamingConvention
+from zanimTools.rig_setup.core.snapshot import Snapshot, export_snapshot, restore_snapshot
+from zanimTools.rig_setup.headless.scenes import create_module_rig
+
+# Settings of the convention the snapshot is restored into in the last run
+OTHER_CONVENTION = {"side_l": "Lf", "side_r": "Rt", "pos_top_name": "Up", "type_control": "Ctrl",
+                    "side_index": 2, "type_index": 0, "jaw_control": "Ctrl_jawOpen_C"}
+
+
+def new_rig(control_count, **settings):
+    """New scene with a lip rig named after settings, returns (naming convention, controls)."""
+    fake.new_scene()
+    naming_convention = NamingConvention()
+    naming_convention.update_naming_convention(**settings)
+    controls = create_module_rig(LIPS, control_count, naming_convention, base="lip")
+    for attr, value in (("StickyLips", 0.5), ("StickyTopBot", 0.75), ("PressLips", 2.0)):
+        cmds.setAttr(f"{naming_convention.jaw_control}.{attr}", value)
+    return naming_convention, controls
+
+
+def measure(label, function, *args, **kwargs):
+    fake.reset_counts()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<30} {fake.total_calls():6d} Maya calls {elapsed * 1000.0:8.1f} ms")
+    return result
+
+
+def rotations(naming_convention, controls):
+    """Driver rotations of the controls for a posed jaw, in control order."""
+    fake.nodes[naming_convention.jaw_joint_reference].attrs["rotateX"] = 12.0
+    fake.nodes[naming_convention.jaw_joint_reference].attrs["rotateZ"] = 4.0
+    plugs = [f"{control}_driver.rotate{axis}" for control in controls for axis in "XYZ"]
+    values = fake.evaluate(plugs)
+    return [values[plug] for plug in plugs]
+
+
+def run(control_count, path):
+    print(f"{control_count} lip controls")
+    naming_convention, controls = new_rig(control_count)
+    with contextlib.redirect_stdout(io.StringIO()):
+        create_lip_nodes(naming_convention, False, control_list=controls, rewire_policy="disconnect")
+    for control in controls[::10]:  # Hand tweaks only a snapshot keeps
+        cmds.setAttr(control + "_remap.inputMax", 2.0)
+    reference = rotations(naming_convention, controls)
+
+    snapshot = measure("export_snapshot", export_snapshot, LIPS.name, path)
+    print(f"  {snapshot}, {os.path.getsize(path)} bytes")
+    measure("plan from templates", LIPS.plan, naming_convention, controls, False)
+    measure("load snapshot", lambda: Snapshot.read(path).to_builder())
+
+    naming_convention, controls = new_rig(control_count)
+    measure("rebuild (create_lip_nodes)", create_lip_nodes, naming_convention, False, control_list=controls,
+            rewire_policy="disconnect")
+    rebuilt = rotations(naming_convention, controls)
+
+    naming_convention, controls = new_rig(control_count)
+    measure("restore_snapshot", restore_snapshot, path, naming_convention)
+    restored = rotations(naming_convention, controls)
+
+    naming_convention, controls = new_rig(control_count, **OTHER_CONVENTION)
+    measure("restore_snapshot (other names)", restore_snapshot, path, naming_convention)
+    converted = rotations(naming_convention, controls)
+
+    for label, values in (("rebuild", rebuilt), ("restore", restored), ("restore other names", converted)):
+        same = all(abs(a - b) < 1e-9 for a, b in zip(reference, values))
+        print(f"  same rotations as the tweaked rig ({label}): {same}")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        for count in [int(arg) for arg in sys.argv[1:]] or (10, 100, 1000):
+            run(count, os.path.join(folder, f"lips{count}.ztsnap"))
@@ -1,5 +1,5 @@
-from zanimTools.module_reloader import reset_session_for_script
-from zanimTools.show_ui import show
+from zanimTools.module_reloader import reload_changed
 if __name__ == "__main__":
-    reset_session_for_script()
+    reload_changed()  # Only modules whose source changed (and their dependents) are reloaded
+from zanimTools.show_ui import show
 show()
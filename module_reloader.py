@@ -1,42 +1,205 @@
-import inspect
-from os.path import dirname
+import hashlib
+import importlib
+import os
+import struct
 import sys
 
+# Name of the top package (zanimTools), only its modules are ever looked at
+PACKAGE = __name__.partition(".")[0]
+
+# Source state of every package module at its last (re)load: module name -> (mtime_ns, sha1 of the source)
+_sources = {}
+
+
+def package_modules(package=PACKAGE):
+    """Loaded modules of the package, found by name instead of inspecting every module of the session."""
+    prefix = package + "."
+    return {name: module for name, module in list(sys.modules.items())
+            if module is not None and (name == package or name.startswith(prefix)) and name != __name__}
+
+
+def _source_path(module):
+    path = getattr(module, "__file__", None)
+    return path if path and path.endswith(".py") else None
+
+
+def _hash(path):
+    with open(path, "rb") as handle:
+        return hashlib.sha1(handle.read()).hexdigest()
+
+
+def _compiled_from_current_source(module, stat):
+    """
+    For modules seen for the first time: compare the source with the mtime/size recorded in the .pyc header
+    (which is what the module was imported from). Returns True when it can't be told.
+    A .pyc that couldn't be rewritten gives a false positive, which only costs an extra reload.
+    """
+    cached = getattr(module, "__cached__", None)
+    try:
+        with open(cached, "rb") as handle:
+            header = handle.read(16)
+    except (OSError, TypeError):
+        return True
+    if len(header) < 16:
+        return True
+    flags, mtime, size = struct.unpack("<III", header[4:16])
+    if flags != 0:  # Hash based .pyc, no timestamp to compare
+        return True
+    return mtime == (int(stat.st_mtime) & 0xFFFFFFFF) and size == (stat.st_size & 0xFFFFFFFF)
+
+
+def _scan(package):
+    """
+    (names of the changed modules, module name -> (mtime_ns, sha1) of the sources read), nothing is stored.
+    Only a stat call per module, files are hashed when their mtime moved or when they are seen for the first time.
+    """
+    changed = []
+    states = {}
+    for name, module in package_modules(package).items():
+        path = _source_path(module)
+        if path is None:
+            continue
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+
+        known = _sources.get(name)
+        if known is not None and known[0] == stat.st_mtime_ns:
+            continue
+        states[name] = (stat.st_mtime_ns, _hash(path))
+        if known is None:
+            if not _compiled_from_current_source(module, stat):
+                changed.append(name)
+        elif states[name][1] != known[1]:  # Touching a file without changing it is ignored
+            changed.append(name)
+    return changed, states
+
+
+def changed_modules(package=PACKAGE):
+    """
+    Names of the package modules whose source changed since they were loaded.
+    Nothing is recorded, the changes are still reported (and reloaded by reload_changed()) afterwards.
+    """
+    return _scan(package)[0]
+
+
+def dependencies(modules):
+    """module name -> names of the package modules it imports from, read from the module globals."""
+    by_identity = {id(module): name for name, module in modules.items()}
+    graph = {}
+    for name, module in modules.items():
+        deps = set()
+        for value in list(vars(module).values()):
+            dep = by_identity.get(id(value))
+            if dep is None:
+                dep = getattr(value, "__module__", None)
+                if dep is None and not isinstance(value, type):
+                    dep = getattr(type(value), "__module__", None)
+            # Packages hold their submodules as attributes, that's not an import
+            if dep in modules and dep != name and not dep.startswith(name + "."):
+                deps.add(dep)
+        graph[name] = deps
+    return graph
+
+
+def reload_order(changed, graph):
+    """Changed modules and everything depending on them, dependencies first."""
+    dependents = {}
+    for name, deps in graph.items():
+        for dep in deps:
+            dependents.setdefault(dep, set()).add(name)
+
+    to_reload = set()
+    stack = list(changed)
+    while stack:
+        name = stack.pop()
+        if name not in to_reload:
+            to_reload.add(name)
+            stack.extend(dependents.get(name, ()))
+
+    order = []
+    visited = set()
+
+    def visit(name):
+        if name in visited:
+            return
+        visited.add(name)
+        for dep in sorted(graph.get(name, ())):
+            if dep in to_reload:
+                visit(dep)
+        order.append(name)
+
+    for name in sorted(to_reload):
+        visit(name)
+    return order
+
+
+def _unload(module):
+    # Modules holding Maya callbacks or other session state release them in an on_unload() function
+    on_unload = getattr(module, "on_unload", None)
+    if callable(on_unload):
+        try:
+            on_unload()
+        except Exception as e:
+            print(f"Error unloading {module.__name__}: {e}")
+
+
+def reload_changed(package=PACKAGE):
+    """
+    Reload the package modules whose source changed, and the modules depending on them, in dependency order.
+    Returns the names of the reloaded modules.
+    """
+    changed, states = _scan(package)
+    # Unchanged modules are recorded as they are, changed ones once they are reloaded
+    _sources.update((name, state) for name, state in states.items() if name not in changed)
+    if not changed:
+        return []
+
+    modules = package_modules(package)
+    order = reload_order(changed, dependencies(modules))
+    reloaded = []
+    for name in order:
+        module = sys.modules.get(name)
+        if module is None:
+            continue
+        _unload(module)
+        try:
+            importlib.reload(module)
+        except Exception as e:
+            print(f"Error reloading {name}: {e}")
+            continue
+        path = _source_path(module)
+        if path:
+            _sources[name] = (os.stat(path).st_mtime_ns, _hash(path))
+        reloaded.append(name)
+
+    print(f"Reloaded {len(reloaded)} modules: {', '.join(reloaded)}")
+    return reloaded
+
 
 # This function resets the session for the script
 # It has a flag to let you specify the userPath you want to clear out
 # By default, it assumes the userPath is the directory of the running script (__file__)
+# Prefer reload_changed(), this purges every module of the package so the next import re-imports all of them
 def reset_session_for_script(user_path=None):
     if user_path is None:
-        user_path = dirname(__file__)
-    # Convert this to lower just for a clean comparison later
-    user_path = user_path.lower()
+        user_path = os.path.dirname(__file__)
+    # Normalize the path (and its case on Windows) for a clean comparison later
+    user_path = os.path.normcase(os.path.abspath(user_path))
 
     to_delete = []
-    # Iterate over all the modules that are currently loaded
-    for key, module in sys.modules.items():
-        # There's a few modules that are going to complain if you try to query them
-        # ,so I've popped this into a try/except to keep it safe
-        try:
-            # Use the "inspect" library to get the module_file_path that the current module was loaded from
-            module_file_path = inspect.getfile(module).lower()
-
-            # Don't try and remove the startup script, that will break everything
-            if module_file_path == __file__.lower():
-                continue
-
-            # If the module's filepath contains the userPath, add it to the list of modules to delete
-            if module_file_path.startswith(user_path):
-                print(f"Removing {key}")
-                to_delete.append(key)
-        except Exception as e:
-            # Log the exception message for debugging purposes
-            print(f"Error inspecting module {key}: {e}")
-            pass
+    # Only the package modules are looked at, not every module of the session
+    for key, module in package_modules().items():
+        module_file_path = getattr(module, "__file__", None)
+        if module_file_path and os.path.normcase(os.path.abspath(module_file_path)).startswith(user_path):
+            to_delete.append(key)
 
     # If we'd deleted the module in the loop above, it would have changed the size of the dictionary and
     # broken the loop. So now we go over the list we made and delete all the modules
-    for module in to_delete:
-        del sys.modules[module]
+    for key in to_delete:
+        _unload(sys.modules[key])
+        del sys.modules[key]
+        _sources.pop(key, None)
 
 #########################################
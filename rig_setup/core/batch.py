@@ -0,0 +1,224 @@
+"""
+Build the lip setup on many scenes without the UI, one scene per worker process.
+
+    python -m zanimTools.rig_setup.core.batch charA.ma charB.ma --preset show.json --output-dir out --workers 4
+
+Run it with mayapy so the workers are mayapy processes (backend "maya", initialized with maya.standalone).
+The "fake" backend runs the same jobs on the headless stand-in (rig_setup.headless.fake_cmds), whose scenes are
+JSON files, so a batch can be tried out with plain Python.
+Every scene gets a SceneResult with its timings or its error, collected in a BatchReport.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+# Controls built in every scene when a job doesn't list them: control_query.find_controls tokens, matched with the
+# naming convention of the job. With Mirror Behavior only the left and center controls are built.
+DEFAULT_CONTROL_QUERY = {"type": "CTL", "body_contains": "lip"}
+
+BACKENDS = ("maya", "fake")
+
+
+class SceneJob:
+    """One scene to process: where to read and save it, the controls to build and the settings to use."""
+
+    def __init__(self, scene, output=None, controls=None, settings=None, options=None):
+        self.scene = scene
+        self.output = output  # None saves over the scene
+        # Control names or cmds.ls patterns, one side only with Mirror Behavior. None: see DEFAULT_CONTROL_QUERY
+        self.controls = list(controls) if controls is not None else None
+        self.settings = dict(settings or {})  # NamingConvention values, keyed like DEFAULT_SETTINGS
+        self.options = dict(options or {})  # Extra create_lip_nodes arguments (compact, cluster, use_api...)
+
+
+class SceneResult:
+    """Outcome of one SceneJob. Plain attributes only, it's sent back from the worker process."""
+
+    def __init__(self, scene, output=None):
+        self.scene = scene
+        self.output = output
+        self.status = "error"  # "built", "up to date", "invalid" or "error"
+        self.error = None
+        self.controls = 0
+        self.nodes_created = 0
+        self.edges_created = 0
+        self.timings = {}  # Step ("open", "build", "save") -> seconds
+        self.elapsed = 0.0
+        self.pid = os.getpid()
+        self.log = ""  # What the tools printed while processing the scene
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+class BatchReport:
+    """Results of a batch, in the order of the jobs."""
+
+    def __init__(self, results, elapsed, workers):
+        self.results = results
+        self.elapsed = elapsed
+        self.workers = workers
+
+    def failed(self):
+        return [result for result in self.results if result.status in ("error", "invalid")]
+
+    def describe(self):
+        lines = [f"{len(self.results)} scenes in {self.elapsed:.2f} s with {self.workers} workers, "
+                 f"{len(self.failed())} failed",
+                 f"  {'scene':<40} {'status':<11} {'controls':>8} {'nodes':>7} {'open s':>7} {'build s':>8} "
+                 f"{'save s':>7}"]
+        for result in self.results:
+            timings = result.timings
+            lines.append(f"  {os.path.basename(result.scene):<40} {result.status:<11} {result.controls:>8} "
+                         f"{result.nodes_created:>7} {timings.get('open', 0.0):>7.2f} "
+                         f"{timings.get('build', 0.0):>8.2f} {timings.get('save', 0.0):>7.2f}")
+            if result.error:
+                lines.append(f"      {result.error.strip().splitlines()[-1]}")
+        return "\n".join(lines)
+
+    def write_json(self, path):
+        with open(path, "w") as handle:
+            json.dump({"elapsed": self.elapsed, "workers": self.workers,
+                       "results": [result.to_dict() for result in self.results]}, handle, indent=2)
+        return path
+
+
+def _init_worker(backend):
+    # Runs once per worker process, before its first scene
+    if backend == "maya":
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+    else:
+        from zanimTools.rig_setup.headless import fake_cmds
+        fake_cmds.install()
+
+
+def process_scene(job):
+    """Open a scene, build the lip setup on the controls of the job and save it. Returns a SceneResult."""
+    from zanimTools.rig_setup.core.control_query import find_controls
+    from zanimTools.rig_setup.core.instrumentation import cmds
+    from zanimTools.rig_setup.core.module_lips import create_lip_nodes, validate_lip_selection
+    from zanimTools.rig_setup.core.scene_data import NamingConvention
+
+    result = SceneResult(job.scene, job.output or job.scene)
+    start = time.perf_counter()
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            step = time.perf_counter()
+            cmds.file(job.scene, open=True, force=True)
+            result.timings["open"] = time.perf_counter() - step
+
+            step = time.perf_counter()
+            naming_convention = NamingConvention()
+            naming_convention.update_naming_convention(**job.settings)
+            is_mirror_behavior = naming_convention.mirror_behavior == "True"
+            if job.controls is None:
+                control_list = find_controls(naming_convention, side=("L", "C") if is_mirror_behavior else None,
+                                             **DEFAULT_CONTROL_QUERY)
+            else:
+                control_list = cmds.ls(job.controls, type="transform") or []
+            result.controls = len(control_list)
+
+            validation = validate_lip_selection(naming_convention, control_list, is_mirror_behavior)
+            if not control_list or not validation.is_valid():
+                result.status = "invalid"
+                result.error = (validation.describe() if control_list else
+                                f"No control matches {job.controls or DEFAULT_CONTROL_QUERY}")
+                return result
+
+            # Nobody is there to answer the rewiring prompt, mirrored drivers keep following by default
+            options = dict({"rewire_policy": "mirror"}, **job.options)
+            report = create_lip_nodes(naming_convention, is_mirror_behavior, control_list=control_list, **options)
+            result.timings["build"] = time.perf_counter() - step
+            if report is None:
+                result.status = "up to date"
+            else:
+                result.status = "built"
+                result.nodes_created = report.nodes_created
+                result.edges_created = report.edges_created
+
+            step = time.perf_counter()
+            if job.output and job.output != job.scene:
+                cmds.file(rename=job.output)
+            cmds.file(save=True, force=True, type=_scene_type(result.output))
+            result.timings["save"] = time.perf_counter() - step
+    except Exception:
+        result.status = "error"
+        result.error = traceback.format_exc()
+    finally:
+        result.elapsed = time.perf_counter() - start
+        result.log = log.getvalue()
+    return result
+
+
+def _scene_type(path):
+    return "mayaBinary" if path.lower().endswith(".mb") else "mayaAscii"
+
+
+def run_batch(jobs, workers=None, backend="maya"):
+    """
+    Process the jobs in a pool of worker processes, one scene at a time per worker.
+    workers defaults to the CPU count. Returns a BatchReport.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend}, expected one of {BACKENDS}")
+    jobs = list(jobs)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(backend,)) as pool:
+        futures = [pool.submit(process_scene, job) for job in jobs]
+        results = []
+        for job, future in zip(jobs, futures):
+            try:
+                results.append(future.result())
+            except Exception:  # The worker itself died (crash in Maya...)
+                result = SceneResult(job.scene, job.output)
+                result.error = traceback.format_exc()
+                results.append(result)
+    return BatchReport(results, time.perf_counter() - start, workers)
+
+
+def build_jobs(scenes, output_dir=None, controls=None, settings=None, options=None):
+    """One SceneJob per scene, saved under output_dir with the same file name (or over the scene without it)."""
+    return [SceneJob(scene, os.path.join(output_dir, os.path.basename(scene)) if output_dir else None,
+                     controls, settings, options) for scene in scenes]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the lip setup on many scenes.")
+    parser.add_argument("scenes", nargs="+")
+    parser.add_argument("--preset", help="Naming convention preset, by name or path to its JSON file")
+    parser.add_argument("--output-dir", help="Save the scenes there instead of over the originals")
+    parser.add_argument("--controls", nargs="+",
+                        help="Control names or patterns to build, all the lip controls of the convention by default")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--cluster", default="row")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--backend", choices=BACKENDS, default="maya")
+    parser.add_argument("--report", help="Write the report as JSON there")
+    args = parser.parse_args(argv)
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+    settings = None
+    if args.preset:
+        from zanimTools.rig_setup.core.presets import load_preset
+        settings = load_preset(args.preset)
+    jobs = build_jobs(args.scenes, args.output_dir, args.controls, settings,
+                      {"compact": args.compact, "cluster": args.cluster})
+    report = run_batch(jobs, workers=args.workers, backend=args.backend)
+    print(report.describe())
+    if args.report:
+        report.write_json(args.report)
+    return 1 if report.failed() else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
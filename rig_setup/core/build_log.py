@@ -0,0 +1,19 @@
+class BuildLog:
+    """
+    Messages of one build, kept in memory and printed in one go at the end.
+    Printing a line per control makes the Script Editor the slowest part of a big build.
+    """
+
+    def __init__(self, title=None):
+        self.title = title
+        self.lines = []
+
+    def write(self, message):
+        self.lines.append(message)
+
+    def flush(self):
+        """Print the buffered messages as one block and forget them."""
+        if self.lines:
+            lines = ([self.title] if self.title else []) + self.lines
+            print("\n".join(lines))
+        self.lines = []
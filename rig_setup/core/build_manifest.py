@@ -0,0 +1,145 @@
+"""
+Record of what each rig build generated, stored on the settings node of the scene.
+
+Every build of a system (the lips...) merges the nodes it planned, their connections, the controls it was built
+for, its options and a snapshot of the naming convention into one JSON string attribute. Selecting, deleting or
+rebuilding a system then only looks at the nodes of its manifest instead of scanning the scene for them by name.
+"""
+import json
+
+from zanimTools.rig_setup.core.graph_builder import _remap_plug
+from zanimTools.rig_setup.core.instrumentation import cmds
+
+# String attribute on the settings node holding the manifest of every built system as one JSON blob
+MANIFEST_ATTR = "buildManifests"
+
+
+class BuildManifest:
+    """Nodes, connections, controls, options and settings snapshot of one built system."""
+
+    def __init__(self, system, nodes=(), edges=(), controls=(), options=None, settings=None):
+        self.system = system
+        self.nodes = list(nodes)
+        self.edges = [tuple(edge) for edge in edges]
+        self.controls = list(controls)
+        self.options = dict(options or {})
+        self.settings = dict(settings or {})
+
+    @classmethod
+    def from_builder(cls, system, builder, name_map, naming_convention, controls=(), options=None):
+        """Manifest of a planned GraphBuilder, with the names Maya actually gave to the nodes it created."""
+        nodes = [name_map.get(name, name) for name, _, _ in builder.nodes]
+        edges = [(_remap_plug(source, name_map), _remap_plug(destination, name_map))
+                 for source, destination in builder.edges]
+        return cls(system, nodes, edges, controls, options, naming_convention.as_dict())
+
+    def merge(self, other):
+        """Add the content of a later build of the same system, its options and settings win."""
+        self.nodes = list(dict.fromkeys(self.nodes + other.nodes))
+        self.edges = list(dict.fromkeys(self.edges + other.edges))
+        self.controls = list(dict.fromkeys(self.controls + other.controls))
+        self.options = dict(other.options)
+        self.settings = dict(other.settings)
+        return self
+
+    def to_dict(self):
+        return {"nodes": self.nodes, "edges": [list(edge) for edge in self.edges], "controls": self.controls,
+                "options": self.options, "settings": self.settings}
+
+    @classmethod
+    def from_dict(cls, system, data):
+        return cls(system, data.get("nodes", ()), data.get("edges", ()), data.get("controls", ()),
+                   data.get("options"), data.get("settings"))
+
+    def existing_nodes(self):
+        """Generated nodes still in the scene, one ls call."""
+        return (cmds.ls(self.nodes) or []) if self.nodes else []
+
+    def __str__(self):
+        return (f"{self.system}: {len(self.nodes)} nodes, {len(self.edges)} connections, "
+                f"{len(self.controls)} controls")
+
+
+def read_manifests(settings_node="rigSetupSettings"):
+    """system -> BuildManifest of every system recorded on the settings node, one getAttr call."""
+    try:
+        blob = cmds.getAttr(f"{settings_node}.{MANIFEST_ATTR}")
+    except (ValueError, RuntimeError):  # Nothing was built in this scene yet
+        blob = None
+    if not blob:
+        return {}
+    return {system: BuildManifest.from_dict(system, data) for system, data in json.loads(blob).items()}
+
+
+def read_manifest(system, settings_node="rigSetupSettings"):
+    """BuildManifest of a system, or None when it was never built in this scene."""
+    return read_manifests(settings_node).get(system)
+
+
+def write_manifests(manifests, settings_node="rigSetupSettings"):
+    blob = json.dumps({system: manifest.to_dict() for system, manifest in manifests.items()}, sort_keys=True)
+    plug = f"{settings_node}.{MANIFEST_ATTR}"
+    try:
+        cmds.setAttr(plug, blob, type="string")
+    except (ValueError, RuntimeError):  # First build on this node
+        if not cmds.objExists(settings_node):
+            cmds.createNode("transform", name=settings_node)
+        cmds.addAttr(settings_node, longName=MANIFEST_ATTR, dataType="string")
+        cmds.setAttr(plug, blob, type="string")
+
+
+def record_build(manifest, settings_node="rigSetupSettings"):
+    """
+    Merge a build into the manifest of its system and store it, returns the stored manifest.
+    Nothing is written when the build adds nothing to the stored manifest, so no-op builds don't fill the undo queue.
+    """
+    manifests = read_manifests(settings_node)
+    stored = manifests.get(manifest.system)
+    if stored is not None:
+        before = stored.to_dict()
+        if stored.merge(manifest).to_dict() == before:
+            return stored
+    else:
+        manifests[manifest.system] = manifest
+    write_manifests(manifests, settings_node)
+    return manifests[manifest.system]
+
+
+def select_build(system, settings_node="rigSetupSettings"):
+    """Select the generated nodes of a system that are still in the scene, returns them."""
+    manifest = read_manifest(system, settings_node)
+    nodes = manifest.existing_nodes() if manifest is not None else []
+    if nodes:
+        cmds.select(nodes, replace=True)
+    else:
+        cmds.warning(f"No generated {system} nodes in this scene")
+    return nodes
+
+
+def delete_build(system, settings_node="rigSetupSettings"):
+    """
+    Delete the generated nodes of a system (their connections go with them) and forget its manifest.
+    Connections the build made between nodes it didn't generate are disconnected.
+    Returns the deleted manifest, or None when the system was never built.
+    """
+    manifests = read_manifests(settings_node)
+    manifest = manifests.pop(system, None)
+    if manifest is None:
+        cmds.warning(f"No {system} build recorded in this scene")
+        return None
+
+    cmds.undoInfo(openChunk=True, chunkName=f"delete_{system}")
+    try:
+        nodes = manifest.existing_nodes()
+        generated = set(manifest.nodes)
+        for source, destination in manifest.edges:
+            if source.partition(".")[0] not in generated and destination.partition(".")[0] not in generated:
+                if cmds.isConnected(source, destination):
+                    cmds.disconnectAttr(source, destination)
+        if nodes:
+            cmds.delete(nodes)
+        write_manifests(manifests, settings_node)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return manifest
+
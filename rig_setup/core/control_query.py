@@ -0,0 +1,188 @@
+"""
+Find controls by naming convention tokens instead of by selection.
+
+    controls = find_controls(naming_convention, side=("L", "C"), type="CTL", body_contains="lip")
+    create_lip_nodes(naming_convention, True, control_list=controls)
+
+Side, position and type are canonical keys ("L", "Top", "CTL"...) or tuples of them. A query costs one cmds.ls
+call, with wildcard patterns built from the convention so Maya only returns likely matches, and the exact token
+checks run on a ControlIndex in memory. To run many queries on the same scene (a whole face build), build the
+index once with build_control_index() and pass it to every find_controls() call.
+While scene events are active (see scene_events), queries use a shared index of every transform kept up
+to date node by node, and cost no Maya call at all.
+"""
+import itertools
+from collections import defaultdict
+
+from zanimTools.rig_setup.core import scene_events
+from zanimTools.rig_setup.core.instrumentation import cmds
+
+# Shared indexes of every transform, keyed by the NameParser they were built with, see get_control_index
+_indexes = {}
+
+
+class ControlIndex:
+    """Canonical side/position/type key -> names, for names that follow the convention, built in one pass."""
+
+    def __init__(self, parser, names):
+        self.parser = parser
+        self.order = {}
+        self.parsed = {}
+        self.by_side = defaultdict(set)
+        self.by_pos = defaultdict(set)
+        self.by_type = defaultdict(set)
+        self.dirty = False
+        self._token_count = _token_count(parser)
+        self._next = 0
+
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self.parsed)
+
+    def add(self, name):
+        """Index a node, names that don't follow the convention are ignored."""
+        if name in self.parsed:
+            return
+        parsed = self.parser.parse(name)
+        # Extra tokens (L_lipTop01_CTL_driver...) are other nodes built from a control name
+        if self._token_count is not None and len(parsed.tokens) != self._token_count:
+            return
+        self.order[name] = self._next
+        self._next += 1
+        self.parsed[name] = parsed
+        self.by_side[parsed.side].add(name)
+        self.by_pos[parsed.pos].add(name)
+        self.by_type[parsed.type].add(name)
+
+    def remove(self, name):
+        parsed = self.parsed.pop(name, None)
+        if parsed is None:
+            return
+        del self.order[name]
+        self.by_side[parsed.side].discard(name)
+        self.by_pos[parsed.pos].discard(name)
+        self.by_type[parsed.type].discard(name)
+
+    def find(self, side=None, pos=None, type=None, base=None, body_contains=None):
+        """Names matching every given token, in the order they were indexed."""
+        candidates = None
+        for table, keys in ((self.by_side, side), (self.by_pos, pos), (self.by_type, type)):
+            if keys is None:
+                continue
+            matches = set().union(*(table.get(key, ()) for key in _as_tuple(keys)))
+            candidates = matches if candidates is None else candidates & matches
+
+        names = self.parsed if candidates is None else candidates
+        if base is not None or body_contains is not None:
+            parsed = self.parsed
+            names = [name for name in names
+                     if (base is None or parsed[name].base == base)
+                     and (body_contains is None or body_contains in _body(self.parser, parsed[name]))]
+        return sorted(names, key=self.order.__getitem__)
+
+
+def query_patterns(parser, side=None, pos=None, type=None, base=None, body_contains=None):
+    """
+    cmds.ls wildcard patterns narrowing a query down, e.g. side "L" and type "CTL" -> ["L_*_CTL"].
+    They may match more than the query (the index does the exact checks), never less.
+    """
+    token_count = _token_count(parser)
+    if token_count is None:  # Negative token indices, can't be placed in a pattern
+        return ["*"]
+
+    slot_choices = {}
+    if side is not None:
+        slot_choices[parser.side_index] = [parser.side_tokens[key] for key in _as_tuple(side)
+                                           if parser.side_tokens.get(key)]
+    if type is not None:
+        slot_choices[parser.type_index] = [parser.type_tokens[key] for key in _as_tuple(type)
+                                           if parser.type_tokens.get(key)]
+    # One substring per body glob: their order in the body is unknown and one may contain another
+    if pos is not None:
+        slot_choices[parser.pos_index] = [f"*{parser.pos_tokens[key]}*" for key in _as_tuple(pos)
+                                          if parser.pos_tokens.get(key)]
+    elif base or body_contains:
+        slot_choices[parser.pos_index] = [f"*{base or body_contains}*"]
+
+    if any(not choices for choices in slot_choices.values()):  # Only unknown keys asked for a slot
+        return []
+    slots = [slot_choices.get(index, ["*"]) for index in range(token_count)]
+    return [parser.separator.join(tokens) for tokens in itertools.product(*slots)]
+
+
+def build_control_index(naming_convention, node_type="transform", patterns=("*",)):
+    """ControlIndex of every node_type node matching patterns, one cmds.ls call."""
+    return ControlIndex(naming_convention.parser, cmds.ls(list(patterns), type=node_type) or [])
+
+
+def get_control_index(naming_convention):
+    """
+    Shared ControlIndex of every transform, following the scene events.
+    Returns None while scene events aren't active (the window is closed, batch...), the index couldn't be trusted.
+    """
+    if not scene_events.is_active():
+        return None
+    parser = naming_convention.parser
+    index = _indexes.get(parser)
+    if index is None or index.dirty:
+        index = _indexes[parser] = build_control_index(naming_convention)
+    return index
+
+
+def find_controls(naming_convention, side=None, pos=None, type="CTL", base=None, body_contains=None,
+                  node_type="transform", index=None):
+    """
+    Names of the node_type nodes matching the given convention tokens, in scene order.
+    index: a ControlIndex to query instead of the scene, see build_control_index.
+    """
+    if index is None and node_type == "transform":
+        index = get_control_index(naming_convention)
+    if index is None:
+        patterns = query_patterns(naming_convention.parser, side, pos, type, base, body_contains)
+        if not patterns:
+            return []
+        index = build_control_index(naming_convention, node_type, patterns)
+    return index.find(side=side, pos=pos, type=type, base=base, body_contains=body_contains)
+
+
+def _as_tuple(keys):
+    return (keys,) if isinstance(keys, str) else tuple(keys)
+
+
+def _token_count(parser):
+    """Number of tokens of a name following the convention, None when it can't be told."""
+    indices = (parser.side_index, parser.pos_index, parser.type_index)
+    return max(indices) + 1 if min(indices) >= 0 else None
+
+
+def _body(parser, parsed):
+    return parsed.tokens[parser.pos_index] if -len(parsed.tokens) <= parser.pos_index < len(parsed.tokens) else ""
+
+
+def _on_node_added(name):
+    for index in _indexes.values():
+        index.add(name)
+
+
+def _on_node_removed(name):
+    for index in _indexes.values():
+        index.remove(name)
+
+
+def _on_node_renamed(name, previous_name):
+    for index in _indexes.values():
+        index.remove(previous_name)
+        index.add(name)
+
+
+def _on_scene_reset():
+    for index in _indexes.values():
+        index.dirty = True
+
+
+scene_events.subscribe("node_added", _on_node_added)
+scene_events.subscribe("node_removed", _on_node_removed)
+scene_events.subscribe("node_renamed", _on_node_renamed)
+scene_events.subscribe("scene_reset", _on_scene_reset)
@@ -0,0 +1,94 @@
+"""
+Run a step generator (like GraphBuilder.apply_steps()) from Maya's idle queue, one step per idle event.
+
+    build = DeferredBuild(builder.apply_steps(), on_progress=update_bar, on_finished=done)
+    build.start()
+    ...
+    build.cancel()  # Rolls back what was built so far
+
+Steps are queued with cmds.evalDeferred(lowestPriority=True), so UI events (redraws, the Cancel button...) are
+handled between two steps and the window stays responsive during the build.
+"""
+from zanimTools.rig_setup.core.instrumentation import cmds
+
+# Builds currently running, a build is kept alive by this list until it ends
+_running = []
+
+
+class DeferredBuild:
+    """
+    steps: generator yielding (done, total) after each step and returning its result. Closing it has to roll
+           back what it did, and a step that fails has to roll back the generator before raising.
+    on_progress(done, total), on_finished(result) and on_cancelled() are called from the idle queue.
+    """
+
+    def __init__(self, steps, on_progress=None, on_finished=None, on_cancelled=None):
+        self.steps = steps
+        self.on_progress = on_progress
+        self.on_finished = on_finished
+        self.on_cancelled = on_cancelled
+        self.cancelled = False
+        self.finished = False
+        self.result = None
+
+    def start(self):
+        _running.append(self)
+        self._queue()
+        return self
+
+    def cancel(self):
+        """Stop at the next step and undo what was built, the build is rolled back in the idle queue."""
+        self.cancelled = True
+
+    def is_running(self):
+        return self in _running
+
+    def _queue(self):
+        cmds.evalDeferred(self._step, lowestPriority=True)
+
+    def _step(self):
+        if self.cancelled:
+            self._roll_back()
+            return
+
+        try:
+            done, total = next(self.steps)
+        except StopIteration as stop:
+            self.result = stop.value
+            self.finished = True
+            self._end()
+            if self.on_finished:
+                self.on_finished(self.result)
+            return
+        except Exception:
+            # The steps rolled themselves back, the UI is told like for a cancelled build
+            self._end()
+            if self.on_cancelled:
+                self.on_cancelled()
+            raise
+
+        if self.on_progress:
+            self.on_progress(done, total)
+        self._queue()
+
+    def _roll_back(self):
+        # Not undo: the user may have done something since the last step. Unstarted steps have nothing to roll back.
+        self.steps.close()
+        self._end()
+        if self.on_cancelled:
+            self.on_cancelled()
+
+    def _end(self):
+        if self in _running:
+            _running.remove(self)
+
+
+def cancel_all():
+    """Cancel every running build."""
+    for build in list(_running):
+        build.cancel()
+
+
+def on_unload():
+    # Called by module_reloader, a reloaded module can't drive builds queued by the old one
+    cancel_all()
@@ -0,0 +1,120 @@
+"""
+Evaluation time of a generated rig subgraph, per frame.
+
+    plugs = driver_plugs(control_list)
+    report = measure_evaluation(plugs, upstream_nodes(plugs, manifest.edges), start=1, end=120, mode="parallel",
+                                profiler_output="lips.txt")
+    print(report)
+
+Every run is recorded with Maya's profiler (cmds.profiler), reset first so the recording only holds that run, and
+the frame time is the sum of the compute events of the subgraph's nodes: the rest of the scene is left out.
+With the DG (mode "off") the time is set without updating the scene and only the given plugs are pulled.
+With the evaluation manager the scene is updated on each frame and the manager evaluates the subgraph its own way,
+pulling the plugs through the DG there would time the DG again. The saved recording can be inspected in the
+Profiler window.
+"""
+from zanimTools.rig_setup.core.instrumentation import cmds
+
+# Evaluation manager modes accepted by measure_evaluation
+EVALUATION_MODES = ("off", "serial", "parallel")
+
+
+class EvaluationReport:
+    """Per-frame evaluation times of one measure_evaluation run, in seconds."""
+
+    def __init__(self, label, mode, plug_count):
+        self.label = label
+        self.mode = mode
+        self.plug_count = plug_count
+        self.frame_times = []
+        self.profiler_output = None
+
+    def mean(self):
+        return sum(self.frame_times) / len(self.frame_times) if self.frame_times else 0.0
+
+    def __str__(self):
+        if not self.frame_times:
+            return f"{self.label}: no frame evaluated"
+        return (f"{self.label} ({self.mode}): {self.plug_count} plugs over {len(self.frame_times)} frames, "
+                f"{self.mean() * 1000.0:.3f} ms/frame (min {min(self.frame_times) * 1000.0:.3f}, "
+                f"max {max(self.frame_times) * 1000.0:.3f})")
+
+
+def measure_evaluation(plugs, nodes, start, end, mode=None, profiler_output=None, label="Evaluation"):
+    """
+    Step the time from start to end and time the evaluation of the subgraph made of nodes on every frame.
+
+    plugs: output plugs of the subgraph, pulled on every frame when the evaluation manager is off.
+    nodes: nodes of the subgraph (see upstream_nodes), only their compute events are timed.
+    mode: evaluation manager mode to measure with ("off" for DG, "serial", "parallel"), the current mode is
+          restored afterwards. None keeps the current mode.
+    profiler_output: path where the Maya profiler recording of the run is saved.
+    Reading the events back costs two profiler queries per recorded event, after the run.
+    Returns an EvaluationReport.
+    """
+    if mode is not None and mode not in EVALUATION_MODES:
+        raise ValueError(f"Unknown evaluation mode {mode}, expected one of {EVALUATION_MODES}")
+    plugs = list(plugs)
+    nodes = set(nodes)
+
+    previous_mode = cmds.evaluationManager(query=True, mode=True)[0]
+    previous_time = cmds.currentTime(query=True)
+    if mode is not None and mode != previous_mode:
+        cmds.evaluationManager(mode=mode)
+    use_dg = (mode or previous_mode) == "off"
+
+    report = EvaluationReport(label, mode or previous_mode, len(plugs))
+    frames = []  # Index of the first profiler event of every frame, and of the end of the run
+    cmds.profiler(reset=True)  # Only this run in the recording, not the previous one
+    cmds.profiler(sampling=True)
+    try:
+        for frame in range(int(start), int(end) + 1):
+            frames.append(cmds.profiler(eventCount=True))
+            if use_dg:
+                cmds.currentTime(frame, update=False)
+                if plugs:
+                    cmds.dgeval(plugs)
+            else:
+                cmds.currentTime(frame, update=True)
+        frames.append(cmds.profiler(eventCount=True))
+    finally:
+        cmds.profiler(sampling=False)
+        cmds.currentTime(previous_time, update=True)
+        if mode is not None and mode != previous_mode:
+            cmds.evaluationManager(mode=previous_mode)
+
+    for first, last in zip(frames, frames[1:]):
+        report.frame_times.append(_subgraph_time(first, last, nodes))
+    if profiler_output:
+        cmds.profiler(output=profiler_output)
+        report.profiler_output = profiler_output
+    return report
+
+
+def _subgraph_time(first, last, nodes):
+    """Seconds spent in the profiler events first to last (excluded) named after one of nodes."""
+    total = 0.0
+    for index in range(first, last):
+        if cmds.profiler(eventName=True, eventIndex=index) in nodes:
+            total += cmds.profiler(eventDuration=True, eventIndex=index)  # Microseconds
+    return total / 1000000.0
+
+
+def driver_plugs(control_list, driver_suffix="_driver", attrs=("rotateX", "rotateY", "rotateZ")):
+    """Output plugs of the lip system for control_list: the rotation of each control's driver."""
+    return [f"{control}{driver_suffix}.{attr}" for control in control_list for attr in attrs]
+
+
+def upstream_nodes(plugs, edges):
+    """Nodes plugs depend on through edges, (source plug, destination plug) pairs like the ones of a build manifest."""
+    sources = {}
+    for source, destination in edges:
+        sources.setdefault(destination.partition(".")[0], set()).add(source.partition(".")[0])
+    nodes = set()
+    pending = [plug.partition(".")[0] for plug in plugs]
+    while pending:
+        for source in sources.get(pending.pop(), ()):
+            if source not in nodes:
+                nodes.add(source)
+                pending.append(source)
+    return nodes
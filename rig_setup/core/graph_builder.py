@@ -0,0 +1,359 @@
+import time
+from itertools import islice
+
+from zanimTools.rig_setup.core.instrumentation import cmds
+
+
+class BuildReport:
+    """What a GraphBuilder.apply() call did to the scene."""
+
+    def __init__(self, name):
+        self.name = name
+        self.nodes_created = 0
+        self.edges_created = 0
+        self.edges_removed = 0
+        self.values_set = 0
+        self.elapsed = 0.0
+        self.name_map = {}  # Planned node name -> name Maya actually gave the node
+        self.modifier = None  # MDGModifier used by the API path, keep it to undoIt() the build
+
+    def __str__(self):
+        removed = f", {self.edges_removed} disconnected" if self.edges_removed else ""
+        values = f", {self.values_set} values" if self.values_set else ""
+        return (f"{self.name}: {self.nodes_created} nodes, {self.edges_created} connections{removed}{values} "
+                f"in {self.elapsed * 1000.0:.1f} ms")
+
+
+class GraphBuilder:
+    """
+    Collects a node and connection plan first, then applies it to the scene in one batch.
+
+    Nodes are declared with add_node() and connections with connect(), using the planned node names.
+    Existing connections to break are declared with disconnect(), they are removed before anything is connected.
+    Attribute values are declared with set_attr(), they are set once the nodes exist and before the connections.
+    apply() then creates everything inside a single undo chunk with viewport refresh suspended,
+    or through one MDGModifier pass (OpenMaya 2) when use_api is True.
+    """
+
+    def __init__(self, name="graphBuilder"):
+        self.name = name
+        self.nodes = []  # (name, node_type, as_utility)
+        self.edges = []  # (source plug, destination plug)
+        self.disconnects = []  # (source plug, destination plug) of existing connections to break
+        self.values = []  # (plug, value) of attributes to set: bool, int, float or str
+        self._planned = set()
+        self._destinations = {}  # destination plug -> index of its edge in self.edges
+        self._values = {}  # plug -> index of its value in self.values
+
+    def add_node(self, node_type, name, as_utility=True):
+        """Plan a node. Planning the same name twice is ignored."""
+        if name not in self._planned:
+            self._planned.add(name)
+            self.nodes.append((name, node_type, as_utility))
+        return name
+
+    def connect(self, source, destination):
+        """
+        Plan a forced connection between two plugs ("node.attribute").
+        A plug has a single input, so planning another source for the same destination replaces the first edge
+        instead of issuing a redundant connection that would be overridden anyway.
+        """
+        index = self._destinations.get(destination)
+        if index is None:
+            self._destinations[destination] = len(self.edges)
+            self.edges.append((source, destination))
+        else:
+            self.edges[index] = (source, destination)
+
+    def disconnect(self, source, destination):
+        """Plan breaking an existing connection between two plugs."""
+        if (source, destination) not in self.disconnects:
+            self.disconnects.append((source, destination))
+
+    def set_attr(self, plug, value):
+        """Plan setting an attribute value, setting the same plug again replaces the planned value."""
+        index = self._values.get(plug)
+        if index is None:
+            self._values[plug] = len(self.values)
+            self.values.append((plug, value))
+        else:
+            self.values[index] = (plug, value)
+
+    def describe(self):
+        """Readable listing of the plan, used for dry runs."""
+        lines = [f"{self.name}: {len(self.nodes)} nodes, {len(self.edges)} connections, "
+                 f"{len(self.disconnects)} disconnections, {len(self.values)} values"]
+        lines.extend(f"  node {node_type} {name}" for name, node_type, _ in self.nodes)
+        lines.extend(f"  disconnect {source} -> {destination}" for source, destination in self.disconnects)
+        lines.extend(f"  set {plug} = {value!r}" for plug, value in self.values)
+        lines.extend(f"  edge {source} -> {destination}" for source, destination in self.edges)
+        return "\n".join(lines)
+
+    def diff(self):
+        """
+        Compare the plan with the scene and return a GraphDiff holding only what is missing.
+        Values are only kept for the nodes the diff creates, existing nodes keep their (maybe tweaked) values.
+        Uses one ls and one listConnections call for the whole plan.
+        """
+        result = GraphDiff(GraphBuilder(name=self.name))
+        if not self.nodes and not self.edges and not self.disconnects:
+            return result
+
+        # ls with showType returns a flat [name, type, name, type...] list of the queried nodes that exist.
+        # Destination nodes are queried too, listConnections errors on nodes that don't exist.
+        destination_nodes = list(dict.fromkeys(destination.partition(".")[0]
+                                               for _, destination in self.edges + self.disconnects))
+        query_names = list(dict.fromkeys([name for name, _, _ in self.nodes] + destination_nodes))
+        found = cmds.ls(query_names, showType=True) or []
+        existing_types = dict(zip(found[::2], found[1::2]))
+
+        for name, node_type, as_utility in self.nodes:
+            existing_type = existing_types.get(name)
+            if existing_type is None:
+                result.builder.add_node(node_type, name, as_utility)
+            elif existing_type != node_type:
+                result.conflicts.append(f"{name} exists as a {existing_type}, expected a {node_type}")
+            else:
+                result.existing_nodes += 1
+
+        created = result.builder._planned
+        for plug, value in self.values:
+            if plug.partition(".")[0] in created:
+                result.builder.set_attr(plug, value)
+
+        # Incoming connections of every destination node, returned as [destination, source...] pairs
+        destination_nodes = [node for node in destination_nodes if node in existing_types]
+        connected = cmds.listConnections(destination_nodes, source=True, destination=False, plugs=True,
+                                         connections=True, skipConversionNodes=True) if destination_nodes else None
+        connected = connected or []
+        existing_edges = set(zip(connected[1::2], connected[::2]))
+
+        for edge in self.edges:
+            if edge in existing_edges:
+                result.existing_edges += 1
+            else:
+                result.builder.connect(*edge)
+        # Only connections that are still there need breaking
+        for edge in self.disconnects:
+            if edge in existing_edges:
+                result.builder.disconnect(*edge)
+        return result
+
+    def apply(self, use_api=False):
+        """Create the planned nodes and connections and return a BuildReport."""
+        report = BuildReport(self.name)
+        start = time.perf_counter()
+
+        cmds.undoInfo(openChunk=True, chunkName=self.name)
+        cmds.refresh(suspend=True)  # Don't let the viewport pull on the graph while it's being built
+        try:
+            if use_api:
+                self._apply_api(report)
+            else:
+                self._apply_cmds(report)
+        finally:
+            cmds.refresh(suspend=False)
+            cmds.undoInfo(closeChunk=True)
+
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def apply_steps(self, chunk_size=200, on_step=None):
+        """
+        Generator version of apply() through cmds, for builds that give control back to Maya while they run.
+        Creates chunk_size nodes or connections per step and yields (operations done, operation count) after
+        each step. The BuildReport is the return value of the generator.
+        Every step is its own undo chunk, so what the user does between two steps stays out of the build.
+        on_step(report) is called at the end of each step inside its chunk, for work that has to be undone with
+        the build (the manifest). Closing the generator early, or a step failing, rolls back exactly what the
+        build did: created nodes are deleted, broken connections and replaced inputs or values are restored.
+        """
+        report = BuildReport(self.name)
+        start = time.perf_counter()
+        total = len(self.disconnects) + len(self.nodes) + len(self.values) + len(self.edges)
+        previous = self._previous_state()
+        operations = self._cmds_operations(report)
+        done = 0
+
+        try:
+            while True:
+                cmds.undoInfo(openChunk=True, chunkName=self.name)
+                cmds.refresh(suspend=True)
+                try:
+                    done += sum(1 for _ in islice(operations, chunk_size))
+                    if on_step:
+                        on_step(report)
+                finally:
+                    cmds.refresh(suspend=False)  # The viewport and the UI may redraw between steps
+                    cmds.undoInfo(closeChunk=True)
+                if done >= total:
+                    break
+                yield done, total
+        except BaseException:  # GeneratorExit included, the build was cancelled
+            self._roll_back(report, *previous)
+            raise
+
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def _previous_state(self):
+        """
+        (inputs, values) the plan replaces on nodes it doesn't create: destination plug -> source plug of their
+        connections and plug -> value of their planned attributes. One listConnections call, plus one getAttr
+        per value planned on an existing node.
+        """
+        nodes = list(dict.fromkeys(destination.partition(".")[0] for _, destination in self.edges + self.disconnects
+                                   if destination.partition(".")[0] not in self._planned))
+        connected = cmds.listConnections(nodes, source=True, destination=False, plugs=True, connections=True,
+                                         skipConversionNodes=True) if nodes else None
+        connected = connected or []
+        values = {plug: cmds.getAttr(plug) for plug, _ in self.values if plug.partition(".")[0] not in self._planned}
+        return dict(zip(connected[::2], connected[1::2])), values
+
+    def _roll_back(self, report, inputs, values):
+        """Undo the part of the plan an apply_steps() call did, in one undo chunk."""
+        name_map = report.name_map
+        created_names = set(name_map.values())
+        cmds.undoInfo(openChunk=True, chunkName=self.name + "RollBack")
+        try:
+            # Connections to the created nodes go with them
+            created = cmds.ls(list(name_map.values())) if name_map else None
+            if created:
+                cmds.delete(created)
+
+            # Destination plug of the existing nodes -> (source connected by the build, source to restore)
+            restore = {destination: (None, source) for source, destination in self.disconnects[:report.edges_removed]}
+            for source, destination in self.edges[:report.edges_created]:
+                if destination.partition(".")[0] not in self._planned:
+                    restore[destination] = (_remap_plug(source, name_map), inputs.get(destination))
+            for destination, (made, source) in restore.items():
+                if source is not None:
+                    if not cmds.isConnected(source, destination):
+                        cmds.connectAttr(source, destination, force=True)
+                elif made is not None and made.partition(".")[0] not in created_names:
+                    if cmds.isConnected(made, destination):
+                        cmds.disconnectAttr(made, destination)
+
+            for plug, value in self.values[:report.values_set]:
+                if plug in values:
+                    previous = values[plug]
+                    if isinstance(previous, str):
+                        cmds.setAttr(plug, previous, type="string")
+                    elif previous is not None:
+                        cmds.setAttr(plug, previous)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+    def _apply_cmds(self, report):
+        for _ in self._cmds_operations(report):
+            pass
+
+    def _cmds_operations(self, report):
+        # Yields after every node or connection made, so apply_steps() can split the work.
+        # The report counts tell _roll_back() which operations were done.
+        for source, destination in self.disconnects:
+            cmds.disconnectAttr(source, destination)
+            report.edges_removed += 1
+            yield
+
+        name_map = report.name_map
+        for name, node_type, as_utility in self.nodes:
+            if as_utility:
+                name_map[name] = cmds.shadingNode(node_type, asUtility=True, name=name)
+            else:
+                name_map[name] = cmds.createNode(node_type, name=name)
+            report.nodes_created += 1
+            yield
+
+        for plug, value in self.values:
+            if isinstance(value, str):
+                cmds.setAttr(_remap_plug(plug, name_map), value, type="string")
+            else:
+                cmds.setAttr(_remap_plug(plug, name_map), value)
+            report.values_set += 1
+            yield
+
+        for source, destination in self.edges:
+            cmds.connectAttr(_remap_plug(source, name_map), _remap_plug(destination, name_map), force=True)
+            report.edges_created += 1
+            yield
+
+    def _apply_api(self, report):
+        # The modifier is not registered in Maya's undo queue, which is why it is handed back on the report
+        import maya.api.OpenMaya as om
+
+        modifier = om.MDGModifier()
+        report.modifier = modifier
+
+        for source, destination in self.disconnects:
+            modifier.disconnect(_get_plug(om, source), _get_plug(om, destination))
+            report.edges_removed += 1
+
+        created = []
+        for name, node_type, as_utility in self.nodes:
+            node = modifier.createNode(node_type)
+            modifier.renameNode(node, name)
+            created.append((name, node))
+        modifier.doIt()  # Nodes have to exist before their plugs can be looked up
+
+        name_map = report.name_map
+        for name, node in created:
+            name_map[name] = om.MFnDependencyNode(node).name()
+            report.nodes_created += 1
+
+        for plug, value in self.values:
+            _set_plug_value(modifier, _get_plug(om, _remap_plug(plug, name_map)), value)
+            report.values_set += 1
+
+        for source, destination in self.edges:
+            source_plug = _get_plug(om, _remap_plug(source, name_map))
+            destination_plug = _get_plug(om, _remap_plug(destination, name_map))
+            if destination_plug.isDestination:  # Same as connectAttr force=True
+                modifier.disconnect(destination_plug.source(), destination_plug)
+            modifier.connect(source_plug, destination_plug)
+            report.edges_created += 1
+        modifier.doIt()
+
+
+class GraphDiff:
+    """Result of GraphBuilder.diff(): a builder with the missing part of the plan, plus what already exists."""
+
+    def __init__(self, builder):
+        self.builder = builder
+        self.existing_nodes = 0
+        self.existing_edges = 0
+        self.conflicts = []  # Planned nodes that exist in the scene with another type
+
+    def is_empty(self):
+        return (not self.builder.nodes and not self.builder.edges and not self.builder.disconnects
+                and not self.builder.values)
+
+    def describe(self):
+        lines = [f"{self.existing_nodes} nodes and {self.existing_edges} connections already exist, missing:",
+                 self.builder.describe()]
+        lines.extend(f"  conflict {conflict}" for conflict in self.conflicts)
+        return "\n".join(lines)
+
+
+def _remap_plug(plug, name_map):
+    """Swap the node part of a planned plug for the name Maya actually gave the node."""
+    node, _, attribute = plug.partition(".")
+    return f"{name_map.get(node, node)}.{attribute}"
+
+
+def _get_plug(om, plug):
+    selection = om.MSelectionList()
+    selection.add(plug)
+    return selection.getPlug(0)
+
+
+def _set_plug_value(modifier, plug, value):
+    # bool is checked first, it's also an int
+    if isinstance(value, bool):
+        modifier.newPlugValueBool(plug, value)
+    elif isinstance(value, int):
+        modifier.newPlugValueInt(plug, value)
+    elif isinstance(value, str):
+        modifier.newPlugValueString(plug, value)
+    else:
+        modifier.newPlugValueDouble(plug, value)
@@ -0,0 +1,162 @@
+"""
+Switchable instrumentation around maya.cmds.
+
+The rig_setup modules import cmds from here instead of maya.cmds:
+    from zanimTools.rig_setup.core.instrumentation import cmds
+
+While disabled, cmds hands out the real maya.cmds functions (cached on first lookup, so the only overhead is
+the attribute lookup every module already does). While enabled, every call is recorded with its command,
+duration and calling function:
+    with profile("Build Lip Nodes") as profiler:
+        create_lip_nodes(...)
+    print(profiler.report())
+    profiler.write_chrome_trace("lips.json")  # Open in chrome://tracing or https://ui.perfetto.dev
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Profiler currently recording, None when instrumentation is disabled
+_active = None
+
+
+class CallStats:
+    __slots__ = ("count", "total", "callers")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.callers = defaultdict(int)  # "module.function" -> call count
+
+
+class Profiler:
+    """Maya-call records of one instrumented operation."""
+
+    def __init__(self, label="rigSetup"):
+        self.label = label
+        self.stats = defaultdict(CallStats)
+        self.events = []  # (command, caller, start, duration) for the Chrome trace
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+
+    def record(self, command, caller, start, duration):
+        stats = self.stats[command]
+        stats.count += 1
+        stats.total += duration
+        stats.callers[caller] += 1
+        self.events.append((command, caller, start, duration))
+
+    def total_calls(self):
+        return sum(stats.count for stats in self.stats.values())
+
+    def report(self):
+        """Table of commands sorted by cumulative time, with their main callers."""
+        maya_time = sum(stats.total for stats in self.stats.values())
+        lines = [f"{self.label}: {self.total_calls()} Maya calls, {maya_time * 1000.0:.1f} ms in Maya "
+                 f"of {self.elapsed * 1000.0:.1f} ms total",
+                 f"  {'command':<20} {'calls':>7} {'total ms':>10} {'avg us':>9}  callers"]
+        for command, stats in sorted(self.stats.items(), key=lambda item: item[1].total, reverse=True):
+            callers = ", ".join(f"{caller} x{count}" for caller, count in
+                                sorted(stats.callers.items(), key=lambda item: item[1], reverse=True)[:3])
+            lines.append(f"  {command:<20} {stats.count:>7} {stats.total * 1000.0:>10.2f} "
+                         f"{stats.total / stats.count * 1000000.0:>9.1f}  {callers}")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """Events in the Chrome trace event format (complete events, microseconds)."""
+        pid = os.getpid()
+        tid = threading.get_ident()
+        events = [{"name": self.label, "cat": "operation", "ph": "X", "pid": pid, "tid": tid,
+                   "ts": 0.0, "dur": self.elapsed * 1000000.0}]
+        for command, caller, start, duration in self.events:
+            events.append({"name": command, "cat": "maya.cmds", "ph": "X", "pid": pid, "tid": tid,
+                           "ts": (start - self.start) * 1000000.0, "dur": duration * 1000000.0,
+                           "args": {"caller": caller}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path):
+        with open(path, "w") as handle:
+            json.dump(self.chrome_trace(), handle)
+        return path
+
+
+class _CmdsProxy:
+    """Stands in for the maya.cmds module, see the module docstring."""
+
+    def __getattr__(self, name):
+        import maya.cmds  # Resolved on use, so a headless stand-in installed later is picked up
+
+        function = getattr(maya.cmds, name)
+        if _active is not None and callable(function):
+            function = _instrument(name, function)
+        # Cache on the proxy: next lookups don't go through __getattr__ until enable()/disable() clears it
+        setattr(self, name, function)
+        return function
+
+    def _reset(self):
+        self.__dict__.clear()
+
+
+cmds = _CmdsProxy()
+
+
+def _instrument(name, function):
+    perf_counter = time.perf_counter
+
+    def instrumented(*args, **kwargs):
+        profiler = _active
+        if profiler is None:
+            return function(*args, **kwargs)
+        frame = sys._getframe(1)
+        caller = f"{frame.f_globals.get('__name__', '?').rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.record(name, caller, start, perf_counter() - start)
+
+    instrumented.__name__ = name
+    return instrumented
+
+
+def enable(label="rigSetup"):
+    """Start recording Maya calls and return the Profiler receiving them."""
+    global _active
+    _active = Profiler(label)
+    cmds._reset()
+    return _active
+
+
+def disable():
+    """Stop recording and return the Profiler that was recording (or None)."""
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.elapsed = time.perf_counter() - profiler.start
+    cmds._reset()
+    return profiler
+
+
+def is_enabled():
+    return _active is not None
+
+
+@contextmanager
+def profile(label="rigSetup", report=False, trace_path=None):
+    """
+    Record the Maya calls made inside the block.
+    report prints the table when the block ends, trace_path writes a Chrome-trace JSON there.
+    """
+    profiler = enable(label)
+    try:
+        yield profiler
+    finally:
+        disable()
+        if report:
+            print(profiler.report())
+        if trace_path:
+            profiler.write_chrome_trace(trace_path)
@@ -0,0 +1,113 @@
+from zanimTools.rig_setup.core import scene_events
+from zanimTools.rig_setup.core.instrumentation import cmds
+
+# Mirror indexes already built, keyed by the NameParser they were built with
+_indexes = {}
+
+
+class MirrorIndex:
+    """
+    Side-stripped name -> {"L": name, "R": name, "C": name} map of every transform in the scene.
+
+    Built with a single cmds.ls call, so mirroring a selection or checking that a counterpart exists is a
+    dictionary lookup instead of one objExists call per node. Use get_mirror_index() to get a shared index
+    that follows the scene events (see scene_events) instead of being rebuilt.
+    """
+
+    def __init__(self, parser, node_type="transform"):
+        self.parser = parser
+        self.node_type = node_type
+        self.pairs = {}
+        self.names = set()
+        self.dirty = True
+
+    def build(self):
+        self.pairs = {}
+        self.names = set(cmds.ls(type=self.node_type) or [])
+        parse = self.parser.parse
+        for name in self.names:
+            side = parse(name).side
+            if side is not None:
+                self.pairs.setdefault(self.parser.mirror_key(name), {})[side] = name
+        self.dirty = False
+        return self
+
+    def add(self, name):
+        """Index one more node (from a scene event), nothing to do while the index is dirty."""
+        if self.node_type != "transform":  # Events only tell transforms apart, rebuild on next use
+            self.dirty = True
+        if self.dirty or name in self.names:
+            return
+        self.names.add(name)
+        side = self.parser.parse(name).side
+        if side is not None:
+            self.pairs.setdefault(self.parser.mirror_key(name), {})[side] = name
+
+    def remove(self, name):
+        if self.dirty or name not in self.names:
+            return
+        self.names.discard(name)
+        side = self.parser.parse(name).side
+        key = self.parser.mirror_key(name)
+        sides = self.pairs.get(key)
+        if sides is not None and sides.get(side) == name:
+            del sides[side]
+            if not sides:
+                del self.pairs[key]
+
+    def exists(self, name):
+        return name in self.names
+
+    def counterpart(self, name):
+        """Existing node on the other side of name, or None (center nodes have no counterpart)."""
+        side = self.parser.parse(name).side
+        if side not in ("L", "R"):
+            return None
+        return self.pairs.get(self.parser.mirror_key(name), {}).get("R" if side == "L" else "L")
+
+    def counterparts(self, names):
+        """Existing counterparts of names, in the order of names."""
+        counterpart = self.counterpart
+        return [mirrored for mirrored in (counterpart(name) for name in names) if mirrored]
+
+
+def get_mirror_index(parser):
+    """
+    Shared MirrorIndex for a NameParser. It's kept up to date node by node from the scene events,
+    and only rebuilt after a scene reset (or on every call while scene events aren't active, see scene_events).
+    """
+    index = _indexes.get(parser)
+    if index is None:
+        index = _indexes[parser] = MirrorIndex(parser)
+    # Without scene events there's no way to know the index is still valid
+    if index.dirty or not scene_events.is_active():
+        index.build()
+    return index
+
+
+def invalidate_mirror_indexes(*args):
+    """Mark every index dirty, they are rebuilt on next use."""
+    for index in _indexes.values():
+        index.dirty = True
+
+
+def _on_node_added(name):
+    for index in _indexes.values():
+        index.add(name)
+
+
+def _on_node_removed(name):
+    for index in _indexes.values():
+        index.remove(name)
+
+
+def _on_node_renamed(name, previous_name):
+    for index in _indexes.values():
+        index.remove(previous_name)
+        index.add(name)
+
+
+scene_events.subscribe("node_added", _on_node_added)
+scene_events.subscribe("node_removed", _on_node_removed)
+scene_events.subscribe("node_renamed", _on_node_renamed)
+scene_events.subscribe("scene_reset", invalidate_mirror_indexes)
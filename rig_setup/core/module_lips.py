@@ -1,87 +1,166 @@
-import maya.cmds as cmds
+from zanimTools.rig_setup.core.rig_module import (RigModule, RigTemplate, create_module_nodes, prepare_build,
+                                                  rebuild_module_nodes, register_module, start_module_build)
 
+# Attributes of the jaw control driving the lip system
+JAW_CONTROL_ATTRS = ("StickyLips", "StickyTopBot", "PressLips")
 
-def create_lip_nodes(naming_convention, is_mirror_behavior):
+# How compact builds group controls into shared networks, see plan_compact_lip_nodes
+CLUSTER_LAYOUTS = ("row", "side_row")
+
+# Name of the lip system in the build manifests of the scene
+MANIFEST_SYSTEM = "lips"
+
+# Jaw-driven network of one lip control (or one lip row), its nodes are named prefix + suffix.
+# Bot networks get an extra _inv node between the pressed remap and the multiplier.
+LIP_NETWORK = RigTemplate(
+    "lipNetwork",
+    nodes=[
+        ("multiplyDivide", "{prefix}_multi"),
+        ("remapValue", "{prefix}_remap"),
+        ("remapValue", "{prefix}_remap_pressed"),
+        ("plusMinusAverage", "{prefix}_plus"),
+        ("remapValue", "{prefix}_inv", "is_bot"),
+    ],
+    edges=[
+        ("{jaw_joint_reference}.rotate", "{prefix}_multi.input1"),  # Lip rotation follows the jaw rotation
+        ("{jaw_control}.StickyLips", "{prefix}_remap_pressed.inputValue"),
+        ("{prefix}_remap_pressed.outValue", "{prefix}_inv.inputValue", "is_bot"),
+        ("{prefix}_remap.outValue", "{prefix}_remap_pressed.outputMax", "is_bot"),
+        ("{prefix}_inv.outValue", "{prefix}_multi.input2X", "is_bot"),
+        ("{prefix}_inv.outValue", "{prefix}_multi.input2Y", "is_bot"),
+        ("{prefix}_inv.outValue", "{prefix}_multi.input2Z", "is_bot"),
+        ("{prefix}_remap_pressed.outValue", "{prefix}_remap.outputMax", "!is_bot"),
+        ("{prefix}_remap.outValue", "{prefix}_multi.input2X", "!is_bot"),
+        ("{prefix}_remap.outValue", "{prefix}_multi.input2Y", "!is_bot"),
+        ("{prefix}_remap.outValue", "{prefix}_multi.input2Z", "!is_bot"),
+        ("{jaw_control}.StickyTopBot", "{prefix}_remap.inputValue"),
+        ("{prefix}_multi.output", "{prefix}_plus.input3D[0]"),
+        ("{jaw_control}.PressLips", "{prefix}_plus.input3D[1].input3Dz"),
+    ],
+)
+
+# Connections from the network named prefix into the _driver of a control
+LIP_DRIVER = RigTemplate(
+    "lipDriver",
+    edges=[
+        ("{prefix}_multi.outputX", "{control}{driver_suffix}.rotateX"),
+        ("{prefix}_multi.outputY", "{control}{driver_suffix}.rotateY"),
+        ("{prefix}_plus.output3Dz", "{control}{driver_suffix}.rotateZ"),
+    ],
+)
+
+
+def _lip_network_params(naming_convention, control, parsed):
+    # Every control gets its own network, named after the control
+    return {"prefix": control, "is_bot": parsed.pos == "Bot"}
+
+
+def _compact_lip_network_params(naming_convention, control, parsed, cluster):
+    if cluster not in CLUSTER_LAYOUTS:
+        raise ValueError(f"Unknown cluster layout {cluster}, expected one of {CLUSTER_LAYOUTS}")
+    row = "Bot" if parsed.pos == "Bot" else "Top"
+    side = (parsed.side or "C") if cluster == "side_row" else "C"
+    # Row networks are named like the controls: C_lipRowTop_multi, L_lipRowBot_remap...
+    return {"prefix": naming_convention.resolve("lipRow", row, side), "is_bot": row == "Bot"}
+
+
+LIPS = register_module(RigModule(
+    MANIFEST_SYSTEM, "Lip", LIP_NETWORK, LIP_DRIVER, _lip_network_params,
+    compact_params=_compact_lip_network_params,
+    required_nodes=["{jaw_joint_reference}"],
+    required_attrs=[f"{{jaw_control}}.{attr}" for attr in JAW_CONTROL_ATTRS],
+    builder_name="lipSetup",
+))
+
+
+def create_lip_nodes(naming_convention, is_mirror_behavior, use_api=False, dry_run=False, incremental=True,
+                     compact=False, cluster="row", control_list=None, rewire_policy="prompt"):
     """
     The main logic for setting up the lip system.
+    The whole selection is planned first and then built in one batch (one undo chunk),
+    set use_api to build through a single MDGModifier pass instead of cmds.
+
+    incremental: compare the plan with the scene and only create the missing nodes and connections,
+                 so running the build again doesn't create _multi1/_remap1 duplicates.
+    dry_run: print the plan (and what is missing from the scene) without touching the scene.
+    compact: drive the controls from shared per-row networks instead of one network per control,
+             cluster ("row" or "side_row") picks how they are grouped, see plan_compact_lip_nodes.
+    control_list: controls to build, defaults to the selection.
+    rewire_policy: what to do with mirrored drivers still following the controls when building without
+                   Mirror Behavior, "prompt" asks once for the whole selection, see rewiring.
+    Every build is recorded in the lips build manifest, see build_manifest.
+    Messages are buffered and printed once the build is done.
+    Returns the BuildReport of the build.
+    """
+    return create_module_nodes(LIPS, naming_convention, is_mirror_behavior, use_api=use_api, dry_run=dry_run,
+                               incremental=incremental, compact=compact, cluster=cluster,
+                               control_list=control_list, rewire_policy=rewire_policy)
+
+
+def start_lip_build(naming_convention, is_mirror_behavior, on_progress=None, on_finished=None, on_cancelled=None,
+                    chunk_size=200, incremental=True, compact=False, cluster="row", control_list=None,
+                    rewire_policy="prompt"):
+    """Non-blocking create_lip_nodes, see rig_module.start_module_build."""
+    return start_module_build(LIPS, naming_convention, is_mirror_behavior, on_progress=on_progress,
+                              on_finished=on_finished, on_cancelled=on_cancelled, chunk_size=chunk_size,
+                              incremental=incremental, compact=compact, cluster=cluster,
+                              control_list=control_list, rewire_policy=rewire_policy)
+
+
+def prepare_lip_build(naming_convention, is_mirror_behavior, log, dry_run=False, incremental=True, compact=False,
+                      cluster="row", control_list=None, rewire_policy="prompt"):
+    """
+    Validate and plan a lip build (see create_lip_nodes for the arguments), messages go to log.
+    Returns a ModuleBuild, or None when there is nothing to apply (invalid selection, dry run, up to date...).
+    """
+    return prepare_build(LIPS, naming_convention, is_mirror_behavior, log, dry_run=dry_run, incremental=incremental,
+                         compact=compact, cluster=cluster, control_list=control_list, rewire_policy=rewire_policy)
+
+
+def rebuild_lip_nodes(naming_convention, use_api=False):
+    """
+    Delete the recorded lip system and build it again for the same controls and options, with the current
+    naming convention. Only the nodes of the manifest are touched, returns the BuildReport of the new build.
+    """
+    return rebuild_module_nodes(LIPS, naming_convention, use_api=use_api)
+
+
+def validate_lip_selection(naming_convention, control_list, is_mirror_behavior):
+    """Check the controls and the jaw setup the lip system connects to, returns a ValidationReport."""
+    return LIPS.validate(naming_convention, control_list, is_mirror_behavior)
+
+
+def plan_lip_nodes(naming_convention, control_list, is_mirror_behavior, builder=None, log=None):
     """
-    control_list = cmds.ls(sl=True)
-
-    # Check if at least one controller is selected
-    if len(control_list) < 1:
-        cmds.warning("Please select at least one controller.")
-        return
-
-    # Validate mirror behavior conditions
-    if is_mirror_behavior:
-        # Collect names without side prefixes to check for duplicates
-        stripped_names = [ctrl.replace(naming_convention.side_l, "").replace(naming_convention.side_r, "") for ctrl in control_list]
-        duplicates = [name for name in stripped_names if stripped_names.count(name) > 1]
-
-        # If any duplicates exist, both sides of the same control are selected
-        if duplicates:
-            cmds.warning("Mirror Behavior expects only one side of each controller to be selected.")
-            return
-
-    def create_nodes_for_selected(control, is_mirror_behavior):
-
-        # Create and name nodes for the selected controllers
-        cmds.shadingNode("multiplyDivide", asUtility=True, name=control + "_multi")
-        cmds.shadingNode("remapValue", asUtility=True, name=control + "_remap")
-        cmds.shadingNode("remapValue", asUtility=True, name=control + "_remap_pressed")
-        cmds.shadingNode("plusMinusAverage", asUtility=True, name=control + "_plus")
-        # Conditionally create the _inv node if pos_bot_name is in the name
-        if naming_convention.pos_bot_name in control:
-            cmds.shadingNode("remapValue", asUtility=True, name=control + "_inv")
-
-        cmds.connectAttr(naming_convention.jaw_joint_reference + ".rotate", control + "_multi.input1", force=True)  # Connect Jaw rotate with the multiply node (to allow lip rotation to match jaw rotation)
-        cmds.connectAttr(naming_convention.jaw_control + ".StickyLips", control + "_remap_pressed.inputValue", force=True)  # Connect Jaw controller attribute "Sticky Lips" to the input value of the _remap_pressed node
-
-        if naming_convention.pos_bot_name in control:
-            cmds.connectAttr(control + "_remap_pressed.outValue", control + "_inv.inputValue", force=True)  # Conditionally connect the _remap_pressed.outValue
-            cmds.connectAttr(control + "_remap.outValue", control + "_remap_pressed.outputMax", force=True)  # Conditionally connect _remap outValue to the remap_pressed outputMax
-            # Conditionally connect outValue of appropriated node to the input 2 of the multiplier node (to multiply with the jaw rotation)
-            cmds.connectAttr(control + "_inv.outValue", control + "_multi.input2X", force=True)
-            cmds.connectAttr(control + "_inv.outValue", control + "_multi.input2Y", force=True)
-            cmds.connectAttr(control + "_inv.outValue", control + "_multi.input2Z", force=True)
-        else:
-            cmds.connectAttr(control + "_remap_pressed.outValue", control + "_remap.outputMax", force=True)
-            cmds.connectAttr(control + "_remap.outValue", control + "_multi.input2X", force=True)
-            cmds.connectAttr(control + "_remap.outValue", control + "_multi.input2Y", force=True)
-            cmds.connectAttr(control + "_remap.outValue", control + "_multi.input2Z", force=True)
-
-        cmds.connectAttr(naming_convention.jaw_control + ".StickyTopBot", control + "_remap.inputValue", force=True)  # Connect Jaw controller attribute "Sticky Top Bot" to the input value of the _remap node
-        cmds.connectAttr(control + "_multi.output", control + "_plus.input3D[0]", force=True)  # Connect _multi outputs to the correct nodes and into the _drivers
-        cmds.connectAttr(control + "_multi.outputX", control + "_driver.rotateX", force=True)
-        cmds.connectAttr(control + "_multi.outputY", control + "_driver.rotateY", force=True)
-        cmds.connectAttr(naming_convention.jaw_control + ".PressLips", control + "_plus.input3D[1].input3Dz", force=True)  # Connect "Press Lips" attribute with the add node and then this node to the controller_driver
-        cmds.connectAttr(control + "_plus.output3Dz", control + "_driver.rotateZ", force=True)
-
-        # If two controllers are selected and shall be controlled by the same system, do so on the second one as well
-        if is_mirror_behavior:
-            mirrored_control = None  # Initialize mirrored_control
-            if control.startswith(naming_convention.side_l):
-                mirrored_control = control.replace(naming_convention.side_l, naming_convention.side_r, 1)
-                print(f"Mirrored control result: {mirrored_control}, From: {control}")
-            elif control.startswith(naming_convention.side_r):
-                mirrored_control = control.replace(naming_convention.side_r, naming_convention.side_l, 1)
-                print(f"Mirrored control result: {mirrored_control}, From: {control}")
-
-            # Check if mirrored_control was assigned and if the mirrored control exists
-            if mirrored_control and cmds.objExists(mirrored_control + "_driver"):
-                cmds.connectAttr(control + "_multi.outputX", mirrored_control + "_driver.rotateX", force=True)
-                cmds.connectAttr(control + "_multi.outputY", mirrored_control + "_driver.rotateY", force=True)
-                cmds.connectAttr(control + "_plus.output3Dz", mirrored_control + "_driver.rotateZ", force=True)
-                print(f"Mirrored lip setup completed for: {mirrored_control}")
-            else:
-                if control.startswith(naming_convention.side_c):
-                    print(f"Skipped mirror on {control} because it's in the center.")
-                if control.startswith(naming_convention.side_l) or control.startswith(naming_convention.side_r):
-                    print(f"Mirrored control could not be set up for: {control}. Check naming conventions or existence.")
-
-        print(f"Lip setup completed for {control}")
-
-    # Process each control in the selection
-    for control in control_list:
-        create_nodes_for_selected(control, is_mirror_behavior)
-    cmds.warning("Lip setup complete")
+    Collect the nodes and connections of the lip system for every control into a GraphBuilder.
+    Nothing is created in the scene until the builder is applied. Messages go to log (a BuildLog), or are printed.
+    """
+    return LIPS.plan(naming_convention, control_list, is_mirror_behavior, builder=builder, log=log)
+
+
+def plan_compact_lip_nodes(naming_convention, control_list, is_mirror_behavior, builder=None, cluster="row",
+                           log=None):
+    """
+    Compact variant of plan_lip_nodes: one shared network per lip row drives every control of the row.
+
+    Bot controls share one network and every other control shares the Top one, so the node count stays at 9
+    instead of growing by ~5 nodes per control, and the jaw attributes only fan out to the row networks.
+    With the default remap curves every control gets the same rotation as with the per-control graph,
+    but the curves can't be tweaked per control in this mode.
+
+    cluster: "row" builds one network per row (C_lipRowTop...). "side_row" builds one per side and row
+             (L_lipRowTop, R_lipRowTop, C_lipRowTop...), so each side is an independent branch of the graph that
+             Maya's parallel evaluation manager can evaluate (and cache) on its own.
+    """
+    return LIPS.plan(naming_convention, control_list, is_mirror_behavior, builder=builder, compact=True,
+                     cluster=cluster, log=log)
+
+
+def plan_lip_network(naming_convention, builder, prefix, is_bot):
+    """Plan the jaw-driven network of one lip control (or one lip row), its nodes are named prefix + suffix."""
+    return LIP_NETWORK.instantiate(builder, dict(naming_convention.as_dict(), prefix=prefix, is_bot=is_bot))
+
+
+def connect_lip_driver(builder, prefix, control):
+    """Plan the connections from the network named prefix into the _driver of control."""
+    return LIP_DRIVER.instantiate(builder, {"prefix": prefix, "control": control, "driver_suffix": "_driver"})
@@ -0,0 +1,187 @@
+"""
+Name parsing engine for the naming convention.
+
+A name is split on the separator into tokens. The side, body and type tokens are found by their index
+(side_index, pos_index, type_index), and the body token is parsed as "base + position + number":
+    L_lipTop01_CTL -> side="L", base="lip", pos="Top", number="01", type="CTL"
+
+Side, position and type values are returned as their canonical keys ("L", "Top", "CTL"...), whatever the
+tokens of the convention are, so code can compare against them regardless of the studio's naming.
+Nothing here talks to Maya, so names can be parsed, resolved and mirrored by the thousand in plain Python.
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+ParsedName = namedtuple("ParsedName", "name tokens side base pos number type")
+
+# Canonical keys -> NamingConvention setting holding the token used in names
+SIDE_KEYS = {"L": "side_l", "R": "side_r", "C": "side_c"}
+POS_KEYS = {"Top": "pos_top_name", "Bot": "pos_bot_name", "Corner": "pos_corner_name",
+            "Mid": "pos_mid_name", "Front": "pos_front_name", "Back": "pos_back_name"}
+TYPE_KEYS = {"JNT": "type_joint", "CTL": "type_control", "GRP": "type_group",
+             "LOC": "type_locator", "FOL": "type_follicle"}
+
+_NUMBER_PATTERN = re.compile(r"^(?P<base>.*?)(?P<number>\d*)$")
+
+# Parsers already compiled, keyed by the settings they were built from
+_parsers = {}
+
+
+class NameParser:
+    """
+    Compiled parser/resolver for one naming convention.
+    Build it from the convention settings: NameParser(**naming_convention.as_dict()), extra keys are ignored.
+    """
+
+    def __init__(self, separator="_",
+                 side_l="L", side_r="R", side_c="C", side_index=0,
+                 pos_top_name="Top", pos_bot_name="Bot", pos_corner_name="Corner",
+                 pos_mid_name="Mid", pos_front_name="Front", pos_back_name="Back", pos_index=1,
+                 type_joint="JNT", type_control="CTL", type_group="GRP",
+                 type_locator="LOC", type_follicle="FOL", type_index=2,
+                 cache_size=131072, **ignored):
+        values = locals()
+        self.separator = separator
+        self.side_index = int(side_index)
+        self.pos_index = int(pos_index)
+        self.type_index = int(type_index)
+
+        # Lookup tables: canonical key -> token, and token -> canonical key
+        self.side_tokens = {key: values[setting] for key, setting in SIDE_KEYS.items()}
+        self.pos_tokens = {key: values[setting] for key, setting in POS_KEYS.items()}
+        self.type_tokens = {key: values[setting] for key, setting in TYPE_KEYS.items()}
+        # Cleared fields (empty tokens) are left out, an empty token would match anywhere
+        self._side_lookup = {token: key for key, token in self.side_tokens.items() if token}
+        self._pos_lookup = {token: key for key, token in self.pos_tokens.items() if token}
+        self._type_lookup = {token: key for key, token in self.type_tokens.items() if token}
+        self._mirror_sides = {side_l: side_r, side_r: side_l} if side_l and side_r else {}
+
+        # Last position token in the body wins ("lipCornerTop01" is a Top), longest tokens are tried first.
+        # A token has to end on a camelCase boundary: "lipBottom01" holds no "Bot".
+        pos_alternatives = "|".join(re.escape(token) for token in sorted(self._pos_lookup, key=len, reverse=True))
+        self._body_pattern = re.compile(rf"^(?P<base>.*)(?P<pos>{pos_alternatives or '(?!)'})(?![a-z])"
+                                        rf"(?P<suffix>\D*)(?P<number>\d*)$")
+
+        self.parse = lru_cache(maxsize=cache_size)(self._parse)
+        self.mirror = lru_cache(maxsize=cache_size)(self._mirror)
+
+    def cache_clear(self):
+        self.parse.cache_clear()
+        self.mirror.cache_clear()
+
+    def _token(self, tokens, index):
+        return tokens[index] if -len(tokens) <= index < len(tokens) else None
+
+    def _parse(self, name):
+        """Split a name into a ParsedName. Tokens that don't match the convention are returned as None."""
+        tokens = tuple(name.split(self.separator))
+        side = self._side_lookup.get(self._token(tokens, self.side_index))
+        node_type = self._type_lookup.get(self._token(tokens, self.type_index))
+
+        body = self._token(tokens, self.pos_index) or ""
+        match = self._body_pattern.match(body)
+        if match:
+            base = match.group("base") + match.group("suffix")
+            pos = self._pos_lookup[match.group("pos")]
+            number = match.group("number")
+        else:
+            match = _NUMBER_PATTERN.match(body)
+            base, pos, number = match.group("base"), None, match.group("number")
+
+        return ParsedName(name, tokens, side, base, pos, number or None, node_type)
+
+    def _mirror(self, name):
+        """Swap the side token of a name (L <-> R). Names without a left/right side are returned as-is."""
+        tokens = name.split(self.separator)
+        side_token = self._token(tokens, self.side_index)
+        mirrored = self._mirror_sides.get(side_token)
+        if mirrored is None:
+            return name
+        tokens[self.side_index] = mirrored
+        return self.separator.join(tokens)
+
+    def convert(self, name, target):
+        """
+        Same name in the convention of another NameParser: side, position and type tokens are translated and
+        moved to the indices of the target, extra tokens (_driver, _multi...) stay at the end.
+            L_lipTop01_CTL_multi -> CTL_lipUp01_Lf_multi
+        Like resolve(), an unknown side or type token is taken as a missing slot (C_lipRowTop_multi has no type).
+        Names without a known side or type token are returned as-is.
+        """
+        if target is self:
+            return name
+        if min(self.side_index, self.pos_index, self.type_index, target.side_index, target.pos_index,
+               target.type_index) < 0:
+            raise ValueError("Names can't be converted between conventions using negative token indices")
+
+        tokens = name.split(self.separator)
+        by_index = {self.side_index: ("side", self._side_lookup), self.pos_index: ("pos", None),
+                    self.type_index: ("type", self._type_lookup)}
+        # Try the full layout first, then without the type and without the side, like the slots resolve() skips
+        for skipped in (None, "type", "side"):
+            slots = [by_index[index] for index in sorted(by_index) if by_index[index][0] != skipped]
+            if len(tokens) < len(slots):
+                continue
+            keys = {slot: lookup.get(token) if lookup else token for (slot, lookup), token in zip(slots, tokens)}
+            if all(keys.values()):
+                break
+        else:
+            return name
+
+        body = keys["pos"]
+        match = self._body_pattern.match(body)
+        if match:
+            pos_token = target.pos_tokens.get(self._pos_lookup[match.group("pos")], "")
+            body = match.group("base") + pos_token + match.group("suffix") + match.group("number")
+        converted = {target.pos_index: body}
+        if "side" in keys:
+            converted[target.side_index] = target.side_tokens[keys["side"]]
+        if "type" in keys:
+            converted[target.type_index] = target.type_tokens[keys["type"]]
+        return target.separator.join([converted[index] for index in sorted(converted)] + tokens[len(keys):])
+
+    def mirror_key(self, name):
+        """Name tokens with the side token blanked out, the same for both sides of a pair."""
+        tokens = list(self.parse(name).tokens)
+        if -len(tokens) <= self.side_index < len(tokens):
+            tokens[self.side_index] = None
+        return tuple(tokens)
+
+    def parse_many(self, names):
+        parse = self.parse
+        return [parse(name) for name in names]
+
+    def mirror_many(self, names):
+        mirror = self.mirror
+        return [mirror(name) for name in names]
+
+    def side_of(self, name):
+        return self.parse(name).side
+
+    def pos_of(self, name):
+        return self.parse(name).pos
+
+    def resolve(self, base_name, pos_name, side_name, number=None, type=None):
+        """
+        Generate a full name from canonical keys ("L", "Top", "CTL"...), placing each token at its index.
+            resolve("lip", "Top", "L", "01", "CTL") -> "L_lipTop01_CTL"
+        """
+        body = f"{base_name or ''}{self.pos_tokens.get(pos_name, '')}{number or ''}"
+        slots = {}
+        if self.side_tokens.get(side_name):
+            slots[self.side_index] = self.side_tokens[side_name]
+        if body:
+            slots[self.pos_index] = body
+        if self.type_tokens.get(type):
+            slots[self.type_index] = self.type_tokens[type]
+        return self.separator.join(slots[index] for index in sorted(slots))
+
+
+def parser_for(settings):
+    """Shared NameParser for a settings mapping, compiled once per distinct convention."""
+    key = tuple(sorted((k, v) for k, v in settings.items() if isinstance(v, (str, int))))
+    parser = _parsers.get(key)
+    if parser is None:
+        parser = _parsers[key] = NameParser(**settings)
+    return parser
@@ -0,0 +1,112 @@
+"""
+Naming convention presets shared between scenes and artists, stored as JSON files on disk.
+
+Presets are looked up in the folders of the ZANIMTOOLS_PRESET_PATH environment variable (os.pathsep separated,
+e.g. a show folder on the network) and then in the user folder. A preset is a JSON object keyed like
+scene_data.DEFAULT_SETTINGS, it only needs the values that differ from the defaults.
+Files are parsed once per session and kept in a process-wide cache, re-read only when their mtime changes.
+"""
+import json
+import os
+
+from zanimTools.rig_setup.core.scene_data import DEFAULT_SETTINGS
+
+PRESET_PATH_ENV = "ZANIMTOOLS_PRESET_PATH"
+# Preset applied to scenes that have no settings yet, by name
+DEFAULT_PRESET_ENV = "ZANIMTOOLS_DEFAULT_PRESET"
+USER_PRESET_DIR = os.path.join(os.path.expanduser("~"), "zanimTools", "presets")
+PRESET_EXTENSION = ".json"
+
+# path -> (mtime_ns, settings) of every preset file read in this session
+_preset_cache = {}
+# folder -> (mtime_ns, {name: path}) of every preset folder listed in this session
+_folder_cache = {}
+
+
+def preset_dirs():
+    """Folders searched for presets, the first ones win when two folders have a preset with the same name."""
+    folders = [folder for folder in os.environ.get(PRESET_PATH_ENV, "").split(os.pathsep) if folder]
+    return folders + [USER_PRESET_DIR]
+
+
+def _list_folder(folder):
+    try:
+        mtime = os.stat(folder).st_mtime_ns
+    except OSError:
+        return {}
+    cached = _folder_cache.get(folder)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    presets = {entry.name[:-len(PRESET_EXTENSION)]: entry.path for entry in os.scandir(folder)
+               if entry.is_file() and entry.name.endswith(PRESET_EXTENSION)}
+    _folder_cache[folder] = (mtime, presets)
+    return presets
+
+
+def list_presets():
+    """name -> path of every preset available, sorted by name."""
+    presets = {}
+    for folder in reversed(preset_dirs()):
+        presets.update(_list_folder(folder))
+    return dict(sorted(presets.items()))
+
+
+def load_preset_file(path):
+    """Settings of a preset file, parsed only when the file changed since it was last read."""
+    mtime = os.stat(path).st_mtime_ns
+    cached = _preset_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path) as handle:
+            stored = json.load(handle)
+        cached = _preset_cache[path] = (mtime, {key: value for key, value in stored.items()
+                                                if key in DEFAULT_SETTINGS})
+    return dict(cached[1])
+
+
+def load_preset(name):
+    """Settings of a preset given by name, or by path to a preset file."""
+    if os.path.isfile(name):
+        return load_preset_file(name)
+    path = list_presets().get(name)
+    if path is None:
+        raise KeyError(f"No naming convention preset named {name} in {os.pathsep.join(preset_dirs())}")
+    return load_preset_file(path)
+
+
+def save_preset(name, settings, folder=None):
+    """Write settings as a preset, in the user folder by default. Returns the path of the file."""
+    folder = folder or USER_PRESET_DIR
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, name + PRESET_EXTENSION)
+    with open(path, "w") as handle:
+        json.dump({key: value for key, value in settings.items() if key in DEFAULT_SETTINGS}, handle,
+                  indent=4, sort_keys=True)
+    _preset_cache.pop(path, None)
+    return path
+
+
+def apply_preset(naming_convention, name):
+    """
+    Apply a preset to the scene of a NamingConvention, in one write of the settings node.
+    Values missing from the preset are reset to their default. Returns True when the settings changed.
+    """
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(load_preset(name))
+    return naming_convention.update_naming_convention(**settings)
+
+
+def default_preset():
+    """Settings of the preset named by ZANIMTOOLS_DEFAULT_PRESET, or None when there is none."""
+    name = os.environ.get(DEFAULT_PRESET_ENV)
+    if not name:
+        return None
+    try:
+        return load_preset(name)
+    except (KeyError, OSError, ValueError) as e:
+        print(f"Default naming convention preset not loaded: {e}")
+        return None
+
+
+def clear_cache():
+    _preset_cache.clear()
+    _folder_cache.clear()
@@ -0,0 +1,88 @@
+"""
+Mirror connections left on drivers when controls are rebuilt without Mirror Behavior.
+
+A control built with Mirror Behavior also drives the _driver of its mirrored control. Building it again without
+Mirror Behavior raises the question for every such pair: break the mirrored connections or keep mirroring.
+find_mirror_conflicts() collects every pair of a selection with one listConnections call, one policy answers
+for all of them, and apply_policy() adds the result to the build plan so it's applied in the same batch.
+"""
+from zanimTools.rig_setup.core.instrumentation import cmds
+from zanimTools.rig_setup.core.mirror_index import get_mirror_index
+
+# "prompt" asks once for the whole selection, see popup_utils.show_rewire_popup
+POLICIES = ("prompt", "disconnect", "mirror", "cancel")
+
+
+class MirrorConflict:
+    """A mirrored control whose driver is still connected to the network planned for control."""
+
+    def __init__(self, control, mirrored_control):
+        self.control = control
+        self.mirrored_control = mirrored_control
+        self.edges = []  # (source plug, mirrored driver plug) connections in the scene
+
+
+def find_mirror_conflicts(naming_convention, builder, control_list, driver_suffix="_driver", shared_prefixes=()):
+    """
+    MirrorConflicts of the controls of a build planned without Mirror Behavior.
+    Mirrored drivers are compared with the sources planned for the control's own driver: a mirrored driver
+    fed by the same plugs is still following the control. One listConnections call for the whole selection.
+    shared_prefixes: networks meant to drive several controls (compact builds), a mirrored driver following
+    one of them is part of the rig, not a leftover of Mirror Behavior.
+    """
+    mirror_index = get_mirror_index(naming_convention.parser)
+    selected = set(control_list)
+    shared = tuple(prefix + "_" for prefix in shared_prefixes)
+    planned_sources = {destination: source for source, destination in builder.edges
+                       if not (shared and source.partition(".")[0].startswith(shared))}
+
+    conflicts = {}  # mirrored driver plug -> (conflict, planned source)
+    for control in control_list:
+        mirrored_control = mirror_index.counterpart(control)
+        # Selected counterparts get their own network in this build anyway
+        if mirrored_control is None or mirrored_control in selected:
+            continue
+        if not mirror_index.exists(mirrored_control + driver_suffix):
+            continue
+        conflict = MirrorConflict(control, mirrored_control)
+        prefix = control + driver_suffix + "."
+        for destination, source in planned_sources.items():
+            if destination.startswith(prefix):
+                attr = destination[len(prefix):]
+                conflicts[f"{mirrored_control}{driver_suffix}.{attr}"] = (conflict, source)
+    if not conflicts:
+        return []
+
+    connected = cmds.listConnections(list(conflicts), source=True, destination=False, plugs=True,
+                                     connections=True, skipConversionNodes=True) or []
+    found = []
+    for destination, source in zip(connected[::2], connected[1::2]):
+        conflict, planned_source = conflicts.get(destination, (None, None))
+        if conflict is not None and source == planned_source:
+            if not conflict.edges:
+                found.append(conflict)
+            conflict.edges.append((source, destination))
+    return found
+
+
+def resolve_policy(conflicts, policy="prompt"):
+    """The policy applied to every conflict: "disconnect", "mirror" or "cancel". Prompts at most once."""
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown rewiring policy {policy}, expected one of {POLICIES}")
+    if policy != "prompt":
+        return policy
+    from zanimTools.rig_setup.ui.popup_utils import show_rewire_popup
+
+    answer = show_rewire_popup([(conflict.control, conflict.mirrored_control) for conflict in conflicts])
+    return {"Continue and disconnect": "disconnect", "Continue and mirror behavior": "mirror"}.get(answer, "cancel")
+
+
+def apply_policy(builder, conflicts, policy):
+    """Add the rewiring of a resolved policy to the plan: break the mirrored connections or keep them."""
+    for conflict in conflicts:
+        for source, destination in conflict.edges:
+            if policy == "disconnect":
+                builder.disconnect(source, destination)
+            elif policy == "mirror":
+                builder.connect(source, destination)
+    return builder
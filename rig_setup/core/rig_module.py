@@ -0,0 +1,348 @@
+"""
+Data-driven rig modules: a module is a declarative template of nodes and connections, built for N controls.
+
+    NETWORK = RigTemplate("lipNetwork",
+        nodes=[("multiplyDivide", "{prefix}_multi"),
+               ("remapValue", "{prefix}_inv", "is_bot")],  # Only for networks where is_bot is true
+        edges=[("{jaw_joint_reference}.rotate", "{prefix}_multi.input1"),
+               ("{prefix}_remap.outValue", "{prefix}_multi.input2X", "!is_bot")])
+
+Names and plugs are format strings filled with the naming convention settings ({jaw_control}...) and the
+parameters of each instance ({prefix}, {control}, flags...). A template is compiled once per combination of its
+flags and cached, instantiating it is then only string formatting into a GraphBuilder.
+
+A RigModule pairs a network template with the template connecting a network to a control's driver, and gets
+the whole build path of the lips: validation, per-control or compact planning, mirror behavior, rewiring,
+incremental diff, batched or chunked apply, build manifest.
+"""
+import string
+
+from zanimTools.rig_setup.core.build_log import BuildLog
+from zanimTools.rig_setup.core.build_manifest import (BuildManifest, delete_build, read_manifest, read_manifests,
+                                                      record_build, write_manifests)
+from zanimTools.rig_setup.core.deferred_build import DeferredBuild
+from zanimTools.rig_setup.core.graph_builder import GraphBuilder
+from zanimTools.rig_setup.core.instrumentation import cmds
+from zanimTools.rig_setup.core.mirror_index import get_mirror_index
+from zanimTools.rig_setup.core.rewiring import apply_policy, find_mirror_conflicts, resolve_policy
+from zanimTools.rig_setup.core.validation import validate_controls
+
+# Registered modules by name, see register_module
+MODULES = {}
+
+
+class RigTemplate:
+    """
+    Nodes (node_type, name) and edges (source plug, destination plug) of a network, with "{field}" placeholders.
+    Any entry can end with a flag name ("is_bot") or a negated one ("!is_bot"), it's only kept when the flag
+    (a parameter of the instance) matches.
+    """
+
+    def __init__(self, name, nodes=(), edges=()):
+        self.name = name
+        self.nodes = tuple(tuple(node) for node in nodes)
+        self.edges = tuple(tuple(edge) for edge in edges)
+        self.flags = tuple(sorted({entry[-1].lstrip("!") for entry in self.nodes if len(entry) > 2}
+                                  | {entry[-1].lstrip("!") for entry in self.edges if len(entry) > 2}))
+        formatter = string.Formatter()
+        self.fields = {field for entry in self.nodes + self.edges for text in entry
+                       for _, field, _, _ in formatter.parse(text) if field}
+        self._compiled = {}
+
+    def compile(self, params):
+        """(nodes, edges) of the template for the flags of params, computed once per flag combination."""
+        key = tuple(bool(params.get(flag)) for flag in self.flags)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            values = dict(zip(self.flags, key))
+            compiled = self._compiled[key] = (
+                tuple(node[:2] for node in self.nodes if _keep(node, 2, values)),
+                tuple(edge[:2] for edge in self.edges if _keep(edge, 2, values)),
+            )
+        return compiled
+
+    def instantiate(self, builder, params):
+        """Add one instance of the template to a GraphBuilder."""
+        nodes, edges = self.compile(params)
+        try:
+            for node_type, name in nodes:
+                builder.add_node(node_type, name.format_map(params))
+            for source, destination in edges:
+                builder.connect(source.format_map(params), destination.format_map(params))
+        except KeyError as e:
+            raise ValueError(f"Template {self.name} needs a value for {e}") from None
+        return builder
+
+
+class RigModule:
+    """
+    A rig module built on controls: one network per control (or per group of controls in compact builds),
+    connected to the driver of each control by the driver template.
+
+    network_params(naming_convention, control, parsed) -> parameters of the network of a control, "prefix"
+        names the network (one network is planned per prefix) and flags pick the template variant.
+    compact_params(naming_convention, control, parsed, cluster) -> same for compact builds, where controls
+        sharing a prefix share a network. None when the module has no compact build.
+    required_nodes / required_attrs: scene nodes and "node.attribute" plugs the networks connect to, as
+        templates filled with the naming convention settings.
+    """
+
+    def __init__(self, name, label, network, driver, network_params, compact_params=None, required_nodes=(),
+                 required_attrs=(), driver_suffix="_driver", builder_name=None):
+        self.name = name  # Name of the module in the build manifests
+        self.label = label  # Used in messages: "Lip setup complete..."
+        self.network = network
+        self.driver = driver
+        self.network_params = network_params
+        self.compact_params = compact_params
+        self.required_nodes = tuple(required_nodes)
+        self.required_attrs = tuple(required_attrs)
+        self.driver_suffix = driver_suffix
+        self.builder_name = builder_name or name + "Setup"
+
+    def requirements(self, naming_convention):
+        """(required nodes, required plugs) for the current naming convention."""
+        settings = naming_convention.as_dict()
+        return ([node.format_map(settings) for node in self.required_nodes],
+                [plug.format_map(settings) for plug in self.required_attrs])
+
+    def validate(self, naming_convention, control_list, is_mirror_behavior):
+        """Check the controls and the nodes the module connects to, returns a ValidationReport."""
+        required_nodes, required_attrs = self.requirements(naming_convention)
+        return validate_controls(naming_convention, control_list, is_mirror_behavior, driver_suffix=self.driver_suffix,
+                                 required_nodes=required_nodes, required_attrs=required_attrs)
+
+    def plan(self, naming_convention, control_list, is_mirror_behavior, builder=None, compact=False, cluster="row",
+             log=None):
+        """
+        Collect the nodes and connections of the module for every control into a GraphBuilder.
+        Nothing is created in the scene until the builder is applied. Messages go to log (a BuildLog), or are printed.
+        """
+        write = log.write if log is not None else print
+        if compact and self.compact_params is None:
+            raise ValueError(f"The {self.label} module has no compact build")
+        if builder is None:
+            builder = GraphBuilder(name=self.builder_name + ("Compact" if compact else ""))
+
+        # One ls call to know which drivers exist, instead of one objExists call per control
+        mirror_index = get_mirror_index(naming_convention.parser) if is_mirror_behavior else None
+        settings = naming_convention.as_dict()
+        planned_networks = set()
+
+        for control in control_list:
+            parsed = naming_convention.parse(control)
+            if compact:
+                params = self.compact_params(naming_convention, control, parsed, cluster)
+            else:
+                params = self.network_params(naming_convention, control, parsed)
+            params = dict(settings, driver_suffix=self.driver_suffix, **params)
+
+            if params["prefix"] not in planned_networks:
+                planned_networks.add(params["prefix"])
+                self.network.instantiate(builder, params)
+            self.driver.instantiate(builder, dict(params, control=control))
+
+            # If two controllers are selected and shall be controlled by the same system,
+            # do so on the second one as well
+            if is_mirror_behavior:
+                mirrored_control = self._mirrored_driver_control(naming_convention, mirror_index, control,
+                                                                 parsed.side, write)
+                if mirrored_control:
+                    self.driver.instantiate(builder, dict(params, control=mirrored_control))
+
+            write(f"{self.label} setup planned for {control}")
+        return builder
+
+    def shared_prefixes(self, naming_convention, control_list, cluster="row"):
+        """Prefixes of the networks a compact build shares between controls."""
+        return {self.compact_params(naming_convention, control, naming_convention.parse(control), cluster)["prefix"]
+                for control in control_list}
+
+    def _mirrored_driver_control(self, naming_convention, mirror_index, control, side, write=print):
+        """Mirrored control whose driver should follow control with Mirror Behavior, or None."""
+        mirrored_control = naming_convention.get_mirrored_name(control) if side in ("L", "R") else None
+
+        # Check if mirrored_control was assigned and if the mirrored control exists
+        if mirrored_control and mirror_index.exists(mirrored_control + self.driver_suffix):
+            write(f"Mirrored {self.label.lower()} setup planned for: {mirrored_control}, From: {control}")
+            return mirrored_control
+        if side == "C":
+            write(f"Skipped mirror on {control} because it's in the center.")
+        elif side in ("L", "R"):
+            write(f"Mirrored control could not be set up for: {control}. Check naming conventions or existence.")
+        return None
+
+
+class ModuleBuild:
+    """A validated module build: the full plan, the part of it left to apply and what to record once applied."""
+
+    def __init__(self, module, naming_convention, control_list, options, plan, builder):
+        self.module = module
+        self.naming_convention = naming_convention
+        self.control_list = control_list
+        self.options = options
+        self.plan = plan
+        self.builder = builder
+
+    def record(self, name_map):
+        """Store the plan in the build manifest of the module, with the names Maya gave to the nodes it created."""
+        record_build(BuildManifest.from_builder(self.module.name, self.plan, name_map, self.naming_convention,
+                                                self.control_list, self.options),
+                     self.naming_convention.settings_node)
+
+
+def register_module(module):
+    MODULES[module.name] = module
+    return module
+
+
+def prepare_build(module, naming_convention, is_mirror_behavior, log, dry_run=False, incremental=True,
+                  compact=False, cluster="row", control_list=None, rewire_policy="prompt"):
+    """
+    Validate and plan a module build (see create_module_nodes for the arguments), messages go to log.
+    Returns a ModuleBuild, or None when there is nothing to apply (invalid selection, dry run, up to date...).
+    """
+    if control_list is None:
+        control_list = cmds.ls(sl=True)
+
+    # Check if at least one controller is selected
+    if len(control_list) < 1:
+        cmds.warning("Please select at least one controller.")
+        return None
+
+    # Validate the whole selection (mirror conflicts, drivers, required attributes) before any node is created
+    report = module.validate(naming_convention, control_list, is_mirror_behavior)
+    if not report.is_valid():
+        cmds.warning(f"{module.label} setup stopped: {report.describe()}")
+        return None
+
+    builder = module.plan(naming_convention, control_list, is_mirror_behavior, compact=compact, cluster=cluster,
+                          log=log)
+
+    # Mirrored drivers still following the controls from a Mirror Behavior build: one answer for all of them
+    if not is_mirror_behavior:
+        shared_prefixes = module.shared_prefixes(naming_convention, control_list, cluster) if compact else ()
+        conflicts = find_mirror_conflicts(naming_convention, builder, control_list, module.driver_suffix,
+                                          shared_prefixes)
+        if conflicts:
+            policy = resolve_policy(conflicts, "cancel" if dry_run and rewire_policy == "prompt" else rewire_policy)
+            if policy == "cancel" and not dry_run:
+                cmds.warning(f"{module.label} setup cancelled, {len(conflicts)} mirrored controllers are still driven")
+                return None
+            apply_policy(builder, conflicts, policy)
+            log.write(f"{len(conflicts)} mirrored controllers: {policy}")
+
+    options = {"is_mirror_behavior": is_mirror_behavior, "compact": compact, "cluster": cluster}
+    build = ModuleBuild(module, naming_convention, control_list, options, builder, builder)
+    if incremental or dry_run:
+        diff = builder.diff()
+        if dry_run:
+            log.write(builder.describe())
+            log.write(diff.describe())
+            return None
+        if diff.conflicts:
+            cmds.warning(f"{module.label} setup stopped, {len(diff.conflicts)} nodes exist with another type: "
+                         f"{', '.join(diff.conflicts)}")
+            return None
+        if diff.is_empty():
+            # Still recorded, so scenes built before manifests existed get one (only written when it changes)
+            build.record({})
+            cmds.warning(f"{module.label} setup is already up to date")
+            return None
+        build.builder = diff.builder
+    return build
+
+
+def create_module_nodes(module, naming_convention, is_mirror_behavior, use_api=False, dry_run=False,
+                        incremental=True, compact=False, cluster="row", control_list=None, rewire_policy="prompt"):
+    """
+    Build a module on controls (the selection by default) in one batch, see module_lips.create_lip_nodes.
+    Returns the BuildReport of the build.
+    """
+    log = BuildLog()
+    try:
+        build = prepare_build(module, naming_convention, is_mirror_behavior, log, dry_run=dry_run,
+                              incremental=incremental, compact=compact, cluster=cluster, control_list=control_list,
+                              rewire_policy=rewire_policy)
+        if build is None:
+            return None
+        # The manifest goes in the undo chunk of the build, one undo removes both
+        cmds.undoInfo(openChunk=True, chunkName=module.builder_name)
+        try:
+            report = build.builder.apply(use_api=use_api)
+            build.record(report.name_map)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+        cmds.warning(f"{module.label} setup complete, {report}")
+        return report
+    finally:
+        log.flush()
+
+
+def start_module_build(module, naming_convention, is_mirror_behavior, on_progress=None, on_finished=None,
+                       on_cancelled=None, chunk_size=200, incremental=True, compact=False, cluster="row",
+                       control_list=None, rewire_policy="prompt"):
+    """
+    Non-blocking create_module_nodes: the build runs chunk_size operations per Maya idle event so the UI stays
+    responsive, see deferred_build. on_progress(done, total), on_finished(report) and on_cancelled() are called
+    from the idle queue. Returns the running DeferredBuild (cancel() rolls it back), or None when there is
+    nothing to build.
+    """
+    log = BuildLog()
+    build = prepare_build(module, naming_convention, is_mirror_behavior, log, incremental=incremental,
+                          compact=compact, cluster=cluster, control_list=control_list, rewire_policy=rewire_policy)
+    if build is None:
+        log.flush()
+        return None
+
+    manifests = read_manifests(naming_convention.settings_node)
+    recorded = []
+
+    def record(report):
+        # Recorded in the undo chunk of every step, undoing the build step by step leaves a matching manifest
+        build.record(report.name_map)
+        recorded.append(True)
+
+    def finished(report):
+        log.flush()
+        cmds.warning(f"{module.label} setup complete, {report}")
+        if on_finished:
+            on_finished(report)
+
+    def cancelled():
+        # The steps recorded their nodes as they went, the manifest goes back to what it was before the build
+        if recorded:
+            write_manifests(manifests, naming_convention.settings_node)
+        log.flush()
+        cmds.warning(f"{module.label} setup cancelled, the partial build was undone")
+        if on_cancelled:
+            on_cancelled()
+
+    return DeferredBuild(build.builder.apply_steps(chunk_size, on_step=record), on_progress, finished,
+                         cancelled).start()
+
+
+def rebuild_module_nodes(module, naming_convention, use_api=False):
+    """
+    Delete the recorded build of a module and build it again for the same controls and options, with the
+    current naming convention. Only the nodes of the manifest are touched, returns the BuildReport.
+    """
+    manifest = read_manifest(module.name, naming_convention.settings_node)
+    if manifest is None:
+        cmds.warning(f"No {module.label.lower()} setup recorded in this scene, build it first")
+        return None
+    # Checked before anything is deleted, so a rebuild that can't happen leaves the current setup alone
+    report = module.validate(naming_convention, manifest.controls, manifest.options.get("is_mirror_behavior"))
+    if not report.is_valid():
+        cmds.warning(f"{module.label} rebuild stopped: {report.describe()}")
+        return None
+    delete_build(module.name, naming_convention.settings_node)
+    return create_module_nodes(module, naming_convention, use_api=use_api, incremental=False,
+                               control_list=manifest.controls, **manifest.options)
+
+
+def _keep(entry, size, flags):
+    if len(entry) <= size:
+        return True
+    flag = entry[size]
+    return not flags[flag[1:]] if flag.startswith("!") else flags[flag]
@@ -1,6 +1,96 @@
-import re
+import json
 
-import maya.cmds as cmds
+from zanimTools.rig_setup.core import scene_events
+from zanimTools.rig_setup.core.instrumentation import cmds
+from zanimTools.rig_setup.core.name_parser import parser_for
+
+# Every setting of the naming convention, with its default value.
+# If values need to be exposed in the UI to be changed by the user, add them here and in main_menu.py.
+DEFAULT_SETTINGS = {
+    "separator": "_",  # Should probably never be changed
+
+    "side_l": "L",
+    "side_r": "R",
+    "side_c": "C",
+    "side_index": 0,  # What token contains side indicator
+
+    "pos_top_name": "Top",
+    "pos_bot_name": "Bot",
+    "pos_corner_name": "Corner",
+    "pos_mid_name": "Mid",
+    "pos_front_name": "Front",
+    "pos_back_name": "Back",
+    "pos_index": 1,  # What token contains position indicator
+
+    "type_joint": "JNT",
+    "type_control": "CTL",
+    "type_group": "GRP",
+    "type_locator": "LOC",
+    "type_follicle": "FOL",
+    "type_index": 2,  # What token contains type indicator
+
+    "jaw_joint_reference": "C_jawA01_JNT",  # Specific full names
+    "jaw_control": "C_jawOpen_CTL",  # Specific full names
+
+    "jaw01_jnt": "C_jawA01_JNT",
+
+    "mirror_behavior": "False",
+}
+
+# String attribute on the settings node holding every setting as one JSON blob
+SETTINGS_ATTR = "settingsData"
+
+# Keys written by older versions of the UI, mapped to their current name
+_LEGACY_KEYS = {"type_Group": "type_group"}
+
+# Last blob read from or written to each settings node, keyed by node name: (blob, settings)
+_settings_cache = {}
+
+
+def _forget_settings_node(name, *args):
+    _settings_cache.pop(name, None)
+
+
+def _on_settings_node_renamed(name, previous_name):
+    _settings_cache.pop(previous_name, None)
+    _settings_cache.pop(name, None)
+
+
+# Cached settings belong to a node, drop them when that node goes away or another scene is loaded
+scene_events.subscribe("node_removed", _forget_settings_node)
+scene_events.subscribe("node_renamed", _on_settings_node_renamed)
+scene_events.subscribe("scene_reset", _settings_cache.clear)
+
+
+def _coerce(value, default):
+    """Cast a stored value (settings used to be saved as strings) to the type of its default."""
+    if isinstance(default, int) and not isinstance(value, int):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+    if isinstance(default, str) and value is not None and not isinstance(value, str):
+        return str(value)
+    return default if value is None else value
+
+
+def _complete_settings(stored):
+    """Defaults overridden by the stored values."""
+    settings = dict(DEFAULT_SETTINGS)
+    for key, value in stored.items():
+        key = _LEGACY_KEYS.get(key, key)
+        if key in settings:
+            settings[key] = _coerce(value, DEFAULT_SETTINGS[key])
+    return settings
+
+
+def _decode_settings(blob):
+    """Settings stored in a blob, None when it isn't a JSON object (damaged by hand or by another tool)."""
+    try:
+        stored = json.loads(blob)
+    except ValueError:
+        return None
+    return stored if isinstance(stored, dict) else None
 
 
 class NamingConvention:
@@ -8,10 +98,6 @@ class NamingConvention:
     def __init__(self, settings_node="rigSetupSettings"):
         self.settings_node = settings_node
 
-        # Ensure settings node exists
-        if not cmds.objExists(self.settings_node):
-            cmds.createNode("transform", name=self.settings_node)
-
         """
         nomenclature works like this:
         name is made from 3 tokens
@@ -31,144 +117,123 @@ class NamingConvention:
                         CTL = type, index 2
         So to find if this lip is Top or Bot, you'd need to look for the specific word in the index 1
         
-        If values need to be exposed in the UI to be changed by the user, add them both here and in main_menu.py in the 
-        class __init__ UI layout.
+        If values need to be exposed in the UI to be changed by the user, add them both to DEFAULT_SETTINGS and in
+        main_menu.py in the class __init__ UI layout.
         """
-        # Load initial values from Maya attributes (or use defaults)
-        self.separator = self.get_attr("separator", "_")  # Should probably never be changed
-
-        self.side_l = self.get_attr("side_l", "L")
-        self.side_r = self.get_attr("side_r", "R")
-        self.side_c = self.get_attr("side_c", "C")
-        self.side_index = self.get_attr("side_index", 0)  # What token contains side indicator
-
-        self.pos_top_name = self.get_attr("pos_top_name", "Top")
-        self.pos_bot_name = self.get_attr("pos_bot_name", "Bot")
-        self.pos_corner_name = self.get_attr("pos_corner_name", "Corner")
-        self.pos_mid_name = self.get_attr("pos_mid_name", "Mid")
-        self.pos_front_name = self.get_attr("pos_front_name", "Front")
-        self.pos_back_name = self.get_attr("pos_back_name", "Back")
-        self.pos_index = self.get_attr("pos_index", 1)  # What token contains position indicator
-
-        self.type_joint = self.get_attr("type_joint", "JNT")
-        self.type_control = self.get_attr("type_joint", "CTL")
-        self.type_group = self.get_attr("type_group", "GRP")
-        self.type_locator = self.get_attr("type_locator", "LOC")
-        self.type_follicle = self.get_attr("type_follicle", "FOL")
-        self.type_index = self.get_attr("type_index", 2)  # What token contains type indicator
+        self._parser = None
 
-        self.jaw_joint_reference = self.get_attr("jaw_joint_reference", "C_jawA01_JNT")  # Specific full names
-        self.jaw_control = self.get_attr("jaw_control", "C_jawOpen_CTL")  # Specific full names
-
-        self.jaw01_jnt = self.get_attr("jaw01_jnt", "C_jawA01_JNT")
-
-        self.mirror_behavior = self.get_attr("mirror_behavior", "False")
+        # Load initial values from the settings node (or use defaults), see DEFAULT_SETTINGS for every key
+        for key, value in self.load_settings().items():
+            setattr(self, key, value)
 
+    def load_settings(self):
+        """
+        Read every setting from the settings node in one getAttr call.
+        Nothing is written: a scene without settings node uses the defaults until the first save, so opening a scene
+        doesn't modify it. Scenes saved with the old one-attribute-per-setting layout move to the blob on first save.
+        """
+        plug = f"{self.settings_node}.{SETTINGS_ATTR}"
+        try:
+            blob = cmds.getAttr(plug)
+        except (ValueError, RuntimeError):  # The node or the blob attribute doesn't exist yet
+            blob = None
+
+        stored = None
+        if blob:
+            cached = _settings_cache.get(self.settings_node)
+            if cached is not None and cached[0] == blob:
+                return dict(cached[1])
+            stored = _decode_settings(blob)
+            if stored is None:
+                cmds.warning(f"{plug} is damaged, using the legacy settings or the defaults")
+
+        if stored is None:
+            return _complete_settings(self._read_legacy_attrs())
+        settings = _complete_settings(stored)
+        _settings_cache[self.settings_node] = (blob, settings)
+        return dict(settings)
+
+    def _read_legacy_attrs(self):
+        """Read the values stored as separate string attributes by older versions of the tool."""
+        if not cmds.objExists(self.settings_node):
+            # New scenes start from the studio default preset when one is set, see presets.py
+            from zanimTools.rig_setup.core.presets import default_preset
+            return default_preset() or {}
+
+        legacy = {}
+        for attr_name in cmds.listAttr(self.settings_node, userDefined=True) or []:
+            key = _LEGACY_KEYS.get(attr_name, attr_name)
+            if key in DEFAULT_SETTINGS:
+                legacy[key] = cmds.getAttr(f"{self.settings_node}.{attr_name}")
+        return legacy
+
+    def _write_blob(self, settings):
+        blob = json.dumps(settings, sort_keys=True)
+        plug = f"{self.settings_node}.{SETTINGS_ATTR}"
+        try:
+            cmds.setAttr(plug, blob, type="string")
+        except (ValueError, RuntimeError):  # First write on this node
+            if not cmds.objExists(self.settings_node):
+                cmds.createNode("transform", name=self.settings_node)
+            cmds.addAttr(self.settings_node, longName=SETTINGS_ATTR, dataType="string")
+            cmds.setAttr(plug, blob, type="string")
+        return blob
+
+    def as_dict(self):
+        """Current settings, keyed like DEFAULT_SETTINGS."""
+        return {key: getattr(self, key) for key in DEFAULT_SETTINGS}
 
     def get_attr(self, attr_name, default):
-        """Retrieve an attribute value from Maya or return a default."""
-        if cmds.attributeQuery(attr_name, node=self.settings_node, exists=True):
-            return cmds.getAttr(f"{self.settings_node}.{attr_name}")
-        return default
+        """Retrieve a setting value or return a default."""
+        return getattr(self, attr_name, default)
 
     def set_attr(self, attr_name, value):
-        """Store an attribute value in Maya."""
-        if not cmds.attributeQuery(attr_name, node=self.settings_node, exists=True):
-            cmds.addAttr(self.settings_node, longName=attr_name, dataType="string")
-        cmds.setAttr(f"{self.settings_node}.{attr_name}", value, type="string")
+        """Store a setting value in Maya."""
+        self.update_naming_convention(**{attr_name: value})
 
     def update_naming_convention(self, **kwargs):
-        """Update values dynamically and save them to the settings node."""
+        """
+        Update values dynamically and save them to the settings node.
+        All values are written in one setAttr call, which is skipped when the node already holds them.
+        """
         for key, value in kwargs.items():
-            setattr(self, key, value)  # Update the attribute in Python
-            self.set_attr(key, value)  # Store the value in Maya
-
-    @classmethod
-    def get_mirrored_name(cls, controller_name):
-        # Logic to get mirrored name
-        if cls.side_l in controller_name:
-            return controller_name.replace(cls.side_l, cls.side_r)
-        elif cls.side_r in controller_name:
-            return controller_name.replace(cls.side_r, cls.side_l)
-        else:
-            return controller_name  # Return as-is if no match
+            key = _LEGACY_KEYS.get(key, key)
+            setattr(self, key, _coerce(value, DEFAULT_SETTINGS.get(key)))  # Update the attribute in Python
+        self._parser = None
+
+        settings = self.as_dict()
+        # Compared with the node rather than the cache, an undo may have put other values back since the last save
+        try:
+            stored = cmds.getAttr(f"{self.settings_node}.{SETTINGS_ATTR}")
+        except (ValueError, RuntimeError):  # The node or the blob attribute doesn't exist yet
+            stored = None
+        cached = _settings_cache.get(self.settings_node)
+        if stored and cached is not None and cached[0] == stored and cached[1] == settings:
+            return False
+        if stored and json.dumps(settings, sort_keys=True) == stored:
+            _settings_cache[self.settings_node] = (stored, settings)
+            return False
+        _settings_cache[self.settings_node] = (self._write_blob(settings), settings)  # Store the values in Maya
+        return True
+
+    @property
+    def parser(self):
+        """Compiled NameParser for the current values, shared with every convention using the same values."""
+        if self._parser is None:
+            self._parser = parser_for(self.as_dict())
+        return self._parser
+
+    def parse(self, name):
+        """Parse an existing name, e.g. "C_eyeTop02_JNT" -> side "C", base "eye", pos "Top", number "02", type "JNT"."""
+        return self.parser.parse(name)
+
+    def get_mirrored_name(self, controller_name):
+        """Swap the side token of a name (L <-> R), names without a left/right side are returned as-is."""
+        return self.parser.mirror(controller_name)
 
     def resolve(self, base_name, pos_name, side_name, number=None, type=None):
         """
         Generate a full name based on current naming convention values.
+        Keys are the canonical ones: side "L"/"R"/"C", pos "Top"/"Bot"..., type "JNT"/"CTL"...
         """
-        components = []
-        if side_name == 'L':
-            components.append(self.side_l)
-        elif side_name == 'R':
-            components.append(self.side_r)
-        elif side_name == 'C':
-            components.append(self.side_c)
-
-        if base_name:
-            components.append(base_name)
-
-        if pos_name == 'Top':
-            components.append(self.pos_top_name)
-        elif pos_name == 'Bot':
-            components.append(self.pos_bot_name)
-        elif pos_name == 'Corner':
-            components.append(self.pos_corner_name)
-        elif pos_name == 'Mid':
-            components.append(self.pos_mid_name)
-        elif pos_name == 'Front':
-            components.append(self.pos_front_name)
-        elif pos_name == 'Back':
-            components.append(self.pos_back_name)
-
-        if number:
-            components.append(number)
-
-        if type:
-            if type == 'JNT':
-                components.append(self.jaw_joint_reference)
-            elif type == 'CTL':
-                components.append(self.jaw_control)
-
-        return "_".join(components)
-
-    """
-    @classmethod
-    def from_base_name(cls, base_name, separator="_"):
-
-        # Parse an existing name string into components based on the naming convention and camel case.
-        # Example Input: "C_eyeTop02_JNT"
-
-        # Step 1: Split the name based on camel case
-        words = re.findall(r'[a-zA-Z][^A-Z]*', base_name)  # Extract words based on camel case
-
-        # Step 2: Find the position name in the words list
-        pos_name = None
-        for word in words:
-            if word in [cls.pos_top_name, cls.pos_bot_name, cls.pos_corner_name,
-                        cls.pos_mid_name, cls.pos_front_name, cls.pos_back_name]:
-                pos_name = word
-                words.remove(word)
-                break  # Exit the loop once a match is found
-
-        # Step 3: The last word before the number is likely the base name
-        base_name = words[-1] if len(words) > 0 else None
-
-        # Step 4: Extract the number from the end of the base name if possible
-        match = re.match(r'(\D+)(\d+)', base_name or "")
-        number = match.group(2) if match else None
-
-        # Step 5: Get the side from the prefix (first character)
-        side_name = words[0] if len(words) > 0 and words[0] in [cls.side_l, cls.side_r, cls.side_c] else None
-
-        # Return an instance of NameHelper with the extracted values
-        return cls(
-            side_name=side_name,
-            base_name=base_name,
-            pos_name=pos_name,
-            number=number,
-            type=None,  # Type is not parsed yet
-            separator=separator,
-        )
-
-        """
+        return self.parser.resolve(base_name, pos_name, side_name, number=number, type=type)
@@ -0,0 +1,139 @@
+"""
+Scene change notifications for the caches of the tools (settings, mirror pairs, control index...).
+
+One set of OpenMaya callbacks feeds every subscriber with per-node events, so a cache can update the entries of
+the nodes that changed instead of rescanning the scene:
+    "node_added" (name), "node_removed" (name), "node_renamed" (name, previous name): transforms only
+    "scene_reset" (): new scene, open, import, reference loaded or removed... everything may have changed
+
+    scene_events.subscribe("node_removed", on_node_removed)
+    if scene_events.is_active():  # Otherwise nothing tells the cache about changes, it can't be trusted
+        ...
+
+Only the UI registers the callbacks, with activate() when the window opens, so scripts and batch runs don't
+leave callbacks behind. They are removed by deactivate() (the window being closed) and on_unload()
+(module_reloader). Activating sends a "scene_reset", the caches missed every change made while inactive.
+Node events are held back while a file operation runs, the "scene_reset" sent once it's over covers them.
+"""
+try:
+    import maya.api.OpenMaya as om
+except ImportError:  # Headless stand-in (rig_setup.headless) has no API
+    om = None
+
+EVENTS = ("node_added", "node_removed", "node_renamed", "scene_reset")
+
+# Event -> callbacks subscribed to it, in subscription order
+_subscribers = {event: [] for event in EVENTS}
+
+# Ids of the OpenMaya callbacks currently registered
+_callback_ids = []
+
+# True while a file operation runs, its node events are replaced by one "scene_reset"
+_suspended = False
+
+
+def subscribe(event, callback):
+    """Call callback on event (see the module docstring for the arguments). Subscribing twice is ignored."""
+    if event not in _subscribers:
+        raise ValueError(f"Unknown scene event {event}, expected one of {EVENTS}")
+    if callback not in _subscribers[event]:
+        _subscribers[event].append(callback)
+    return callback
+
+
+def unsubscribe(event, callback):
+    if callback in _subscribers.get(event, ()):
+        _subscribers[event].remove(callback)
+
+
+def emit(event, *args):
+    """Send an event to its subscribers. An error in one subscriber doesn't stop the others."""
+    for callback in list(_subscribers[event]):
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"Error in {event} callback {getattr(callback, '__qualname__', callback)}: {e}")
+
+
+def is_active():
+    """True while the OpenMaya callbacks are registered, i.e. while events can be trusted to arrive."""
+    return bool(_callback_ids)
+
+
+def activate():
+    """
+    Register the OpenMaya callbacks if they aren't yet, and tell the caches to reset. Returns is_active().
+    Called by the UI, the caches only check is_active().
+    """
+    if _callback_ids or om is None:
+        return is_active()
+
+    ids = []
+    try:
+        for before, after in ((om.MSceneMessage.kBeforeNew, om.MSceneMessage.kAfterNew),
+                              (om.MSceneMessage.kBeforeOpen, om.MSceneMessage.kAfterOpen),
+                              (om.MSceneMessage.kBeforeImport, om.MSceneMessage.kAfterImport),
+                              (om.MSceneMessage.kBeforeCreateReference, om.MSceneMessage.kAfterCreateReference),
+                              (om.MSceneMessage.kBeforeRemoveReference, om.MSceneMessage.kAfterRemoveReference)):
+            ids.append(om.MSceneMessage.addCallback(before, _on_before_file))
+            ids.append(om.MSceneMessage.addCallback(after, _on_after_file))
+        ids.append(om.MDGMessage.addNodeAddedCallback(_on_node_added, "transform"))
+        ids.append(om.MDGMessage.addNodeRemovedCallback(_on_node_removed, "transform"))
+        ids.append(om.MNodeMessage.addNameChangedCallback(om.MObject.kNullObj, _on_name_changed))
+    except Exception as e:
+        # Never leave half the callbacks registered
+        if ids:
+            om.MMessage.removeCallbacks(ids)
+        print(f"Scene callbacks could not be registered: {e}")
+        return False
+    _callback_ids.extend(ids)
+    emit("scene_reset")
+    return True
+
+
+def deactivate():
+    """Remove the OpenMaya callbacks. Caches are told to reset since they won't hear about changes anymore."""
+    global _suspended
+    if _callback_ids:
+        om.MMessage.removeCallbacks(_callback_ids)
+        del _callback_ids[:]
+        _suspended = False
+        emit("scene_reset")
+
+
+def on_unload():
+    # Called by module_reloader before this module is reloaded or purged
+    deactivate()
+    for callbacks in _subscribers.values():
+        del callbacks[:]
+
+
+def _node_name(node):
+    return om.MFnDependencyNode(node).name()
+
+
+def _on_before_file(*args):
+    global _suspended
+    _suspended = True
+
+
+def _on_after_file(*args):
+    global _suspended
+    _suspended = False
+    emit("scene_reset")
+
+
+def _on_node_added(node, *args):
+    if not _suspended and _subscribers["node_added"]:
+        emit("node_added", _node_name(node))
+
+
+def _on_node_removed(node, *args):
+    if not _suspended and _subscribers["node_removed"]:
+        emit("node_removed", _node_name(node))
+
+
+def _on_name_changed(node, previous_name, *args):
+    # Registered for every node, only transforms are reported like the added/removed events
+    if not _suspended and _subscribers["node_renamed"] and node.hasFn(om.MFn.kTransform):
+        emit("node_renamed", _node_name(node), previous_name)
@@ -0,0 +1,302 @@
+"""
+Snapshots of generated rig networks: node types, attribute values and connections in a compact binary file.
+
+Restoring a snapshot skips planning and validating the build: the file is read through mmap, its names are
+converted to the naming convention of the scene (L/R, positions, types, token order, jaw nodes) and everything is
+created in one GraphBuilder pass, like a build. Creating the nodes and connections costs the same cmds calls as a
+build, so a restore is not faster than rebuilding: what it adds is the hand tweaks and the name conversion.
+
+    export_snapshot("lips", "charA_lips.ztsnap")
+    restore_snapshot("charA_lips.ztsnap", naming_convention)
+
+File layout, little-endian, every name or attribute is an index in the string table:
+    header   4s magic, H version, H reserved, I strings, I nodes, I values, I edges
+    strings  I offsets (strings + 1) into the UTF-8 blob that follows them, string 0 is the JSON metadata
+    nodes    I name, I type, I flags (1: utility node)
+    values   I node, I attribute, B kind (bool, int, float, string), 8s payload (q, d or the string index as q)
+    edges    I source node, I source attribute, I destination node, I destination attribute
+"""
+import json
+import mmap
+import struct
+
+from zanimTools.rig_setup.core.build_manifest import BuildManifest, read_manifest, record_build
+from zanimTools.rig_setup.core.graph_builder import GraphBuilder
+from zanimTools.rig_setup.core.instrumentation import cmds
+from zanimTools.rig_setup.core.name_parser import parser_for
+
+MAGIC = b"ZTSN"
+VERSION = 1
+
+# Attributes captured on the generated nodes, when they are not connected and differ from their default
+SNAPSHOT_ATTRS = {
+    "multiplyDivide": ("operation", "input2X", "input2Y", "input2Z"),
+    "remapValue": ("inputMin", "inputMax", "outputMin", "outputMax"),
+    "plusMinusAverage": ("operation",),
+}
+
+# Settings naming specific nodes, a snapshot connecting to one of them connects to the scene's one when restored.
+# Later settings win when two of them name the same node.
+NODE_SETTINGS = ("jaw01_jnt", "jaw_joint_reference", "jaw_control")
+
+_HEADER = struct.Struct("<4sHHIIII")
+_NODE = struct.Struct("<III")
+_VALUE = struct.Struct("<IIB8s")
+_EDGE = struct.Struct("<IIII")
+_INT = struct.Struct("<q")
+_DOUBLE = struct.Struct("<d")
+
+_UTILITY = 1
+_KINDS = (bool, int, float, str)
+
+
+class Snapshot:
+    """Nodes (name, type, as utility), values (plug, value) and edges (source plug, destination plug) of a system."""
+
+    def __init__(self, system, nodes=(), values=(), edges=(), controls=(), options=None, settings=None):
+        self.system = system
+        self.nodes = list(nodes)
+        self.values = list(values)
+        self.edges = list(edges)
+        self.controls = list(controls)
+        self.options = dict(options or {})
+        self.settings = dict(settings or {})  # Naming convention the names follow
+
+    def __str__(self):
+        return (f"{self.system}: {len(self.nodes)} nodes, {len(self.values)} values, {len(self.edges)} connections, "
+                f"{len(self.controls)} controls")
+
+    @classmethod
+    def capture(cls, system, settings_node="rigSetupSettings"):
+        """
+        Snapshot of the recorded build of a system as it is in the scene now, tweaks included.
+        Costs one ls, two listConnections and one attributeQuery per captured attribute of each node type,
+        plus one getAttr per captured attribute of each node. Returns None when the system was never built.
+        """
+        manifest = read_manifest(system, settings_node)
+        if manifest is None:
+            return None
+        found = (cmds.ls(manifest.nodes, showType=True) or []) if manifest.nodes else []
+        node_types = dict(zip(found[::2], found[1::2]))
+        names = list(node_types)
+        if not names:
+            return cls(system, controls=manifest.controls, options=manifest.options, settings=manifest.settings)
+
+        # Both directions, as [plug of the node, other plug...] pairs: connections inside the network show twice
+        edges = {}
+        incoming = cmds.listConnections(names, source=True, destination=False, plugs=True, connections=True,
+                                        skipConversionNodes=True) or []
+        for destination, source in zip(incoming[::2], incoming[1::2]):
+            edges[destination] = source
+        outgoing = cmds.listConnections(names, source=False, destination=True, plugs=True, connections=True,
+                                        skipConversionNodes=True) or []
+        for source, destination in zip(outgoing[::2], outgoing[1::2]):
+            edges[destination] = source
+
+        defaults = {}
+        values = []
+        for name in names:
+            node_type = node_types[name]
+            for attr in SNAPSHOT_ATTRS.get(node_type, ()):
+                plug = f"{name}.{attr}"
+                if plug in edges:
+                    continue
+                if (node_type, attr) not in defaults:
+                    defaults[(node_type, attr)] = (cmds.attributeQuery(attr, node=name, listDefault=True) or [None])[0]
+                value = cmds.getAttr(plug)
+                if value != defaults[(node_type, attr)]:
+                    values.append((plug, value))
+
+        nodes = [(name, node_types[name], True) for name in names]
+        return cls(system, nodes, values, [(source, destination) for destination, source in edges.items()],
+                   manifest.controls, manifest.options, manifest.settings)
+
+    def remap(self, naming_convention, renames=None):
+        """
+        Snapshot with its names in the convention of naming_convention (see NameParser.convert), the snapshot
+        itself when there is nothing to rename.
+        Nodes named by a setting (jaw_control...) are swapped for the current ones, renames maps any other name.
+        """
+        source = parser_for(self.settings) if self.settings else naming_convention.parser
+        target = naming_convention.parser
+        fixed = {self.settings[key]: getattr(naming_convention, key) for key in NODE_SETTINGS if key in self.settings}
+        fixed.update(renames or {})
+        if source is target and all(name == new_name for name, new_name in fixed.items()):
+            # Same convention, names are kept as they are
+            return self
+        names = {}
+
+        def convert(name):
+            converted = names.get(name)
+            if converted is None:
+                converted = names[name] = fixed[name] if name in fixed else source.convert(name, target)
+            return converted
+
+        def convert_plug(plug):
+            node, _, attr = plug.partition(".")
+            return f"{convert(node)}.{attr}"
+
+        return Snapshot(self.system,
+                        [(convert(name), node_type, as_utility) for name, node_type, as_utility in self.nodes],
+                        [(convert_plug(plug), value) for plug, value in self.values],
+                        [(convert_plug(source), convert_plug(destination)) for source, destination in self.edges],
+                        [convert(control) for control in self.controls], self.options, naming_convention.as_dict())
+
+    def to_builder(self, name=None):
+        """GraphBuilder creating the snapshot."""
+        builder = GraphBuilder(name=name or self.system + "Snapshot")
+        for node_name, node_type, as_utility in self.nodes:
+            builder.add_node(node_type, node_name, as_utility)
+        for plug, value in self.values:
+            builder.set_attr(plug, value)
+        for source, destination in self.edges:
+            builder.connect(source, destination)
+        return builder
+
+    def write(self, path):
+        """Write the snapshot to path, returns the file size in bytes."""
+        strings = {}
+
+        def index(text):
+            found = strings.get(text)
+            if found is None:
+                found = strings[text] = len(strings)
+            return found
+
+        def plug_indices(plug):
+            node, _, attr = plug.partition(".")
+            return index(node), index(attr)
+
+        index(json.dumps({"system": self.system, "controls": self.controls, "options": self.options,
+                          "settings": self.settings}, sort_keys=True))
+        nodes = b"".join(_NODE.pack(index(name), index(node_type), _UTILITY if as_utility else 0)
+                         for name, node_type, as_utility in self.nodes)
+        values = b"".join(_VALUE.pack(*plug_indices(plug), *_pack_value(value, index)) for plug, value in self.values)
+        edges = b"".join(_EDGE.pack(*plug_indices(source), *plug_indices(destination))
+                         for source, destination in self.edges)
+
+        encoded = [text.encode("utf-8") for text in strings]
+        offsets = [0]
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        chunks = [_HEADER.pack(MAGIC, VERSION, 0, len(encoded), len(self.nodes), len(self.values), len(self.edges)),
+                  struct.pack(f"<{len(offsets)}I", *offsets), b"".join(encoded), nodes, values, edges]
+        with open(path, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        return sum(len(chunk) for chunk in chunks)
+
+    @classmethod
+    def read(cls, path):
+        """Load a snapshot file through a read-only memory map."""
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return cls._unpack(view, path)
+            finally:
+                view.release()  # The map can't be closed while a view on it is alive
+
+    @classmethod
+    def _unpack(cls, view, path):
+        if len(view) < _HEADER.size:
+            raise ValueError(f"{path} is not a rig snapshot")
+        magic, version, _, string_count, node_count, value_count, edge_count = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a rig snapshot")
+        if version > VERSION:
+            raise ValueError(f"{path} was written by a newer version (snapshot version {version})")
+
+        position = _HEADER.size
+        offsets = struct.unpack_from(f"<{string_count + 1}I", view, position)
+        position += 4 * (string_count + 1)
+        blob = view[position:position + offsets[-1]]
+        strings = [str(blob[start:end], "utf-8") for start, end in zip(offsets, offsets[1:])]
+        position += offsets[-1]
+
+        def section(record, count):
+            nonlocal position
+            start, position = position, position + record.size * count
+            return record.iter_unpack(view[start:position])
+
+        nodes = [(strings[name], strings[node_type], bool(flags & _UTILITY))
+                 for name, node_type, flags in section(_NODE, node_count)]
+        values = [(f"{strings[node]}.{strings[attr]}", _unpack_value(kind, payload, strings))
+                  for node, attr, kind, payload in section(_VALUE, value_count)]
+        edges = [(f"{strings[source]}.{strings[source_attr]}", f"{strings[destination]}.{strings[destination_attr]}")
+                 for source, source_attr, destination, destination_attr in section(_EDGE, edge_count)]
+
+        meta = json.loads(strings[0])
+        return cls(meta["system"], nodes, values, edges, meta.get("controls", ()), meta.get("options"),
+                   meta.get("settings"))
+
+
+def export_snapshot(system, path, settings_node="rigSetupSettings"):
+    """Write the recorded build of a system to a snapshot file, returns the Snapshot or None if nothing was built."""
+    snapshot = Snapshot.capture(system, settings_node)
+    if snapshot is None:
+        cmds.warning(f"No {system} setup recorded in this scene, build it first")
+        return None
+    size = snapshot.write(path)
+    cmds.warning(f"Snapshot of {snapshot} saved to {path} ({size} bytes)")
+    return snapshot
+
+
+def restore_snapshot(path, naming_convention, use_api=False, incremental=True, renames=None):
+    """
+    Build a snapshot file in the scene with the names of naming_convention, in one batch (one undo chunk) costing
+    the same Maya calls as a build of the same nodes.
+    The nodes it connects to (controls' drivers, jaw...) have to exist. With incremental, nodes and connections
+    already in the scene are skipped like in a build. The restored system is recorded in the build manifest.
+    Returns the BuildReport, or None when nothing was restored.
+    """
+    snapshot = Snapshot.read(path).remap(naming_convention, renames)
+    builder = snapshot.to_builder()
+
+    # Nodes outside the snapshot are checked up front, a missing one would stop the build halfway
+    planned = {name for name, _, _ in snapshot.nodes}
+    external = list(dict.fromkeys(plug.partition(".")[0] for edge in snapshot.edges for plug in edge
+                                  if plug.partition(".")[0] not in planned))
+    missing = set(external) - set(cmds.ls(external) or []) if external else set()
+    if missing:
+        cmds.warning(f"Snapshot restore stopped, {len(missing)} nodes are missing: {', '.join(sorted(missing))}")
+        return None
+
+    to_apply = builder
+    if incremental:
+        diff = builder.diff()
+        if diff.conflicts:
+            cmds.warning(f"Snapshot restore stopped, {len(diff.conflicts)} nodes exist with another type: "
+                         f"{', '.join(diff.conflicts)}")
+            return None
+        if diff.is_empty():
+            cmds.warning(f"{snapshot.system} setup is already up to date")
+            return None
+        to_apply = diff.builder
+
+    # The manifest goes in the undo chunk of the restore, one undo removes both
+    cmds.undoInfo(openChunk=True, chunkName=builder.name)
+    try:
+        report = to_apply.apply(use_api=use_api)
+        record_build(BuildManifest.from_builder(snapshot.system, builder, report.name_map, naming_convention,
+                                                snapshot.controls, snapshot.options),
+                     naming_convention.settings_node)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    cmds.warning(f"Snapshot restored, {report}")
+    return report
+
+
+def _pack_value(value, index):
+    if isinstance(value, str):
+        return 3, _INT.pack(index(value))
+    for kind, value_type in enumerate(_KINDS[:2]):
+        if isinstance(value, value_type):
+            return kind, _INT.pack(int(value))
+    return 2, _DOUBLE.pack(float(value))
+
+
+def _unpack_value(kind, payload, strings):
+    if kind == 2:
+        return _DOUBLE.unpack(payload)[0]
+    value = _INT.unpack(payload)[0]
+    return strings[value] if kind == 3 else _KINDS[kind](value)
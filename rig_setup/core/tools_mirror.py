@@ -1,56 +1,29 @@
-import maya.cmds as cmds
+from zanimTools.rig_setup.core.instrumentation import cmds
+from zanimTools.rig_setup.core.mirror_index import get_mirror_index
+from zanimTools.rig_setup.core.name_parser import parser_for
 
 
-# Old script for add mirrored selection, works, but isn't clean
-def add_mirrored_selection(side_l, side_r):
-    # Get the selected objects in the scene
-    selected = cmds.ls(selection=True)
+def add_mirrored_selection(side_l="L", side_r="R", naming_convention=None, control_list=None):
+    # Add the mirrored counterpart of every selected object to the selection, keeping the selection order.
+    # Counterparts are looked up in the scene's mirror index, not with one objExists call per object.
+    # control_list (e.g. a control_query.find_controls result) is used instead of the selection when given.
+    selected = list(control_list) if control_list is not None else cmds.ls(selection=True)
 
     if not selected:
         cmds.warning("No objects selected.")
         return
 
-    mirrored_selection = []
-
-    for obj in selected:
-        if obj.startswith(side_l):  # If the object starts with "L_"
-            mirrored_obj = obj.replace(side_l, side_r, 1)  # Replace "L_" with "R_"
-            if cmds.objExists(mirrored_obj):
-                mirrored_selection.append(mirrored_obj)
-        elif obj.startswith(side_r):  # If the object starts with "R_"
-            mirrored_obj = obj.replace(side_r, side_l, 1)  # Replace "R_" with "L_"
-            if cmds.objExists(mirrored_obj):
-                mirrored_selection.append(mirrored_obj)
+    if naming_convention is not None:
+        parser = naming_convention.parser
+    else:
+        parser = parser_for({"side_l": side_l, "side_r": side_r})
+    mirrored_selection = get_mirror_index(parser).counterparts(selected)
 
     # Add mirrored objects to the selection, avoiding duplicates
-    if mirrored_selection:
-        selected.extend(mirrored_selection)
-        selected = list(set(selected))  # Remove duplicates
-
-    cmds.select(selected)  # Update the selection with original + mirrored objects
+    cmds.select(list(dict.fromkeys(selected + mirrored_selection)))
 
 
 def get_mirrored_selection(control="L_eye01_CTL", side_l="L", side_r="R", separator="_", side_index=0):
-    # Change affected controller for its mirrored counterpart 
-
-    # Find side indication in control's name
-    control_tokens = control.split(separator)
-    print(f"control tokens={control_tokens}")
-
-    for i, token in enumerate(control_tokens):
-        print(f"index,token= {i}, {token}")
-        if token == side_l:
-            token = side_r
-            print(f"token= {token}")
-            control_tokens[side_index] = token
-            break
-        elif token == side_r:
-            token = side_l
-            print(f"token= {token}")
-            control_tokens[side_index] = token
-            break
-
-    print(f"control tokens= {control_tokens}")
-    mirrored_control = separator.join(control_tokens)
-
-    return mirrored_control
+    # Change affected controller for its mirrored counterpart, only the side token (at side_index) is swapped
+    parser = parser_for({"side_l": side_l, "side_r": side_r, "separator": separator, "side_index": side_index})
+    return parser.mirror(control)
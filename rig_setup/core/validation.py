@@ -0,0 +1,79 @@
+from zanimTools.rig_setup.core.instrumentation import cmds
+
+
+class ValidationReport:
+    """Everything wrong with a control selection, collected before any node is created."""
+
+    def __init__(self):
+        self.duplicates = []  # Controls listed more than once
+        self.conflicts = []  # (control, mirrored control) pairs selected together while mirroring behavior
+        self.missing_nodes = []  # Required rig nodes (jaw joint, jaw control...) that don't exist
+        self.missing_drivers = []  # Controls without their driver node
+        self.missing_attrs = []  # Required "node.attribute" plugs that don't exist
+
+    def is_valid(self):
+        return not (self.duplicates or self.conflicts or self.missing_nodes or self.missing_drivers
+                    or self.missing_attrs)
+
+    def describe(self):
+        lines = []
+        if self.duplicates:
+            lines.append(f"Selected more than once: {', '.join(self.duplicates)}")
+        if self.conflicts:
+            lines.append("Mirror Behavior expects only one side of each controller to be selected: "
+                         + ", ".join(f"{a} / {b}" for a, b in self.conflicts))
+        if self.missing_nodes:
+            lines.append(f"Missing rig nodes: {', '.join(self.missing_nodes)}")
+        if self.missing_drivers:
+            lines.append(f"Missing driver nodes: {', '.join(self.missing_drivers)}")
+        if self.missing_attrs:
+            lines.append(f"Missing attributes: {', '.join(self.missing_attrs)}")
+        return "\n".join(lines) if lines else "Selection is valid"
+
+
+def validate_controls(naming_convention, control_list, is_mirror_behavior, driver_suffix="_driver",
+                      required_nodes=(), required_attrs=()):
+    """
+    Check a control selection in linear time and return a ValidationReport.
+
+    Mirror conflicts are found by grouping controls on their side-stripped tokens (see NameParser.mirror_key),
+    so "L" or "R" appearing inside the body of a name doesn't matter.
+    Scene checks cost one ls call for the drivers and required nodes, plus one listAttr call per node
+    in required_attrs, given as "node.attribute" plugs.
+    """
+    report = ValidationReport()
+    parser = naming_convention.parser
+
+    seen = set()
+    sides_by_key = {}
+    for control in control_list:
+        if control in seen:
+            report.duplicates.append(control)
+            continue
+        seen.add(control)
+        side = parser.parse(control).side
+        if is_mirror_behavior and side in ("L", "R"):
+            sides = sides_by_key.setdefault(parser.mirror_key(control), {})
+            other = sides.get("R" if side == "L" else "L")
+            if other is not None:
+                report.conflicts.append((other, control))
+            sides[side] = control
+
+    controls = list(dict.fromkeys(control_list))
+    drivers = [control + driver_suffix for control in controls] if driver_suffix else []
+    required_nodes = list(dict.fromkeys(list(required_nodes) + [plug.partition(".")[0] for plug in required_attrs]))
+    existing = set(cmds.ls(drivers + required_nodes) or [])
+
+    report.missing_drivers = [driver for driver in drivers if driver not in existing]
+    report.missing_nodes = [node for node in required_nodes if node not in existing]
+
+    attrs_by_node = {}
+    for plug in required_attrs:
+        node, _, attr = plug.partition(".")
+        attrs_by_node.setdefault(node, []).append(attr)
+    for node, attrs in attrs_by_node.items():
+        if node not in existing:
+            continue
+        node_attrs = set(cmds.listAttr(node) or [])
+        report.missing_attrs.extend(f"{node}.{attr}" for attr in attrs if attr not in node_attrs)
+    return report
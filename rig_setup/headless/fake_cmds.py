@@ -0,0 +1,680 @@
+"""
+In-memory stand-in for the subset of maya.cmds used by zanimTools.
+
+It keeps a tiny dependency graph (nodes, attributes, connections), a selection list and an undo queue,
+so the rig tools can run, be benchmarked and be regression-checked outside of a Maya session.
+Every command call is counted in FakeCmds.call_counts, which is the best proxy we have for in-Maya latency.
+
+Usage:
+    from zanimTools.rig_setup.headless import fake_cmds
+    fake = fake_cmds.install()  # Registers "maya" and "maya.cmds" in sys.modules
+    import maya.cmds as cmds
+"""
+import fnmatch
+import json
+import re
+import sys
+import types
+from collections import Counter
+
+# Attributes every node type exposes. Child attributes (rotateX, input3D[1].input3Dz...) are resolved
+# through their root name, so only the roots are listed here.
+_BUILTIN_ATTRS = {
+    "transform": {"translate", "translateX", "translateY", "translateZ",
+                  "rotate", "rotateX", "rotateY", "rotateZ",
+                  "scale", "scaleX", "scaleY", "scaleZ", "visibility", "message"},
+    "joint": {"jointOrient", "jointOrientX", "jointOrientY", "jointOrientZ", "radius"},
+    "multiplyDivide": {"operation", "input1", "input1X", "input1Y", "input1Z",
+                       "input2", "input2X", "input2Y", "input2Z",
+                       "output", "outputX", "outputY", "outputZ", "message"},
+    "remapValue": {"inputValue", "inputMin", "inputMax", "outputMin", "outputMax",
+                   "outValue", "outColor", "value", "color", "message"},
+    "plusMinusAverage": {"operation", "input1D", "input2D", "input3D",
+                         "output1D", "output2D", "output3D", "output3Dx", "output3Dy", "output3Dz", "message"},
+    "container": {"message"},
+}
+
+# Defaults for attributes that are not 0.0
+_ATTR_DEFAULTS = {
+    ("multiplyDivide", "operation"): 1,
+    ("multiplyDivide", "input2X"): 1.0,
+    ("multiplyDivide", "input2Y"): 1.0,
+    ("multiplyDivide", "input2Z"): 1.0,
+    ("remapValue", "inputMax"): 1.0,
+    ("remapValue", "outputMax"): 1.0,
+    ("plusMinusAverage", "operation"): 1,
+    ("transform", "scaleX"): 1.0,
+    ("transform", "scaleY"): 1.0,
+    ("transform", "scaleZ"): 1.0,
+    ("transform", "visibility"): True,
+}
+
+# Node type inheritance, used by ls(type=...) and nodeType(inherited=True)
+_INHERITS = {
+    "joint": "transform",
+}
+
+_TRAILING_DIGITS = re.compile(r"\d+$")
+_INPUT3D_CHILD = re.compile(r"^(input3D\[\d+\])\.input3D([xyz])$")
+_LOWER_AXIS_CHILD = re.compile(r"^(output3D)([xyz])$")
+_UPPER_AXIS_CHILD = re.compile(r"^(.+)([XYZ])$")
+_INPUT3D_INDEX = re.compile(r"^input3D\[(\d+)\]")
+_ROOT_ATTR = re.compile(r"^[^.\[]+")
+
+
+def _child_attrs(attr):
+    """X, Y, Z children of a compound attribute."""
+    if attr.startswith("input3D["):
+        return tuple(f"{attr}.input3D{axis}" for axis in "xyz")
+    if attr == "output3D":
+        return tuple(f"{attr}{axis}" for axis in "xyz")
+    return tuple(f"{attr}{axis}" for axis in "XYZ")
+
+
+def _parent_attr(attr):
+    """(compound attribute, axis index) of a child attribute, or None."""
+    for pattern in (_INPUT3D_CHILD, _LOWER_AXIS_CHILD, _UPPER_AXIS_CHILD):
+        match = pattern.match(attr)
+        if match:
+            return match.group(1), "xyzXYZ".index(match.group(2)) % 3
+    return None
+
+
+def _compute_multiply_divide(read, attr, fake, node_name):
+    axis = attr[-1]
+    operation = read("operation")
+    a, b = read("input1" + axis), read("input2" + axis)
+    if operation == 2:
+        return a / b if b else 0.0
+    if operation == 3:
+        return a ** b
+    return a * b if operation == 1 else a
+
+
+def _compute_remap_value(read, attr, fake, node_name):
+    # Linear curve from (0, 0) to (1, 1), the default of a new remapValue node
+    input_min, input_max = read("inputMin"), read("inputMax")
+    ratio = (read("inputValue") - input_min) / (input_max - input_min) if input_max != input_min else 0.0
+    ratio = min(max(ratio, 0.0), 1.0)
+    output_min = read("outputMin")
+    return output_min + ratio * (read("outputMax") - output_min)
+
+
+def _compute_plus_minus_average(read, attr, fake, node_name):
+    axis = attr[-1]
+    values = [read(f"input3D[{index}].input3D{axis}") for index in fake.input3d_indices(node_name)]
+    operation = read("operation")
+    if not values:
+        return 0.0
+    if operation == 2:
+        return values[0] - sum(values[1:])
+    if operation == 3:
+        return sum(values) / len(values)
+    return sum(values)
+
+
+# (node type, attribute) -> function computing the output value
+_COMPUTE = {
+    ("multiplyDivide", "outputX"): _compute_multiply_divide,
+    ("multiplyDivide", "outputY"): _compute_multiply_divide,
+    ("multiplyDivide", "outputZ"): _compute_multiply_divide,
+    ("remapValue", "outValue"): _compute_remap_value,
+    ("plusMinusAverage", "output3Dx"): _compute_plus_minus_average,
+    ("plusMinusAverage", "output3Dy"): _compute_plus_minus_average,
+    ("plusMinusAverage", "output3Dz"): _compute_plus_minus_average,
+}
+
+
+class FakeNode:
+    __slots__ = ("name", "type", "attrs", "user_attrs")
+
+    def __init__(self, name, node_type):
+        self.name = name
+        self.type = node_type
+        self.attrs = {}  # Explicitly set values, keyed by attribute path
+        self.user_attrs = {}  # User defined attribute name -> data/attribute type
+
+
+class FakeCmds:
+    """A tiny in-memory Maya scene exposing maya.cmds style functions."""
+
+    # Names that are exposed as maya.cmds functions
+    COMMANDS = (
+        "addAttr", "attributeQuery", "connectAttr", "createNode", "currentTime", "delete", "dgeval",
+        "disconnectAttr", "evalDeferred", "evaluationManager", "file", "getAttr", "isConnected", "listAttr",
+        "listConnections", "ls", "nodeType", "objExists", "profiler", "refresh", "rename", "select", "setAttr",
+        "shadingNode", "undo", "undoInfo", "warning",
+    )
+
+    def __init__(self):
+        self.call_counts = Counter()
+        self.warnings = []
+        self.deferred = []
+        self.last_evaluated = set()
+        self._input3d_indices = None
+        self.evaluation_mode = "off"
+        self.sampling = False
+        self.profiler_events = []  # (node name, duration in microseconds) of the computes recorded while sampling
+        self.new_scene()
+
+    # ------------------------------------------------------------------ scene helpers
+
+    def new_scene(self):
+        """Clear the scene, the selection and the undo queue."""
+        self.nodes = {}
+        self.connections = {}  # destination plug -> source plug
+        self.selection = []
+        self.scene_name = ""
+        self.time = 1.0
+        self._undo_stack = []
+        self._open_chunks = 0
+        self._chunk = None
+
+    def reset_counts(self):
+        self.call_counts.clear()
+
+    def total_calls(self):
+        return sum(self.call_counts.values())
+
+    def make_command(self, name):
+        method = getattr(self, "_cmd_" + name)
+        counts = self.call_counts
+
+        def command(*args, **kwargs):
+            counts[name] += 1
+            return method(*args, **kwargs)
+
+        command.__name__ = name
+        return command
+
+    def to_dict(self):
+        """Serialize the scene (used as the fake scene file format)."""
+        return {
+            "nodes": {name: {"type": node.type, "attrs": node.attrs, "user_attrs": node.user_attrs}
+                      for name, node in self.nodes.items()},
+            "connections": self.connections,
+        }
+
+    def from_dict(self, data):
+        self.new_scene()
+        for name, node_data in data.get("nodes", {}).items():
+            node = FakeNode(name, node_data["type"])
+            node.attrs = dict(node_data.get("attrs", {}))
+            node.user_attrs = dict(node_data.get("user_attrs", {}))
+            self.nodes[name] = node
+        self.connections = dict(data.get("connections", {}))
+
+    # ------------------------------------------------------------------ undo
+
+    def _record(self, inverse):
+        """Store the inverse of a mutation in the current undo chunk."""
+        if self._chunk is not None:
+            self._chunk.append(inverse)
+        else:
+            self._undo_stack.append([inverse])
+
+    def _cmd_undoInfo(self, openChunk=False, closeChunk=False, chunkName=None, query=False, state=None,
+                      stateWithoutFlush=None, **kwargs):
+        if openChunk:
+            if self._open_chunks == 0:
+                self._chunk = []
+            self._open_chunks += 1
+        elif closeChunk:
+            self._open_chunks = max(0, self._open_chunks - 1)
+            if self._open_chunks == 0 and self._chunk is not None:
+                if self._chunk:
+                    self._undo_stack.append(self._chunk)
+                self._chunk = None
+        elif query:
+            return True
+
+    def _cmd_undo(self):
+        if not self._undo_stack:
+            return
+        for inverse in reversed(self._undo_stack.pop()):
+            inverse()
+
+    # ------------------------------------------------------------------ node creation and lookup
+
+    def _split_plug(self, plug):
+        node_name, _, attr = plug.partition(".")
+        return node_name, attr
+
+    def _unique_name(self, name):
+        if name not in self.nodes:
+            return name
+        base = _TRAILING_DIGITS.sub("", name)
+        number = 1
+        while f"{base}{number}" in self.nodes:
+            number += 1
+        return f"{base}{number}"
+
+    def _create(self, node_type, name=None):
+        name = self._unique_name(name or f"{node_type}1")
+        self.nodes[name] = FakeNode(name, node_type)
+        self._record(lambda: self._remove_node(name))
+        return name
+
+    def _cmd_createNode(self, node_type, name=None, parent=None, skipSelect=False, **kwargs):
+        return self._create(node_type, name)
+
+    def _cmd_shadingNode(self, node_type, asUtility=False, asShader=False, asTexture=False, name=None, **kwargs):
+        return self._create(node_type, name)
+
+    def _is_type(self, node_type, wanted):
+        while node_type is not None:
+            if node_type == wanted:
+                return True
+            node_type = _INHERITS.get(node_type)
+        return False
+
+    def _has_attr(self, node, attr):
+        root = _ROOT_ATTR.match(attr)
+        if not root:
+            return False
+        root = root.group(0)
+        if root in node.user_attrs:
+            return True
+        node_type = node.type
+        while node_type is not None:
+            if root in _BUILTIN_ATTRS.get(node_type, ()):
+                return True
+            node_type = _INHERITS.get(node_type)
+        return False
+
+    def _cmd_objExists(self, name):
+        node_name, attr = self._split_plug(name)
+        node = self.nodes.get(node_name)
+        if node is None:
+            return False
+        return not attr or self._has_attr(node, attr)
+
+    def _cmd_nodeType(self, name, inherited=False, **kwargs):
+        node = self._node(self._split_plug(name)[0])
+        if not inherited:
+            return node.type
+        chain = []
+        node_type = node.type
+        while node_type is not None:
+            chain.insert(0, node_type)
+            node_type = _INHERITS.get(node_type)
+        return chain
+
+    def _node(self, name):
+        node = self.nodes.get(name)
+        if node is None:
+            raise ValueError(f"No object matches name: {name}")
+        return node
+
+    def _cmd_ls(self, *args, selection=False, sl=False, type=None, showType=False, long=False, **kwargs):
+        if selection or sl:
+            names = [name for name in self.selection if name in self.nodes]
+        elif args:
+            patterns = []
+            for arg in args:
+                patterns.extend([arg] if isinstance(arg, str) else arg)
+            names = []
+            for pattern in patterns:
+                if any(char in pattern for char in "*?["):
+                    names.extend(name for name in self.nodes if fnmatch.fnmatchcase(name, pattern))
+                elif pattern in self.nodes:
+                    names.append(pattern)
+            names = list(dict.fromkeys(names))
+        else:
+            names = list(self.nodes)
+
+        if type:
+            wanted = [type] if isinstance(type, str) else list(type)
+            names = [name for name in names if any(self._is_type(self.nodes[name].type, w) for w in wanted)]
+
+        if showType:
+            result = []
+            for name in names:
+                result.extend((name, self.nodes[name].type))
+            return result
+        return names
+
+    def _remove_node(self, name):
+        self.nodes.pop(name, None)
+        for dst, src in list(self.connections.items()):
+            if dst.partition(".")[0] == name or src.partition(".")[0] == name:
+                del self.connections[dst]
+        if name in self.selection:
+            self.selection.remove(name)
+
+    def _cmd_delete(self, *args, **kwargs):
+        names = []
+        for arg in args:
+            names.extend([arg] if isinstance(arg, str) else arg)
+        if not names:
+            names = list(self.selection)
+        nodes = [self._node(name) for name in dict.fromkeys(names)]
+        deleted = {node.name for node in nodes}
+        removed_edges = {dst: src for dst, src in self.connections.items()
+                         if dst.partition(".")[0] in deleted or src.partition(".")[0] in deleted}
+        for dst in removed_edges:
+            del self.connections[dst]
+        for node in nodes:
+            del self.nodes[node.name]
+        self.selection = [name for name in self.selection if name not in deleted]
+
+        def restore(nodes=nodes, removed_edges=removed_edges):
+            self.nodes.update((node.name, node) for node in nodes)
+            self.connections.update(removed_edges)
+
+        self._record(restore)
+
+    def _cmd_rename(self, old, new, **kwargs):
+        self._node(old)  # Raises like Maya when old doesn't exist
+        new = self._unique_name(new)
+        self._rename(old, new)
+        self._record(lambda: self._rename(new, old))
+        return new
+
+    def _rename(self, old, new):
+        node = self.nodes.pop(old)
+        node.name = new
+        self.nodes[new] = node
+        renamed = {}
+        for dst, src in self.connections.items():
+            dst_node, dst_attr = self._split_plug(dst)
+            src_node, src_attr = self._split_plug(src)
+            dst = f"{new}.{dst_attr}" if dst_node == old else dst
+            src = f"{new}.{src_attr}" if src_node == old else src
+            renamed[dst] = src
+        self.connections = renamed
+        self.selection = [new if name == old else name for name in self.selection]
+
+    # ------------------------------------------------------------------ attributes
+
+    def _cmd_attributeQuery(self, attr, node=None, exists=False, listDefault=False, **kwargs):
+        target = self._node(node)
+        if exists:
+            return self._has_attr(target, attr)
+        if listDefault:
+            return [_ATTR_DEFAULTS.get((target.type, attr), 0.0)]
+        return None
+
+    def _cmd_addAttr(self, node, longName=None, ln=None, dataType=None, attributeType=None, **kwargs):
+        target = self._node(node)
+        name = longName or ln
+        if self._has_attr(target, name):
+            raise RuntimeError(f"Found an attribute named '{name}' on {node} already")
+        target.user_attrs[name] = dataType or attributeType or "double"
+        if "defaultValue" in kwargs:
+            target.attrs[name] = kwargs["defaultValue"]
+
+        def remove(target=target, name=name):
+            target.user_attrs.pop(name, None)
+            target.attrs.pop(name, None)
+
+        self._record(remove)
+
+    def _cmd_listAttr(self, node, userDefined=False, **kwargs):
+        target = self._node(node)
+        if userDefined:
+            return list(target.user_attrs) or None
+        attrs = set(target.user_attrs)
+        node_type = target.type
+        while node_type is not None:
+            attrs.update(_BUILTIN_ATTRS.get(node_type, ()))
+            node_type = _INHERITS.get(node_type)
+        return sorted(attrs)
+
+    def _cmd_getAttr(self, plug, **kwargs):
+        node_name, attr = self._split_plug(plug)
+        node = self._node(node_name)
+        if not self._has_attr(node, attr):
+            raise ValueError(f"No object matches name: {plug}")
+        if node.user_attrs.get(attr) == "string" and attr not in node.attrs and plug not in self.connections:
+            return None
+        return self.evaluate([plug])[plug]
+
+    def evaluate(self, plugs):
+        """
+        Pull the values of plugs through the graph, like one DG evaluation: every upstream plug is computed once
+        per call. multiplyDivide, remapValue (linear curve) and plusMinusAverage outputs are computed.
+        The names of the nodes computed are left in self.last_evaluated.
+        """
+        cache = {}
+        self.last_evaluated = set()
+        self._input3d_indices = None
+        values = {plug: self._value(plug, cache) for plug in plugs}
+        if self.sampling:  # One compute event per computed node, they all take 1 microsecond here
+            self.profiler_events.extend((node_name, 1.0) for node_name in sorted(self.last_evaluated))
+        return values
+
+    def input3d_indices(self, node_name):
+        """Used input3D[i] indices of a plusMinusAverage, indexed once per evaluate() call."""
+        if self._input3d_indices is None:
+            self._input3d_indices = {}
+            plugs = list(self.connections) + [f"{node.name}.{attr}" for node in self.nodes.values()
+                                              for attr in node.attrs]
+            for plug in plugs:
+                node, _, attr = plug.partition(".")
+                match = _INPUT3D_INDEX.match(attr)
+                if match:
+                    self._input3d_indices.setdefault(node, set()).add(int(match.group(1)))
+        return sorted(self._input3d_indices.get(node_name, ()))
+
+    def _value(self, plug, cache):
+        if plug in cache:
+            return cache[plug]
+        node_name, attr = self._split_plug(plug)
+        node = self.nodes[node_name]
+
+        source = self.connections.get(plug)
+        parent = _parent_attr(attr)
+        compute = _COMPUTE.get((node.type, _ROOT_ATTR.match(attr).group(0)))
+        if source is not None:
+            value = self._value(source, cache)
+        elif parent is not None and f"{node_name}.{parent[0]}" in self.connections:
+            # Child of a connected compound (rotateX of a connected rotate...)
+            source_node, source_attr = self._split_plug(self.connections[f"{node_name}.{parent[0]}"])
+            value = self._value(f"{source_node}.{_child_attrs(source_attr)[parent[1]]}", cache)
+        elif compute is not None:
+            self.last_evaluated.add(node_name)
+            value = compute(lambda name: self._value(f"{node_name}.{name}", cache), attr, self, node_name)
+        elif attr in node.attrs:
+            value = node.attrs[attr]
+        else:
+            value = _ATTR_DEFAULTS.get((node.type, attr), 0.0)
+        cache[plug] = value
+        return value
+
+    def _cmd_setAttr(self, plug, *values, type=None, **kwargs):
+        node_name, attr = self._split_plug(plug)
+        node = self._node(node_name)
+        if not self._has_attr(node, attr):
+            raise RuntimeError(f"No object matches name: {plug}")
+        if plug in self.connections:
+            raise RuntimeError(f"setAttr: The attribute '{plug}' is locked or connected and cannot be modified.")
+        value = values[0] if len(values) == 1 else list(values)
+        missing = object()
+        previous = node.attrs.get(attr, missing)
+        node.attrs[attr] = value
+
+        def restore(node=node, attr=attr, previous=previous):
+            if previous is missing:
+                node.attrs.pop(attr, None)
+            else:
+                node.attrs[attr] = previous
+
+        self._record(restore)
+
+    # ------------------------------------------------------------------ connections
+
+    def _check_plug(self, plug):
+        node_name, attr = self._split_plug(plug)
+        node = self.nodes.get(node_name)
+        if node is None or not attr or not self._has_attr(node, attr):
+            raise RuntimeError(f"The source or destination attribute '{plug}' was not found.")
+
+    def _cmd_connectAttr(self, src, dst, force=False, **kwargs):
+        self._check_plug(src)
+        self._check_plug(dst)
+        previous = self.connections.get(dst)
+        if previous == src:
+            raise RuntimeError(f"'{src}' is already connected to '{dst}'.")
+        if previous is not None and not force:
+            raise RuntimeError(f"'{dst}' already has an incoming connection from '{previous}'.")
+        self.connections[dst] = src
+
+        def restore(dst=dst, previous=previous):
+            if previous is None:
+                self.connections.pop(dst, None)
+            else:
+                self.connections[dst] = previous
+
+        self._record(restore)
+
+    def _cmd_disconnectAttr(self, src, dst, **kwargs):
+        if self.connections.get(dst) != src:
+            raise RuntimeError(f"There is no connection from '{src}' to '{dst}' to disconnect.")
+        del self.connections[dst]
+        self._record(lambda: self.connections.__setitem__(dst, src))
+
+    def _cmd_isConnected(self, src, dst, **kwargs):
+        return self.connections.get(dst) == src
+
+    def _cmd_listConnections(self, *args, source=True, destination=True, plugs=False, connections=False,
+                             s=None, d=None, p=None, c=None, **kwargs):
+        source = source if s is None else s
+        destination = destination if d is None else d
+        plugs = plugs if p is None else p
+        connections = connections if c is None else c
+
+        targets = []
+        for arg in args:
+            targets.extend([arg] if isinstance(arg, str) else arg)
+        node_targets = {t for t in targets if "." not in t}
+        plug_targets = {t for t in targets if "." in t}
+
+        def matches(plug):
+            return plug in plug_targets or plug.partition(".")[0] in node_targets
+
+        result = []
+        for dst, src in self.connections.items():
+            if source and matches(dst):
+                if connections:
+                    result.append(dst)
+                result.append(src if plugs else src.partition(".")[0])
+            if destination and matches(src):
+                if connections:
+                    result.append(src)
+                result.append(dst if plugs else dst.partition(".")[0])
+        return result or None
+
+    # ------------------------------------------------------------------ selection, files and misc
+
+    def _cmd_select(self, *args, add=False, clear=False, replace=True, **kwargs):
+        if clear:
+            self.selection = []
+            return
+        names = []
+        for arg in args:
+            names.extend([arg] if isinstance(arg, str) else arg)
+        for name in names:
+            self._node(name)
+        self.selection = list(dict.fromkeys((self.selection if add else []) + names))
+
+    def _cmd_warning(self, message):
+        self.warnings.append(message)
+
+    def _cmd_refresh(self, suspend=None, force=False, **kwargs):
+        pass
+
+    def _cmd_evalDeferred(self, command, lowestPriority=False, **kwargs):
+        self.deferred.append(command)
+
+    def run_deferred(self):
+        """Run queued evalDeferred commands until the queue is empty (stands in for Maya idle time)."""
+        while self.deferred:
+            command = self.deferred.pop(0)
+            command() if callable(command) else exec(command)
+
+    def _cmd_currentTime(self, *args, query=False, update=True, **kwargs):
+        if query or not args:
+            return self.time
+        self.time = float(args[0])
+        if update:  # Stands in for the scene update, every connected plug is evaluated
+            self.evaluate(list(self.connections))
+        return self.time
+
+    def _cmd_dgeval(self, *plugs, **kwargs):
+        self.evaluate([plug for item in plugs for plug in ([item] if isinstance(item, str) else item)])
+
+    def _cmd_evaluationManager(self, query=False, mode=None, **kwargs):
+        # The stand-in always evaluates like the DG, the mode is only remembered
+        if query:
+            return [self.evaluation_mode]
+        if mode is not None:
+            self.evaluation_mode = mode
+
+    def _cmd_profiler(self, reset=False, sampling=None, eventCount=False, eventName=False, eventDuration=False,
+                      eventIndex=None, output=None, **kwargs):
+        if reset:
+            del self.profiler_events[:]
+        elif sampling is not None:
+            self.sampling = sampling
+        elif eventCount:
+            return len(self.profiler_events)
+        elif eventName:
+            return self.profiler_events[eventIndex][0]
+        elif eventDuration:
+            return self.profiler_events[eventIndex][1]
+
+    def _cmd_file(self, path=None, open=False, save=False, new=False, rename=None, force=False, query=False,
+                  sceneName=False, type=None, **kwargs):
+        if query and sceneName:
+            return self.scene_name
+        if new:
+            self.new_scene()
+            return None
+        if open:
+            with _open(path) as handle:
+                self.from_dict(json.load(handle))
+            self.scene_name = path
+            return path
+        if rename:
+            self.scene_name = rename
+            return rename
+        if save:
+            if not self.scene_name:
+                raise RuntimeError("Scene has no name, use file(rename=...) first.")
+            with _open(self.scene_name, "w") as handle:
+                json.dump(self.to_dict(), handle)
+            return self.scene_name
+        return None
+
+
+# file() takes an "open" flag like the real command, so keep a handle on the builtin
+_open = open
+
+
+def install(fake=None):
+    """Register a FakeCmds instance as "maya.cmds" (and an empty "maya" package) and return it."""
+    fake = fake or FakeCmds()
+    module = types.ModuleType("maya.cmds")
+    for name in FakeCmds.COMMANDS:
+        setattr(module, name, fake.make_command(name))
+    module.fake = fake
+
+    maya_module = sys.modules.get("maya")
+    if maya_module is None or getattr(maya_module, "__fake__", False):
+        maya_module = types.ModuleType("maya")
+        maya_module.__path__ = []
+        maya_module.__fake__ = True
+        sys.modules["maya"] = maya_module
+    maya_module.cmds = module
+    sys.modules["maya.cmds"] = module
+    return fake
+
+
+def uninstall():
+    """Remove the fake modules registered by install()."""
+    if getattr(sys.modules.get("maya"), "__fake__", False):
+        del sys.modules["maya"]
+    module = sys.modules.get("maya.cmds")
+    if module is not None and hasattr(module, "fake"):
+        del sys.modules["maya.cmds"]
@@ -0,0 +1,51 @@
+"""
+Synthetic rigs for the headless stand-in, install rig_setup.headless.fake_cmds before importing this module.
+"""
+import maya.cmds as cmds
+
+
+def create_lip_rig(control_count, jaw_joint="C_jawA01_JNT", jaw_control="C_jawOpen_CTL"):
+    """
+    Create a jaw joint, a jaw control with the lip attributes and control_count lip controls with their
+    _driver transforms, alternating L/R pairs and Top/Bot rows (L_lipTop00_CTL, R_lipTop00_CTL, L_lipBot01_CTL...).
+    Returns the control names.
+    """
+    cmds.createNode("joint", name=jaw_joint)
+    cmds.createNode("transform", name=jaw_control)
+    for attr in ("StickyLips", "StickyTopBot", "PressLips"):
+        cmds.addAttr(jaw_control, longName=attr, attributeType="double")
+
+    controls = []
+    for index in range(control_count):
+        side = "L" if index % 2 == 0 else "R"
+        pos = "Top" if (index // 2) % 2 == 0 else "Bot"
+        control = cmds.createNode("transform", name=f"{side}_lip{pos}{index // 2:03d}_CTL")
+        cmds.createNode("transform", name=control + "_driver")
+        controls.append(control)
+    return controls
+
+
+def create_module_rig(module, control_count, naming_convention, base="ctrl", positions=("Top", "Bot")):
+    """
+    Create the nodes and attributes a RigModule requires and control_count controls with their driver transforms,
+    named with naming_convention and alternating L/R pairs and positions. Returns the control names.
+    """
+    required_nodes, required_attrs = module.requirements(naming_convention)
+    for node in required_nodes:
+        if not cmds.objExists(node):
+            cmds.createNode("transform", name=node)
+    for plug in required_attrs:
+        node, attr = plug.split(".", 1)
+        if not cmds.objExists(node):
+            cmds.createNode("transform", name=node)
+        cmds.addAttr(node, longName=attr, attributeType="double")
+
+    controls = []
+    for index in range(control_count):
+        side = "L" if index % 2 == 0 else "R"
+        pos = positions[(index // 2) % len(positions)]
+        name = naming_convention.resolve(base, pos, side, number=f"{index // 2:03d}", type="CTL")
+        control = cmds.createNode("transform", name=name)
+        cmds.createNode("transform", name=control + module.driver_suffix)
+        controls.append(control)
+    return controls
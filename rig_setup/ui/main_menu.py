@@ -1,24 +1,51 @@
-import maya.cmds as cmds
-from zanimTools.rig_setup.core.module_lips import create_lip_nodes
+import os
+import tempfile
+
+from zanimTools.rig_setup.core import scene_events
+from zanimTools.rig_setup.core.instrumentation import cmds, profile
+
+# Tool modules (module_lips, scene_data...) are imported where they are used, so opening the window only
+# pays for the widgets of the first tab. Other tabs are built the first time they are shown.
+
+# fileDialog2 filter of rig snapshot files, see snapshot.py
+SNAPSHOT_FILTER = "Rig Snapshots (*.ztsnap);;All Files (*.*)"
 
 
 class MainMenu:
 
-    def __init__(self, naming_convention):
+    def __init__(self, naming_convention=None):
+        if naming_convention is None:
+            from zanimTools.rig_setup.core.scene_data import NamingConvention
+            naming_convention = NamingConvention()
 
         self.naming_convention = naming_convention
         self.is_mirror_behavior = None
-        self.window = cmds.window("rigSetupUI", title="Rig Setup Tool", widthHeight=(400, 600))
+        # retain keeps the window around when closed, so show() can show it again instead of rebuilding it
+        self.window = cmds.window("rigSetupUI", title="Rig Setup Tool", widthHeight=(400, 600), retain=True,
+                                  closeCommand=self.on_close)
         cmds.columnLayout(adjustableColumn=True, columnAlign="center")
-        self.tabs = cmds.tabLayout(innerMarginWidth=5, innerMarginHeight=5)
+        self.tabs = cmds.tabLayout(innerMarginWidth=5, innerMarginHeight=5, selectCommand=self.build_selected_tab)
 
         # Dictionary to store UI elements and their corresponding naming convention attributes
         self.ui_elements = {}
+        self.profile_checkbox = None
+        self.compact_checkbox = None
+        self.cluster_menu = None
+        self.preset_menu = None
+        self.progress_bar = None
+        self.running_build = None  # DeferredBuild of the lip build in progress
 
         # Name Convention Tab
         tab_naming = cmds.columnLayout(adjustableColumn=True, columnAlign="center")
         cmds.tabLayout(self.tabs, edit=True, tabLabel=[(tab_naming, "Naming Convention")])
 
+        # Presets Section: naming conventions shared between scenes, see presets.py
+        cmds.frameLayout(label="Presets", font="boldLabelFont", collapsable=True)
+        self.preset_menu = cmds.optionMenu(label="Preset:", changeCommand=self.apply_preset)
+        self.refresh_presets()
+        cmds.button(label="Save Settings As Preset...", command=self.save_preset)
+        cmds.setParent("..")  # End of Presets Section
+
         # Naming Convention Collapsable Section
         cmds.frameLayout(label="Naming Convention Rules", font="boldLabelFont", collapsable=True)
 
@@ -50,7 +77,7 @@ class MainMenu:
                                                            text=self.naming_convention.type_joint)
         self.ui_elements['type_control'] = cmds.textFieldGrp(label="Type Control:",
                                                              text=self.naming_convention.type_control)
-        self.ui_elements['type_Group'] = cmds.textFieldGrp(label="Type Group:",
+        self.ui_elements['type_group'] = cmds.textFieldGrp(label="Type Group:",
                                                            text=self.naming_convention.type_group)
         self.ui_elements['type_locator'] = cmds.textFieldGrp(label="Type Locator:",
                                                              text=self.naming_convention.type_locator)
@@ -69,10 +96,49 @@ class MainMenu:
         cmds.setParent("..")  # End of Rig Joint Names Collapsable Section
         cmds.setParent("..")  # End of Name Convention Tab
 
-        # Facial Tab
+        # Facial Tab, its content is built on first view
         tab_facial = cmds.columnLayout(adjustableColumn=True)
         cmds.tabLayout(self.tabs, edit=True, tabLabel=[(tab_facial, "Facial")])
+        cmds.setParent("..")  # End of Facial Tab
+
+        # Tab layout -> function building its content, removed once built
+        self.lazy_tabs = {tab_facial: self.build_facial_tab}
+
+        cmds.setParent("..")  # End of tabs
+
+        # Save Settings Section (below tabs)
+        cmds.button(label="Save Settings", command=self.save_settings)
+
+        cmds.showWindow(self.window)
+        self.watch_scene()
+
+    def watch_scene(self):
+        """Follow scene changes while the window is open, so it never shows the settings of another scene."""
+        # Subscribed once active, the reset sent by activate() is for the caches, the window is already up to date
+        scene_events.activate()
+        scene_events.subscribe("scene_reset", self.on_scene_reset)
+
+    def on_scene_reset(self):
+        # Called from a scene callback, the settings are read once the file operation is over. Reading them creates
+        # nothing, an untouched scene stays unmodified
+        cmds.evalDeferred(self.refresh_from_scene)
+
+    def on_close(self, *args):
+        """The window is hidden: stop listening to the scene, the caches fall back to querying it."""
+        scene_events.unsubscribe("scene_reset", self.on_scene_reset)
+        scene_events.deactivate()
 
+    def build_selected_tab(self, *args):
+        """Build the content of the selected tab the first time it is shown."""
+        selected = cmds.tabLayout(self.tabs, query=True, selectTab=True)
+        for tab, build in list(self.lazy_tabs.items()):
+            if tab.split("|")[-1] == selected.split("|")[-1]:
+                del self.lazy_tabs[tab]
+                cmds.setParent(tab)
+                build()
+                cmds.setParent(self.tabs)
+
+    def build_facial_tab(self):
         # Jaw Fields Collapsable Section
         cmds.frameLayout(label="Jaw Fields", font="boldLabelFont", collapsable=True)
 
@@ -85,19 +151,38 @@ class MainMenu:
         # Mirror Behavior Checkbox Section
         cmds.frameLayout(label="Mirror Behavior Field", font="boldLabelFont")
 
-        self.ui_elements['mirror_behavior'] = cmds.checkBox(label="Mirror Behavior", value=False,
+        self.ui_elements['mirror_behavior'] = cmds.checkBox(label="Mirror Behavior",
+                                                            value=self.naming_convention.mirror_behavior == 'True',
                                                             changeCommand=self.refresh_mirror_behavior)
         cmds.setParent("..")  # End of Mirror Behavior Checkbox Section
 
+        # Compact Build Checkbox: one shared network per lip row instead of one per control
+        self.compact_checkbox = cmds.checkBox(label="Compact Build (shared row networks)", value=False)
+        # Cluster layout of the compact build: one network per row, or per side and row for parallel evaluation
+        self.cluster_menu = cmds.optionMenu(label="Compact Clusters:")
+        cmds.menuItem(label="row")
+        cmds.menuItem(label="side_row")
+
+        # Profile Build Checkbox: prints a Maya-call report and writes a Chrome trace after each build
+        self.profile_checkbox = cmds.checkBox(label="Profile Build", value=False)
+
         # Build Lip Nodes Button Section
+        cmds.button(label="Select All Lip Controls", command=self.select_lip_controls)
         cmds.button(label="Build Lip Nodes", command=self.build_lip_nodes)
-        cmds.setParent("..")  # End of Build Lip Nodes Button Section
-        cmds.setParent("..")  # End of Facial Tab
-
-        # Save Settings Section (below tabs)
-        cmds.button(label="Save Settings", command=self.save_settings)
+        # Builds run in the background (Maya idle time), they can be cancelled and are then rolled back
+        self.progress_bar = cmds.progressBar(maxValue=100, progress=0)
+        cmds.button(label="Cancel Build", command=self.cancel_build)
+        cmds.button(label="Preview Lip Nodes (Dry Run)", command=self.preview_lip_nodes)
+        cmds.button(label="Report Lip Evaluation Time", command=self.report_lip_evaluation)
 
-        cmds.showWindow(self.window)
+        # Generated Lip Nodes Section, works from the build manifest stored in the scene
+        cmds.frameLayout(label="Generated Lip Nodes", font="boldLabelFont", collapsable=True)
+        cmds.button(label="Select Generated Lip Nodes", command=self.select_lip_nodes)
+        cmds.button(label="Rebuild Lip Nodes", command=self.rebuild_lip_nodes)
+        cmds.button(label="Delete Lip Nodes", command=self.delete_lip_nodes)
+        cmds.button(label="Export Lip Snapshot", command=self.export_lip_snapshot)
+        cmds.button(label="Restore Lip Snapshot", command=self.restore_lip_snapshot)
+        cmds.setParent("..")  # End of Generated Lip Nodes Section
 
     # Define what the button "save settings" does
     def save_settings(self, *args):
@@ -119,12 +204,199 @@ class MainMenu:
         """Make sure the latest UI values are used before running the lip setup."""
         # Save settings to update naming convention
         self.save_settings()
-        # Run lip setup
+
+        # Run lip setup, module_lips is only imported once a build is asked for
+        from zanimTools.rig_setup.core.module_lips import create_lip_nodes, start_lip_build
+        if self.running_build is not None and self.running_build.is_running():
+            cmds.warning("A lip build is already running, cancel it or wait for it to finish.")
+            return
+
+        is_mirror_behavior = self.naming_convention.mirror_behavior == 'True'
+        if not self.profile_checkbox or not cmds.checkBox(self.profile_checkbox, query=True, value=True):
+            cmds.progressBar(self.progress_bar, edit=True, progress=0)
+            self.running_build = start_lip_build(
+                self.naming_convention,
+                is_mirror_behavior=is_mirror_behavior,
+                on_progress=self.update_build_progress,
+                on_finished=self.end_build,
+                on_cancelled=self.end_build,
+                **self.lip_build_options()
+            )
+            return
+
+        # Profiled builds run in one go, so the report only holds the build
+        trace_path = os.path.join(tempfile.gettempdir(), "rigSetup_buildLipNodes_trace.json")
+        with profile("Build Lip Nodes", report=True, trace_path=trace_path):
+            create_lip_nodes(
+                self.naming_convention,
+                is_mirror_behavior=is_mirror_behavior,
+                **self.lip_build_options()
+            )
+        print(f"Chrome trace written to {trace_path}")
+
+    def update_build_progress(self, done, total):
+        cmds.progressBar(self.progress_bar, edit=True, progress=int(100.0 * done / total))
+
+    def end_build(self, *args):
+        self.running_build = None
+        cmds.progressBar(self.progress_bar, edit=True, progress=0)
+
+    def cancel_build(self, *args):
+        """Stop the running lip build, what it built so far is undone."""
+        if self.running_build is not None:
+            self.running_build.cancel()
+
+    def lip_build_options(self):
+        """Layout options of the lip build picked in the Facial tab."""
+        return {
+            "compact": cmds.checkBox(self.compact_checkbox, query=True, value=True),
+            "cluster": cmds.optionMenu(self.cluster_menu, query=True, value=True),
+        }
+
+    def preview_lip_nodes(self, *args):
+        """Print what Build Lip Nodes would create, without touching the scene."""
+        from zanimTools.rig_setup.core.module_lips import create_lip_nodes
+
+        self.save_settings()
         create_lip_nodes(
             self.naming_convention,
-            is_mirror_behavior=self.naming_convention.mirror_behavior == 'True'
+            is_mirror_behavior=self.naming_convention.mirror_behavior == 'True',
+            dry_run=True,
+            **self.lip_build_options()
         )
 
+    def select_lip_controls(self, *args):
+        """Select every lip control of the scene by name (one side only with Mirror Behavior)."""
+        from zanimTools.rig_setup.core.control_query import find_controls
+
+        self.save_settings()
+        sides = ("L", "C") if self.naming_convention.mirror_behavior == 'True' else None
+        controls = find_controls(self.naming_convention, side=sides, type="CTL", body_contains="lip")
+        if controls:
+            cmds.select(controls, replace=True)
+        else:
+            cmds.warning("No lip controls found with the current naming convention.")
+
+    def select_lip_nodes(self, *args):
+        from zanimTools.rig_setup.core.build_manifest import select_build
+        from zanimTools.rig_setup.core.module_lips import MANIFEST_SYSTEM
+        select_build(MANIFEST_SYSTEM, self.naming_convention.settings_node)
+
+    def rebuild_lip_nodes(self, *args):
+        """Rebuild the recorded lip setup with the latest UI values."""
+        from zanimTools.rig_setup.core.module_lips import rebuild_lip_nodes
+
+        self.save_settings()
+        rebuild_lip_nodes(self.naming_convention)
+
+    def delete_lip_nodes(self, *args):
+        from zanimTools.rig_setup.core.build_manifest import delete_build
+        from zanimTools.rig_setup.core.module_lips import MANIFEST_SYSTEM
+
+        manifest = delete_build(MANIFEST_SYSTEM, self.naming_convention.settings_node)
+        if manifest is not None:
+            cmds.warning(f"Deleted lip setup, {manifest}")
+
+    def export_lip_snapshot(self, *args):
+        """Save the recorded lip setup, with its tweaks, to a snapshot file."""
+        from zanimTools.rig_setup.core.module_lips import MANIFEST_SYSTEM
+        from zanimTools.rig_setup.core.snapshot import export_snapshot
+
+        paths = cmds.fileDialog2(fileFilter=SNAPSHOT_FILTER, dialogStyle=2, fileMode=0, caption="Export Lip Snapshot")
+        if paths:
+            export_snapshot(MANIFEST_SYSTEM, paths[0], self.naming_convention.settings_node)
+
+    def restore_lip_snapshot(self, *args):
+        """Build a lip snapshot file in this scene, renamed to the latest UI values, hand tweaks included."""
+        from zanimTools.rig_setup.core.snapshot import restore_snapshot
+
+        paths = cmds.fileDialog2(fileFilter=SNAPSHOT_FILTER, dialogStyle=2, fileMode=1, caption="Restore Lip Snapshot")
+        if paths:
+            self.save_settings()
+            restore_snapshot(paths[0], self.naming_convention)
+
+    def report_lip_evaluation(self, *args):
+        """Time the evaluation of the selected controls' drivers over the playback range, per frame."""
+        from zanimTools.rig_setup.core.build_manifest import read_manifest
+        from zanimTools.rig_setup.core.eval_profiler import driver_plugs, measure_evaluation, upstream_nodes
+        from zanimTools.rig_setup.core.module_lips import MANIFEST_SYSTEM
+
+        control_list = cmds.ls(sl=True)
+        if not control_list:
+            cmds.warning("Please select the lip controllers to measure.")
+            return
+        manifest = read_manifest(MANIFEST_SYSTEM, self.naming_convention.settings_node)
+        if manifest is None:
+            cmds.warning("No lip setup recorded in this scene, build it first")
+            return
+        start = cmds.playbackOptions(query=True, minTime=True)
+        end = cmds.playbackOptions(query=True, maxTime=True)
+        plugs = driver_plugs(control_list)
+        nodes = upstream_nodes(plugs, manifest.edges)  # Only the networks of the selected controls are timed
+        # DG and parallel side by side, each run saved for the Profiler window
+        for mode in ("off", "parallel"):
+            profiler_output = os.path.join(tempfile.gettempdir(), f"rigSetup_lipEvaluation_{mode}.txt")
+            report = measure_evaluation(plugs, nodes, start, end, mode=mode,
+                                        profiler_output=profiler_output, label="Lip Evaluation")
+            print(f"{report}, profiler recording written to {profiler_output}")
+
+    def refresh_presets(self):
+        """Fill the preset menu with the presets on disk (listing is cached until a preset folder changes)."""
+        from zanimTools.rig_setup.core.presets import list_presets
+
+        for item in cmds.optionMenu(self.preset_menu, query=True, itemListLong=True) or []:
+            cmds.deleteUI(item)
+        cmds.menuItem(label="(scene settings)", parent=self.preset_menu)
+        for name in list_presets():
+            cmds.menuItem(label=name, parent=self.preset_menu)
+
+    def apply_preset(self, name, *args):
+        """Write the chosen preset to the scene in one go and show its values."""
+        from zanimTools.rig_setup.core.presets import apply_preset
+
+        if name == "(scene settings)":
+            return
+        apply_preset(self.naming_convention, name)
+        self.refresh_fields()
+        cmds.warning(f"Preset {name} applied to this scene!")
+
+    def save_preset(self, *args):
+        """Save the current UI values as a preset in the user preset folder."""
+        from zanimTools.rig_setup.core.presets import save_preset
+
+        result = cmds.promptDialog(title="Save Preset", message="Preset Name:", button=["Save", "Cancel"],
+                                   defaultButton="Save", cancelButton="Cancel", dismissString="Cancel")
+        name = cmds.promptDialog(query=True, text=True).strip()
+        if result != "Save" or not name:
+            return
+        self.save_settings()
+        path = save_preset(name, self.naming_convention.as_dict())
+        self.refresh_presets()
+        cmds.optionMenu(self.preset_menu, edit=True, value=name)
+        cmds.warning(f"Preset saved to {path}")
+
+    def refresh_from_scene(self):
+        """Reload the settings of the current scene into the window (it may have been kept from another scene)."""
+        from zanimTools.rig_setup.core.scene_data import NamingConvention
+        self.naming_convention = NamingConvention(self.naming_convention.settings_node)
+        self.watch_scene()
+        self.refresh_presets()
+        self.refresh_fields()
+
+    def refresh_fields(self):
+        """Show the values of the naming convention in the UI fields."""
+        for attr_name, ui_element in self.ui_elements.items():
+            value = getattr(self.naming_convention, attr_name, None)
+            if value is None:
+                continue
+            ui_type = cmds.objectTypeUI(ui_element)
+            if ui_type == 'textFieldGrp':
+                cmds.textFieldGrp(ui_element, edit=True, text=str(value))
+            elif ui_type == 'checkBox':
+                cmds.checkBox(ui_element, edit=True, value=str(value) == 'True')
+            elif ui_type == 'intFieldGrp':
+                cmds.intFieldGrp(ui_element, edit=True, value1=int(value))
+
     def refresh_mirror_behavior(self, *args):
         self.is_mirror_behavior = cmds.checkBox(self.ui_elements['mirror_behavior'], query=True, value=True)
         print(self.is_mirror_behavior)
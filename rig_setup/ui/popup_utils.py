@@ -1,11 +1,22 @@
-import maya.cmds as cmds
+from zanimTools.rig_setup.core.instrumentation import cmds
+
+# Pairs listed by name in the rewiring prompt, the rest are counted
+MAX_LISTED_PAIRS = 8
 
 
 def show_warning_popup(control, mirrored_control):
+    return show_rewire_popup([(control, mirrored_control)])
+
+
+def show_rewire_popup(pairs):
+    """One prompt for every (control, mirrored control) pair of a selection, returns the button pressed."""
+    listed = "\n".join(f"    {control} -> {mirrored_control}" for control, mirrored_control in pairs[:MAX_LISTED_PAIRS])
+    if len(pairs) > MAX_LISTED_PAIRS:
+        listed += f"\n    ... and {len(pairs) - MAX_LISTED_PAIRS} more"
     result = cmds.confirmDialog(
         title='Warning',
-        message='Selected controller {} is driving {}. If continuing without mirroring behavior, {} will be disconnected. Continue?'.format(
-            control, mirrored_control, mirrored_control),
+        message='{} selected controllers are driving their mirrored controller:\n{}\nIf continuing without mirroring '
+                'behavior, the mirrored controllers will be disconnected. Continue?'.format(len(pairs), listed),
         button=['Cancel', 'Continue and disconnect', 'Continue and mirror behavior'],
         defaultButton='Continue and disconnect',
         cancelButton='Cancel',
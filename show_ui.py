@@ -1,21 +1,25 @@
-from zanimTools.module_reloader import reset_session_for_script
-import os
-import sys
-
-import maya.cmds as cmds
-from zanimTools.rig_setup.core.scene_data import NamingConvention
-from zanimTools.rig_setup.ui.main_menu import MainMenu
-
-# Add the scripts folder to the system path
-scripts_path = os.path.join(os.path.expanduser("~"), "documents", "maya", "scripts")
-if scripts_path not in sys.path:
-    sys.path.append(scripts_path)
-
-
-# Import the main menu function
-def show():
-
-    if cmds.window("rigSetupUI", exists=True):
-        cmds.deleteUI("rigSetupUI")
-    naming_convention = NamingConvention()
-    my_window = MainMenu(naming_convention)
+import time
+
+from zanimTools.rig_setup.core.instrumentation import cmds
+
+# MainMenu kept between clicks of the shelf button, its window is shown again instead of being rebuilt
+_main_menu = None
+
+
+def show():
+    """Show the Rig Setup window and print how long it took to appear."""
+    global _main_menu
+    start = time.perf_counter()
+
+    if _main_menu is not None and cmds.window(_main_menu.window, exists=True):
+        _main_menu.refresh_from_scene()
+        cmds.showWindow(_main_menu.window)
+    else:
+        # A window left by a previous session of the tool (or a reloaded show_ui) can't be reused
+        if cmds.window("rigSetupUI", exists=True):
+            cmds.deleteUI("rigSetupUI")
+        from zanimTools.rig_setup.ui.main_menu import MainMenu
+        _main_menu = MainMenu()
+
+    print(f"Rig Setup window shown in {(time.perf_counter() - start) * 1000.0:.1f} ms")
+    return _main_menu
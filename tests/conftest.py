@@ -0,0 +1,67 @@
+"""
+Tests run on the headless maya.cmds stand-in (rig_setup.headless.fake_cmds), from the repository root:
+    python -m pytest -q
+
+The repository is the zanimTools package, it's registered under that name when it isn't installed in the
+Maya scripts folder the tests run from.
+"""
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if "zanimTools" not in sys.modules:
+    try:
+        import zanimTools  # noqa: F401
+    except ImportError:
+        spec = importlib.util.spec_from_file_location("zanimTools", os.path.join(ROOT, "__init__.py"),
+                                                      submodule_search_locations=[ROOT])
+        sys.modules["zanimTools"] = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(sys.modules["zanimTools"])
+
+from zanimTools.rig_setup.headless import fake_cmds  # noqa: E402
+
+FAKE = fake_cmds.install()
+
+
+@pytest.fixture
+def fake():
+    """New empty scene, with the caches of the previous test dropped like after opening another scene."""
+    from zanimTools.rig_setup.core import scene_events
+
+    FAKE.new_scene()
+    FAKE.reset_counts()
+    del FAKE.warnings[:]
+    del FAKE.deferred[:]
+    scene_events.emit("scene_reset")
+    return FAKE
+
+
+@pytest.fixture
+def lip_rig(fake):
+    """Naming convention and 8 lip controls (L/R pairs, Top and Bot rows) with a posed jaw setup."""
+    from zanimTools.rig_setup.core.scene_data import NamingConvention
+    from zanimTools.rig_setup.headless.scenes import create_lip_rig
+
+    controls = create_lip_rig(8)
+    naming_convention = NamingConvention()
+    for attr, value in (("StickyLips", 0.5), ("StickyTopBot", 0.75), ("PressLips", 2.0)):
+        fake.nodes[naming_convention.jaw_control].attrs[attr] = value
+    fake.nodes[naming_convention.jaw_joint_reference].attrs["rotateX"] = 12.0
+    fake.nodes[naming_convention.jaw_joint_reference].attrs["rotateZ"] = 4.0
+    return naming_convention, controls
+
+
+@pytest.fixture
+def rotations(fake):
+    """rotations(controls) -> {control: (rotateX, rotateY, rotateZ) of its _driver}, evaluated through the graph."""
+
+    def evaluate(controls):
+        plugs = [f"{control}_driver.rotate{axis}" for control in controls for axis in "XYZ"]
+        values = fake.evaluate(plugs)
+        return {control: tuple(values[f"{control}_driver.rotate{axis}"] for axis in "XYZ") for control in controls}
+
+    return evaluate
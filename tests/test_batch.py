@@ -0,0 +1,56 @@
+import maya.cmds as cmds
+
+from zanimTools.rig_setup.core.batch import SceneJob, build_jobs, process_scene, run_batch
+from zanimTools.rig_setup.core.build_manifest import read_manifest
+from zanimTools.rig_setup.core.module_lips import LIPS, MANIFEST_SYSTEM
+from zanimTools.rig_setup.core.scene_data import NamingConvention
+from zanimTools.rig_setup.headless.scenes import create_module_rig
+
+# Other type tokens, token order and jaw control, like a studio preset
+PRESET = {"side_l": "Lf", "side_r": "Rt", "pos_top_name": "Up", "type_control": "Ctrl", "side_index": 2,
+          "type_index": 0, "jaw_control": "Ctrl_jawOpen_C"}
+
+
+def write_scene(fake, path, settings=None):
+    """Save a lip rig of 8 controls named with settings, returns its controls."""
+    fake.new_scene()
+    naming_convention = NamingConvention()
+    naming_convention.update_naming_convention(**(settings or {}))
+    controls = create_module_rig(LIPS, 8, naming_convention, base="lip")
+    cmds.delete(naming_convention.settings_node)  # The batch brings the settings, not the scene
+    cmds.file(rename=path)
+    cmds.file(save=True)
+    return controls
+
+
+def test_controls_are_found_with_the_job_convention(fake, tmp_path):
+    path = str(tmp_path / "preset.json")
+    controls = write_scene(fake, path, PRESET)
+
+    result = process_scene(SceneJob(path, settings=PRESET))
+    assert result.status == "built", result.error
+    assert result.controls == 8
+    cmds.file(path, open=True, force=True)
+    assert read_manifest(MANIFEST_SYSTEM).controls == controls
+
+
+def test_no_control_is_reported_invalid(fake, tmp_path):
+    path = str(tmp_path / "default.json")
+    write_scene(fake, path)
+
+    result = process_scene(SceneJob(path, settings=PRESET))
+    assert result.status == "invalid"
+    assert "No control matches" in result.error
+
+
+def test_run_batch_on_the_fake_backend(fake, tmp_path):
+    scenes = [str(tmp_path / f"scene{index}.json") for index in range(2)]
+    for scene in scenes:
+        write_scene(fake, scene, PRESET)
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+
+    report = run_batch(build_jobs(scenes, str(output_dir), settings=PRESET), workers=2, backend="fake")
+    assert [result.status for result in report.results] == ["built", "built"], report.describe()
+    assert [result.nodes_created for result in report.results] == [36, 36]
+    assert sorted(path.name for path in output_dir.iterdir()) == ["scene0.json", "scene1.json"]
@@ -0,0 +1,55 @@
+import maya.cmds as cmds
+
+from zanimTools.rig_setup.core.build_manifest import delete_build, read_manifest, select_build
+from zanimTools.rig_setup.core.module_lips import MANIFEST_SYSTEM, create_lip_nodes, rebuild_lip_nodes
+
+
+def test_build_is_recorded(lip_rig, fake):
+    naming_convention, controls = lip_rig
+    report = create_lip_nodes(naming_convention, False, control_list=controls, compact=True)
+
+    manifest = read_manifest(MANIFEST_SYSTEM)
+    assert manifest.controls == controls
+    assert manifest.options == {"is_mirror_behavior": False, "compact": True, "cluster": "row"}
+    assert sorted(manifest.nodes) == sorted(report.name_map.values())
+    assert sorted(select_build(MANIFEST_SYSTEM)) == sorted(manifest.nodes)
+
+
+def test_rebuild_uses_the_current_convention(lip_rig, fake, rotations):
+    naming_convention, controls = lip_rig
+    create_lip_nodes(naming_convention, False, control_list=controls, compact=True)
+    expected = rotations(controls)
+
+    naming_convention.update_naming_convention(side_c="Ctr")
+    report = rebuild_lip_nodes(naming_convention)
+
+    assert report.nodes_created == 9
+    assert not [name for name in fake.nodes if name.startswith("C_lipRow")]
+    assert "Ctr_lipRowTop_multi" in fake.nodes
+    assert rotations(controls) == expected
+    assert read_manifest(MANIFEST_SYSTEM).options["compact"] is True
+
+
+def test_delete_removes_generated_nodes_and_connections(lip_rig, fake):
+    naming_convention, controls = lip_rig
+    scene_nodes = set(fake.nodes)
+    create_lip_nodes(naming_convention, False, control_list=controls)
+
+    manifest = delete_build(MANIFEST_SYSTEM)
+    assert manifest is not None
+    assert set(fake.nodes) == scene_nodes | {naming_convention.settings_node}
+    assert not [plug for plug in fake.connections if plug.endswith(("rotateX", "rotateY", "rotateZ"))]
+    assert read_manifest(MANIFEST_SYSTEM) is None
+    assert delete_build(MANIFEST_SYSTEM) is None
+
+
+def test_one_undo_removes_the_build_and_its_manifest(lip_rig, fake):
+    naming_convention, controls = lip_rig
+    scene_nodes = set(fake.nodes)
+    create_lip_nodes(naming_convention, False, control_list=controls)
+    assert create_lip_nodes(naming_convention, False, control_list=controls) is None  # Up to date, nothing written
+
+    cmds.undo()
+    assert set(fake.nodes) == scene_nodes
+    assert not cmds.objExists(naming_convention.settings_node + ".buildManifests")
+
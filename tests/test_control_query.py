@@ -0,0 +1,26 @@
+import fnmatch
+
+import pytest
+
+from zanimTools.rig_setup.core.control_query import find_controls, query_patterns
+
+
+@pytest.mark.parametrize("name, query", [
+    ("L_lipTop000_CTL", {"base": "lip", "body_contains": "lip"}),
+    ("L_lipTop000_CTL", {"pos": "Top", "body_contains": "000"}),
+    ("L_lipTop000_CTL", {"pos": "Top", "base": "lip", "body_contains": "p"}),
+    ("R_lipCornerTop01_CTL", {"pos": ("Top", "Bot"), "body_contains": "Corner"}),
+])
+def test_patterns_never_miss_a_match(lip_rig, name, query):
+    naming_convention, _ = lip_rig
+    patterns = query_patterns(naming_convention.parser, side=naming_convention.parse(name).side, type="CTL", **query)
+    assert any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def test_find_controls(lip_rig):
+    naming_convention, controls = lip_rig
+    assert find_controls(naming_convention, side="L", base="lip", body_contains="lip") == controls[::2]
+    assert find_controls(naming_convention, pos="Top", body_contains="000") == controls[:2]
+    assert sorted(find_controls(naming_convention, side=("L", "R"), pos="Bot")) == sorted(controls[2:4] + controls[6:])
+    assert find_controls(naming_convention, type="JNT") == [naming_convention.jaw_joint_reference]
+    assert find_controls(naming_convention, side="L", type="JNT") == []
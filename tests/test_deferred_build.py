@@ -0,0 +1,104 @@
+import maya.cmds as cmds
+import pytest
+
+from zanimTools.rig_setup.core.build_manifest import read_manifest
+from zanimTools.rig_setup.core.graph_builder import GraphBuilder
+from zanimTools.rig_setup.core.module_lips import MANIFEST_SYSTEM, start_lip_build
+
+
+def run_step(fake):
+    """One idle event: the next queued build step."""
+    fake.deferred.pop(0)()
+
+
+def start(naming_convention, controls, events):
+    return start_lip_build(naming_convention, False, control_list=controls, chunk_size=10,
+                           on_finished=lambda report: events.append("finished"),
+                           on_cancelled=lambda: events.append("cancelled"))
+
+
+def test_cancel_keeps_what_the_user_did_between_steps(lip_rig, fake):
+    naming_convention, controls = lip_rig
+    scene_nodes = set(fake.nodes)
+    events = []
+    build = start(naming_convention, controls, events)
+    run_step(fake)
+    run_step(fake)
+    cmds.createNode("transform", name="userNode")
+
+    build.cancel()
+    fake.run_deferred()
+    assert events == ["cancelled"]
+    assert set(fake.nodes) == scene_nodes | {"userNode", naming_convention.settings_node}
+    assert not [plug for plug in fake.connections if plug.startswith(tuple(controls))]
+    assert read_manifest(MANIFEST_SYSTEM) is None
+
+
+def test_cancel_before_the_first_step_changes_nothing(lip_rig, fake):
+    naming_convention, controls = lip_rig
+    cmds.createNode("transform", name="userNode")
+    events = []
+    start(naming_convention, controls, events).cancel()
+
+    fake.run_deferred()
+    assert events == ["cancelled"]
+    assert "userNode" in fake.nodes
+    assert not cmds.objExists(naming_convention.settings_node)
+
+
+def test_failed_step_rolls_the_build_back(lip_rig, fake):
+    naming_convention, controls = lip_rig
+    scene_nodes = set(fake.nodes)
+    events = []
+    start(naming_convention, controls, events)
+    run_step(fake)
+    cmds.delete(naming_convention.jaw_control)  # The next connections from the jaw control fail
+
+    with pytest.raises(RuntimeError):
+        fake.run_deferred()
+    assert events == ["cancelled"]
+    # The user's delete isn't undone
+    assert set(fake.nodes) == scene_nodes - {naming_convention.jaw_control} | {naming_convention.settings_node}
+    assert read_manifest(MANIFEST_SYSTEM) is None
+
+
+def test_roll_back_restores_existing_nodes(fake):
+    for name in ("source", "other", "target"):
+        cmds.createNode("transform", name=name)
+    cmds.connectAttr("other.rotateX", "target.rotateX")
+    cmds.connectAttr("other.rotateY", "target.rotateY")
+    cmds.setAttr("target.scaleX", 3.0)
+
+    builder = GraphBuilder()
+    builder.disconnect("other.rotateY", "target.rotateY")
+    builder.add_node("multiplyDivide", "new_multi")
+    builder.set_attr("target.scaleX", 2.0)
+    builder.connect("source.translateX", "target.translateX")
+    builder.connect("new_multi.outputX", "target.rotateX")
+    builder.connect("source.rotateZ", "target.rotateZ")
+    steps = builder.apply_steps(chunk_size=5)
+    assert next(steps) == (5, 6)
+    assert fake.connections["target.rotateX"] == "new_multi.outputX"
+
+    steps.close()
+    assert set(fake.nodes) == {"source", "other", "target"}
+    assert fake.connections == {"target.rotateX": "other.rotateX", "target.rotateY": "other.rotateY"}
+    assert cmds.getAttr("target.scaleX") == 3.0
+
+
+def test_steps_are_separate_undo_chunks(lip_rig, fake):
+    naming_convention, controls = lip_rig
+    scene_nodes = set(fake.nodes) | {naming_convention.settings_node}
+    events = []
+    start(naming_convention, controls, events)
+    run_step(fake)
+    cmds.createNode("transform", name="userNode")
+    fake.run_deferred()
+    assert events == ["finished"]
+
+    # Undoing the build step by step reaches the user's node, the manifest always matches the nodes left
+    while "userNode" in fake.nodes:
+        manifest = read_manifest(MANIFEST_SYSTEM)
+        assert set(manifest.existing_nodes()) == set(fake.nodes) - scene_nodes - {"userNode"}
+        cmds.undo()
+    assert len(set(fake.nodes) - scene_nodes) == 10
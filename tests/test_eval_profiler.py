@@ -0,0 +1,29 @@
+import maya.cmds as cmds
+
+from zanimTools.rig_setup.core.build_manifest import read_manifest
+from zanimTools.rig_setup.core.eval_profiler import driver_plugs, measure_evaluation, upstream_nodes
+from zanimTools.rig_setup.core.module_lips import MANIFEST_SYSTEM, create_lip_nodes
+
+
+def test_upstream_nodes_of_one_control(lip_rig, fake):
+    naming_convention, controls = lip_rig
+    create_lip_nodes(naming_convention, False, control_list=controls)
+    nodes = upstream_nodes(driver_plugs(controls[:1]), read_manifest(MANIFEST_SYSTEM).edges)
+    assert nodes == {controls[0] + suffix for suffix in ("_multi", "_remap", "_remap_pressed", "_plus")} | {
+        naming_convention.jaw_joint_reference, naming_convention.jaw_control}
+
+
+def test_only_the_subgraph_of_each_run_is_timed(lip_rig, fake):
+    naming_convention, controls = lip_rig
+    create_lip_nodes(naming_convention, False, control_list=controls)
+    plugs = driver_plugs(controls[:1])
+    nodes = upstream_nodes(plugs, read_manifest(MANIFEST_SYSTEM).edges)
+
+    for mode in ("off", "parallel", "off"):
+        report = measure_evaluation(plugs, nodes, 1, 10, mode=mode)
+        # The 4 computed nodes of the control's network every frame, however many runs came before
+        assert report.frame_times == [4e-6] * 10
+        assert cmds.evaluationManager(query=True, mode=True) == ["off"]
+    # The recording only holds the last run, where the DG only pulled the measured plugs
+    assert fake.profiler_events == [(name, 1.0) for _ in range(10) for name in sorted(nodes)
+                                    if name.endswith(("_multi", "_remap", "_remap_pressed", "_plus"))]
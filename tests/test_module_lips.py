@@ -0,0 +1,127 @@
+import maya.cmds as cmds
+
+from zanimTools.rig_setup.core.module_lips import (create_lip_nodes, plan_compact_lip_nodes, plan_lip_nodes,
+                                                   validate_lip_selection)
+from zanimTools.rig_setup.headless.scenes import create_lip_rig
+
+
+def top_network_edges(prefix, jaw="C_jawA01_JNT", jaw_control="C_jawOpen_CTL"):
+    """Connections of a Top lip network, as the lip setup has always built them."""
+    return {
+        (f"{jaw}.rotate", f"{prefix}_multi.input1"),
+        (f"{jaw_control}.StickyLips", f"{prefix}_remap_pressed.inputValue"),
+        (f"{prefix}_remap_pressed.outValue", f"{prefix}_remap.outputMax"),
+        (f"{prefix}_remap.outValue", f"{prefix}_multi.input2X"),
+        (f"{prefix}_remap.outValue", f"{prefix}_multi.input2Y"),
+        (f"{prefix}_remap.outValue", f"{prefix}_multi.input2Z"),
+        (f"{jaw_control}.StickyTopBot", f"{prefix}_remap.inputValue"),
+        (f"{prefix}_multi.output", f"{prefix}_plus.input3D[0]"),
+        (f"{jaw_control}.PressLips", f"{prefix}_plus.input3D[1].input3Dz"),
+    }
+
+
+def driver_edges(prefix, control):
+    return {
+        (f"{prefix}_multi.outputX", f"{control}_driver.rotateX"),
+        (f"{prefix}_multi.outputY", f"{control}_driver.rotateY"),
+        (f"{prefix}_plus.output3Dz", f"{control}_driver.rotateZ"),
+    }
+
+
+def test_per_control_graph(lip_rig):
+    naming_convention, controls = lip_rig
+    control = controls[0]  # L_lipTop000_CTL
+    builder = plan_lip_nodes(naming_convention, [control], False, log=None)
+
+    assert {(name, node_type) for name, node_type, _ in builder.nodes} == {
+        (control + "_multi", "multiplyDivide"), (control + "_remap", "remapValue"),
+        (control + "_remap_pressed", "remapValue"), (control + "_plus", "plusMinusAverage")}
+    assert set(builder.edges) == top_network_edges(control) | driver_edges(control, control)
+
+
+def test_bot_graph_goes_through_inv(lip_rig):
+    naming_convention, controls = lip_rig
+    control = controls[2]  # L_lipBot001_CTL
+    builder = plan_lip_nodes(naming_convention, [control], False)
+
+    assert (control + "_inv", "remapValue", True) in builder.nodes
+    edges = set(builder.edges)
+    assert (control + "_remap_pressed.outValue", control + "_inv.inputValue") in edges
+    assert (control + "_remap.outValue", control + "_remap_pressed.outputMax") in edges
+    assert {(control + "_inv.outValue", f"{control}_multi.input2{axis}") for axis in "XYZ"} <= edges
+
+
+def test_mirrored_graph(lip_rig):
+    naming_convention, controls = lip_rig
+    left, right = controls[0], controls[1]
+    builder = plan_lip_nodes(naming_convention, [left], True)
+
+    # The right driver follows the left network, no network is planned for the right control
+    assert set(builder.edges) == top_network_edges(left) | driver_edges(left, left) | driver_edges(left, right)
+    assert not [name for name, _, _ in builder.nodes if name.startswith(right)]
+
+
+def test_build_is_idempotent(lip_rig, fake):
+    naming_convention, controls = lip_rig
+    report = create_lip_nodes(naming_convention, False, control_list=controls)
+    assert report.nodes_created == 4 * 5 + 4 * 4  # Bot networks have an extra _inv node
+
+    assert plan_lip_nodes(naming_convention, controls, False).diff().is_empty()
+    node_count = len(fake.nodes)
+    assert create_lip_nodes(naming_convention, False, control_list=controls) is None
+    assert len(fake.nodes) == node_count
+    assert fake.warnings[-1] == "Lip setup is already up to date"
+
+
+def test_incremental_build_only_adds_what_is_missing(lip_rig, fake):
+    naming_convention, controls = lip_rig
+    create_lip_nodes(naming_convention, False, control_list=controls[:4])
+
+    diff = plan_lip_nodes(naming_convention, controls, False).diff()
+    assert diff.existing_nodes == 18
+    assert {name for name, _, _ in diff.builder.nodes} == {
+        name for name, _, _ in plan_lip_nodes(naming_convention, controls[4:], False).nodes}
+
+
+def test_compact_layouts_match_per_control_rotations(lip_rig, fake, rotations):
+    naming_convention, controls = lip_rig
+    create_lip_nodes(naming_convention, False, control_list=controls)
+    expected = rotations(controls)
+
+    for cluster, network_count in (("row", 2), ("side_row", 4)):
+        builder = plan_compact_lip_nodes(naming_convention, controls, False, cluster=cluster)
+        assert len({name.rsplit("_", 1)[0] for name, _, _ in builder.nodes if name.endswith("_multi")}) == network_count
+        fake.new_scene()
+        create_lip_rig(8)
+        for attr, value in (("StickyLips", 0.5), ("StickyTopBot", 0.75), ("PressLips", 2.0)):
+            fake.nodes[naming_convention.jaw_control].attrs[attr] = value
+        fake.nodes[naming_convention.jaw_joint_reference].attrs.update(rotateX=12.0, rotateZ=4.0)
+        builder.apply()
+        assert rotations(controls) == expected
+
+
+def test_validation_reports_every_problem(lip_rig, fake):
+    naming_convention, controls = lip_rig
+    assert validate_lip_selection(naming_convention, controls, False).is_valid()
+
+    # Both sides of a pair selected with Mirror Behavior
+    report = validate_lip_selection(naming_convention, controls[:2], True)
+    assert report.conflicts == [(controls[0], controls[1])]
+
+    cmds.delete(controls[2] + "_driver")
+    cmds.delete(naming_convention.jaw_joint_reference)
+    report = validate_lip_selection(naming_convention, controls[:3] + controls[:1], False)
+    assert report.missing_drivers == [controls[2] + "_driver"]
+    assert report.missing_nodes == [naming_convention.jaw_joint_reference]
+    assert report.duplicates == [controls[0]]
+    assert not report.is_valid()
+
+
+def test_invalid_selection_builds_nothing(lip_rig, fake):
+    naming_convention, controls = lip_rig
+    fake.nodes[naming_convention.jaw_control].user_attrs.pop("PressLips")
+    node_count = len(fake.nodes)
+
+    assert create_lip_nodes(naming_convention, False, control_list=controls) is None
+    assert len(fake.nodes) == node_count
+    assert "Missing attributes: C_jawOpen_CTL.PressLips" in fake.warnings[-1]
@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+from zanimTools import module_reloader
+
+PACKAGE = "reloaderprobe"
+
+
+@pytest.fixture
+def probe_package(tmp_path, monkeypatch):
+    """A package with a module to edit, imported from tmp_path."""
+    folder = tmp_path / PACKAGE
+    folder.mkdir()
+    (folder / "__init__.py").write_text("")
+    (folder / "values.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import reloaderprobe.values  # noqa: F401
+    yield folder / "values.py"
+    for name in [name for name in sys.modules if name.partition(".")[0] == PACKAGE]:
+        del sys.modules[name]
+        module_reloader._sources.pop(name, None)
+
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5 * 10 ** 9))
+
+
+def test_detection_has_no_side_effect(probe_package):
+    assert module_reloader.reload_changed(PACKAGE) == []
+
+    probe_package.write_text("VALUE = 2\n")
+    bump_mtime(probe_package)
+    assert module_reloader.changed_modules(PACKAGE) == [PACKAGE + ".values"]
+    assert module_reloader.changed_modules(PACKAGE) == [PACKAGE + ".values"]
+
+    assert module_reloader.reload_changed(PACKAGE) == [PACKAGE + ".values"]
+    assert sys.modules[PACKAGE + ".values"].VALUE == 2
+    assert module_reloader.changed_modules(PACKAGE) == []
+
+
+def test_touching_a_file_is_not_a_change(probe_package):
+    module_reloader.reload_changed(PACKAGE)
+    bump_mtime(probe_package)
+    assert module_reloader.changed_modules(PACKAGE) == []
+    assert module_reloader.reload_changed(PACKAGE) == []
@@ -0,0 +1,67 @@
+import pytest
+
+from zanimTools.rig_setup.core.name_parser import NameParser
+
+# Tokens in another order, with other side, position and type tokens and another separator
+CUSTOM = {"separator": "-", "side_l": "Lf", "side_r": "Rt", "side_c": "Md", "pos_top_name": "Up",
+          "pos_bot_name": "Dn", "type_control": "Ctrl", "side_index": 2, "pos_index": 1, "type_index": 0}
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("L_lipTop01_CTL", ("L", "lip", "Top", "01", "CTL")),
+    ("R_lipBot_JNT", ("R", "lip", "Bot", None, "JNT")),
+    ("L_lipCornerTop01_CTL", ("L", "lipCorner", "Top", "01", "CTL")),  # The last position token wins
+    ("C_lipTopInner02_GRP", ("C", "lipInner", "Top", "02", "GRP")),
+    ("R_lipBottom01_CTL", ("R", "lipBottom", None, "01", "CTL")),  # "Bot" has to end on a camelCase boundary
+    ("X_jaw_FOO", (None, "jaw", None, None, None)),
+    ("jaw", (None, "", None, None, None)),  # No body token at pos_index
+])
+def test_parse(name, expected):
+    parsed = NameParser().parse(name)
+    assert (parsed.side, parsed.base, parsed.pos, parsed.number, parsed.type) == expected
+
+
+def test_cleared_tokens_are_ignored():
+    parser = NameParser(pos_mid_name="", side_c="", type_group="")
+    parsed = parser.parse("L_lipTop01_CTL")
+    assert (parsed.base, parsed.pos, parsed.number) == ("lip", "Top", "01")
+    assert parser.parse("L_lip01_CTL").pos is None
+    assert parser.parse("_lip01_").side is None and parser.parse("_lip01_").type is None
+    assert parser.resolve("lip", "Mid", "C", "01", "GRP") == "lip01"
+
+
+def test_custom_convention():
+    parser = NameParser(**CUSTOM)
+    parsed = parser.parse("Ctrl-lipDn03-Rt")
+    assert (parsed.side, parsed.base, parsed.pos, parsed.number, parsed.type) == ("R", "lip", "Bot", "03", "CTL")
+    assert parser.resolve("lip", "Top", "L", "01", "CTL") == "Ctrl-lipUp01-Lf"
+    assert parser.mirror("Ctrl-lipUp01-Lf") == "Ctrl-lipUp01-Rt"
+    assert parser.mirror("Ctrl-lipUp01-Md") == "Ctrl-lipUp01-Md"
+    assert parser.mirror_key("Ctrl-lipUp01-Lf") == parser.mirror_key("Ctrl-lipUp01-Rt")
+
+
+def test_mirror_and_resolve():
+    parser = NameParser()
+    assert parser.mirror("L_lipTop01_CTL") == "R_lipTop01_CTL"
+    assert parser.mirror("C_jaw_JNT") == "C_jaw_JNT"
+    assert parser.mirror(parser.mirror("R_lipBot02_CTL")) == "R_lipBot02_CTL"
+    assert parser.resolve("lip", "Top", "L", "01", "CTL") == "L_lipTop01_CTL"
+    assert parser.resolve("lip", None, "R") == "R_lip"
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("L_lipTop01_CTL", "Ctrl-lipUp01-Lf"),
+    ("R_lipCornerBot02_CTL_multi", "Ctrl-lipCornerDn02-Rt-multi"),  # Extra tokens stay at the end
+    ("C_lipRowTop_multi", "lipRowUp-Md-multi"),  # No type token
+    ("jaw", "jaw"),
+])
+def test_convert(name, expected):
+    source, target = NameParser(), NameParser(**CUSTOM)
+    assert source.convert(name, target) == expected
+    if expected != name:
+        assert target.convert(expected, source) == name
+
+
+def test_convert_needs_positive_indices():
+    with pytest.raises(ValueError):
+        NameParser().convert("L_lipTop01_CTL", NameParser(type_index=-1))
@@ -0,0 +1,33 @@
+from zanimTools.rig_setup.core.module_lips import LIPS, create_lip_nodes, plan_compact_lip_nodes, plan_lip_nodes
+from zanimTools.rig_setup.core.rewiring import find_mirror_conflicts
+
+
+def test_mirror_build_leaves_conflicts(lip_rig, fake):
+    naming_convention, controls = lip_rig
+    left = controls[::2]
+    create_lip_nodes(naming_convention, True, control_list=left)
+
+    conflicts = find_mirror_conflicts(naming_convention, plan_lip_nodes(naming_convention, left, False), left)
+    assert [(conflict.control, conflict.mirrored_control) for conflict in conflicts] == list(zip(left, controls[1::2]))
+    assert all(len(conflict.edges) == 3 for conflict in conflicts)
+
+    report = create_lip_nodes(naming_convention, False, control_list=left, rewire_policy="disconnect")
+    assert report.edges_removed == 3 * len(left)
+    assert not [plug for plug in fake.connections if plug.startswith("R_")]
+
+
+def test_shared_compact_networks_are_not_conflicts(lip_rig, fake, rotations):
+    naming_convention, controls = lip_rig
+    create_lip_nodes(naming_convention, False, control_list=controls, compact=True)
+    expected = rotations(controls)
+    left = controls[::2]
+
+    builder = plan_compact_lip_nodes(naming_convention, left, False)
+    assert len(find_mirror_conflicts(naming_convention, builder, left)) == len(left)
+    shared_prefixes = LIPS.shared_prefixes(naming_convention, left)
+    assert shared_prefixes == {"C_lipRowTop", "C_lipRowBot"}
+    assert find_mirror_conflicts(naming_convention, builder, left, shared_prefixes=shared_prefixes) == []
+
+    # The default answer of the prompt would have broken the right side of the rig
+    create_lip_nodes(naming_convention, False, control_list=left, compact=True, rewire_policy="disconnect")
+    assert rotations(controls) == expected
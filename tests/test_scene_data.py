@@ -0,0 +1,47 @@
+import maya.cmds as cmds
+import pytest
+
+from zanimTools.rig_setup.core.scene_data import SETTINGS_ATTR, NamingConvention
+
+
+def test_settings_are_stored_once(fake):
+    naming_convention = NamingConvention()
+    assert naming_convention.update_naming_convention(side_l="Lf")
+    fake.reset_counts()
+    assert not naming_convention.update_naming_convention(side_l="Lf")
+    assert fake.call_counts["setAttr"] == 0
+    assert NamingConvention().side_l == "Lf"
+
+
+def test_save_after_undo_is_written(fake):
+    naming_convention = NamingConvention()
+    naming_convention.update_naming_convention()
+    naming_convention.update_naming_convention(side_l="Lf")
+    cmds.undo()  # The save is undone, the scene holds the previous convention again
+    assert '"side_l": "L"' in cmds.getAttr(f"{naming_convention.settings_node}.{SETTINGS_ATTR}")
+
+    assert naming_convention.update_naming_convention(side_l="Lf")
+    assert NamingConvention().side_l == "Lf"
+
+
+@pytest.mark.parametrize("blob", ['{"side_l": "Lf"', '["side_l"]'])
+def test_damaged_blob_falls_back_on_legacy_settings(fake, blob):
+    naming_convention = NamingConvention()
+    naming_convention.update_naming_convention()
+    cmds.addAttr(naming_convention.settings_node, longName="side_r", dataType="string")
+    cmds.setAttr(f"{naming_convention.settings_node}.side_r", "Rt", type="string")
+    cmds.setAttr(f"{naming_convention.settings_node}.{SETTINGS_ATTR}", blob, type="string")
+
+    naming_convention = NamingConvention()
+    assert "is damaged" in fake.warnings[-1]
+    assert (naming_convention.side_l, naming_convention.side_r) == ("L", "Rt")
+
+
+def test_reading_settings_leaves_the_scene_untouched(fake):
+    naming_convention = NamingConvention()
+    assert naming_convention.side_l == "L"
+    assert fake.nodes == {}
+    assert not fake.call_counts["createNode"] and not fake.call_counts["setAttr"]
+
+    naming_convention.update_naming_convention()  # First save
+    assert cmds.objExists(f"{naming_convention.settings_node}.{SETTINGS_ATTR}")
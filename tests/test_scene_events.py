@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+import maya.cmds as cmds
+import pytest
+
+from zanimTools.rig_setup.core import control_query, mirror_index, scene_events
+
+
+@pytest.fixture
+def callbacks(monkeypatch):
+    """Registered callback ids, with a recording stand-in for the OpenMaya message classes."""
+    registered = []
+
+    def add(*args):
+        registered.append(len(registered) + 1)
+        return registered[-1]
+
+    def remove(ids):
+        for callback_id in list(ids):
+            registered.remove(callback_id)
+
+    scene_message = SimpleNamespace(addCallback=add, **{name: name for name in (
+        "kBeforeNew", "kAfterNew", "kBeforeOpen", "kAfterOpen", "kBeforeImport", "kAfterImport",
+        "kBeforeCreateReference", "kAfterCreateReference", "kBeforeRemoveReference", "kAfterRemoveReference")})
+    monkeypatch.setattr(scene_events, "om", SimpleNamespace(
+        MSceneMessage=scene_message,
+        MDGMessage=SimpleNamespace(addNodeAddedCallback=add, addNodeRemovedCallback=add),
+        MNodeMessage=SimpleNamespace(addNameChangedCallback=add),
+        MObject=SimpleNamespace(kNullObj=None),
+        MMessage=SimpleNamespace(removeCallbacks=remove)))
+    yield registered
+    scene_events.deactivate()
+
+
+def test_caches_never_register_callbacks(lip_rig, callbacks):
+    naming_convention, controls = lip_rig
+    mirror_index.get_mirror_index(naming_convention.parser)
+    assert control_query.get_control_index(naming_convention) is None
+    assert control_query.find_controls(naming_convention, side="L", pos="Top") == [controls[0], controls[4]]
+    assert callbacks == [] and not scene_events.is_active()
+
+
+def test_window_lifetime(lip_rig, fake, callbacks):
+    naming_convention, controls = lip_rig
+    index = mirror_index.get_mirror_index(naming_convention.parser)
+    cmds.createNode("transform", name="L_lipTop009_CTL")  # Missed, nothing is listening
+
+    assert scene_events.activate()
+    assert len(callbacks) == 13
+    assert index.dirty  # Reset by the activation, the missed node is picked up
+    assert mirror_index.get_mirror_index(naming_convention.parser).exists("L_lipTop009_CTL")
+    assert control_query.get_control_index(naming_convention) is not None
+
+    fake.reset_counts()
+    assert control_query.find_controls(naming_convention, side="L", pos="Top", index=None)
+    assert fake.total_calls() <= 1
+
+    scene_events.deactivate()  # The window is closed
+    assert control_query.get_control_index(naming_convention) is None
+    mirror_index.get_mirror_index(naming_convention.parser)
+    assert callbacks == [] and not scene_events.is_active()
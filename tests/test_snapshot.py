@@ -0,0 +1,92 @@
+import maya.cmds as cmds
+
+from zanimTools.rig_setup.core.build_manifest import read_manifest
+from zanimTools.rig_setup.core.module_lips import LIPS, create_lip_nodes
+from zanimTools.rig_setup.core.scene_data import NamingConvention
+from zanimTools.rig_setup.core.snapshot import Snapshot, export_snapshot, restore_snapshot
+from zanimTools.rig_setup.headless.scenes import create_module_rig
+
+OTHER_CONVENTION = {"side_l": "Lf", "side_r": "Rt", "pos_top_name": "Up", "type_control": "Ctrl",
+                    "side_index": 2, "type_index": 0, "jaw_control": "Ctrl_jawOpen_C"}
+
+
+def new_rig(fake, **settings):
+    fake.new_scene()
+    naming_convention = NamingConvention()
+    naming_convention.update_naming_convention(**settings)
+    controls = create_module_rig(LIPS, 8, naming_convention, base="lip")
+    for attr, value in (("StickyLips", 0.5), ("StickyTopBot", 0.75), ("PressLips", 2.0)):
+        fake.nodes[naming_convention.jaw_control].attrs[attr] = value
+    fake.nodes[naming_convention.jaw_joint_reference].attrs.update(rotateX=12.0, rotateZ=4.0)
+    return naming_convention, controls
+
+
+def test_file_round_trip(fake, tmp_path):
+    snapshot = Snapshot("lips", [("L_a_multi", "multiplyDivide", True), ("L_b", "transform", False)],
+                        [("L_a_multi.operation", 2), ("L_a_multi.input2X", 0.25), ("L_b.visibility", False),
+                         ("L_b.notes", "é")],
+                        [("L_a_multi.outputX", "L_b.rotateX")], ["L_b"], {"compact": False}, {"side_l": "L"})
+    path = str(tmp_path / "round.ztsnap")
+    size = snapshot.write(path)
+
+    loaded = Snapshot.read(path)
+    assert size == (tmp_path / "round.ztsnap").stat().st_size
+    assert loaded.__dict__ == snapshot.__dict__
+    assert type(loaded.values[0][1]) is int and type(loaded.values[2][1]) is bool
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / "bad.ztsnap"
+    path.write_bytes(b"nope")
+    try:
+        Snapshot.read(str(path))
+    except ValueError as e:
+        assert "not a rig snapshot" in str(e)
+    else:
+        raise AssertionError("A file that isn't a snapshot was read")
+
+
+def test_restore_keeps_tweaks_across_conventions(fake, tmp_path, rotations):
+    naming_convention, controls = new_rig(fake)
+    create_lip_nodes(naming_convention, False, control_list=controls)
+    cmds.setAttr(controls[0] + "_remap.inputMax", 2.0)
+    expected = list(rotations(controls).values())
+    path = str(tmp_path / "lips.ztsnap")
+    assert len(export_snapshot("lips", path).values) == 1
+
+    naming_convention, controls = new_rig(fake)
+    restore_snapshot(path, naming_convention)
+    assert list(rotations(controls).values()) == expected
+
+    naming_convention, controls = new_rig(fake, **OTHER_CONVENTION)
+    report = restore_snapshot(path, naming_convention)
+    assert report.values_set == 1
+    assert controls[0] == "Ctrl_lipUp000_Lf"
+    assert fake.nodes["Ctrl_lipUp000_Lf_remap"].attrs["inputMax"] == 2.0
+    assert list(rotations(controls).values()) == expected
+    assert restore_snapshot(path, naming_convention) is None  # Already there
+
+
+def test_restore_needs_the_rig(fake, tmp_path):
+    naming_convention, controls = new_rig(fake)
+    create_lip_nodes(naming_convention, False, control_list=controls)
+    path = str(tmp_path / "lips.ztsnap")
+    export_snapshot("lips", path)
+
+    fake.new_scene()
+    assert restore_snapshot(path, NamingConvention()) is None
+    assert "nodes are missing" in fake.warnings[-1]
+
+
+def test_one_undo_removes_a_restore_and_its_manifest(fake, tmp_path):
+    naming_convention, controls = new_rig(fake)
+    create_lip_nodes(naming_convention, False, control_list=controls)
+    path = str(tmp_path / "lips.ztsnap")
+    export_snapshot("lips", path)
+
+    naming_convention, controls = new_rig(fake)
+    scene_nodes = set(fake.nodes)
+    assert restore_snapshot(path, naming_convention).nodes_created == 36
+    cmds.undo()
+    assert set(fake.nodes) == scene_nodes
+    assert read_manifest("lips") is None